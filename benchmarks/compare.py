@@ -0,0 +1,48 @@
+"""
+hot_paths --json 결과 두 개를 비교합니다. 기준보다 p50이 threshold 이상 느려진 케이스가 있으면 1로 종료합니다.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.2] [--metric p50_us]
+"""
+import argparse
+import json
+import sys
+
+def _key(case: dict) -> tuple:
+    return case["name"], case.get("size")
+
+def load(path: str) -> tuple[dict, dict[tuple, dict]]:
+    with open(path) as f:
+        report = json.load(f)
+    return report, {_key(case): case for case in report["results"]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 상대 증가율 (0.2 = 20%%)")
+    parser.add_argument("--metric", default="p50_us", choices=["mean_us", "p50_us", "p99_us"])
+    args = parser.parse_args()
+
+    base_report, base = load(args.base)
+    head_report, head = load(args.head)
+    print(f"base {base_report.get('commit')} → head {head_report.get('commit')} ({args.metric})")
+    print(f"{'case':<34} {'size':>8} {'base':>10} {'head':>10} {'change':>8}")
+
+    regressions = []
+    for key in sorted(base.keys() & head.keys(), key=lambda k: (k[0], k[1] or 0)):
+        before, after = base[key][args.metric], head[key][args.metric]
+        change = (after - before) / before if before else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = "  regression"
+            regressions.append(key)
+        print(f"{key[0]:<34} {key[1] or '':>8} {before:>10} {after:>10} {change:>+8.1%}{marker}")
+    for key in sorted(head.keys() - base.keys(), key=lambda k: (k[0], k[1] or 0)):
+        print(f"{key[0]:<34} {key[1] or '':>8} {'-':>10} {head[key][args.metric]:>10} {'new':>8}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+fuzzy 자동완성 인덱스의 조회 지연 시간이 카탈로그 크기에 따라 어떻게 변하는지 측정합니다.
+
+    python -m benchmarks.fuzzy_autocompletion [--sizes 1000 10000 100000] [--json out.json]
+
+임의의 한글 이름으로 카탈로그를 만들고, 이름의 한 음절 모음을 바꾼 오타 질의로 조회합니다.
+조회 지연 시간과 함께 인덱스를 만드는 시간, 만드는 동안의 최대 메모리(tracemalloc), 완성된 fuzzy 인덱스의 크기를 보고합니다.
+최대 메모리는 tracemalloc이 빌드를 느리게 하므로 시간을 잰 빌드와 따로 한 번 더 만들어 측정합니다.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+for _key in ("DB_URL", "DB_USER", "DB_PW", "SECRET_KEY"):
+    os.environ.setdefault(_key, "benchmark")
+
+from saveplate.completion import CompletionIndex
+
+def synthetic_names(count: int, rng: random.Random) -> list[str]:
+    names = set()
+    while len(names) < count:
+        names.add("".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(2, 5))))
+    return list(names)
+
+def with_typo(name: str, rng: random.Random) -> str:
+    # 한 음절의 중성을 옆 모음으로 바꿉니다 (자모 단위 편집 거리 1~2).
+    i = rng.randrange(len(name))
+    offset = ord(name[i]) - 0xAC00
+    cho, rest = divmod(offset, 21 * 28)
+    jung, jong = divmod(rest, 28)
+    typo = chr(0xAC00 + cho * 21 * 28 + ((jung + 1) % 21) * 28 + jong)
+    return name[:i] + typo + name[i + 1:]
+
+def run(size: int, queries: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    names = synthetic_names(size, rng)
+    started = time.perf_counter()
+    index = CompletionIndex(((name, rng.random()) for name in names), top_n=20, max_prefix_length=16)
+    build_seconds = time.perf_counter() - started
+    build_entries = [(name, rng.random()) for name in names]
+    tracemalloc.start()
+    CompletionIndex(build_entries, top_n=20, max_prefix_length=16)
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del build_entries
+
+    samples = [with_typo(rng.choice(names), rng) for _ in range(queries)]
+    latencies = []
+    hits = 0
+    for query in samples:
+        started = time.perf_counter()
+        result = index.fuzzy.lookup(query, 10)
+        latencies.append(time.perf_counter() - started)
+        hits += bool(result)
+
+    latencies.sort()
+    return {
+        "size": size,
+        "build_seconds": round(build_seconds, 3),
+        "build_peak_mib": round(build_peak / 2**20, 1),
+        "fuzzy_index_mib": round((index.fuzzy._hashes.itemsize * len(index.fuzzy._hashes) + index.fuzzy._ranks.itemsize * len(index.fuzzy._ranks)) / 2**20, 1),
+        "delete_entries": len(index.fuzzy._hashes),
+        "hit_rate": round(hits / queries, 3),
+        "p50_us": round(statistics.median(latencies) * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    results = [run(size, args.queries, args.seed) for size in args.sizes]
+    print(f"{'size':>8} {'build(s)':>9} {'peak(MiB)':>10} {'index(MiB)':>11} {'entries':>9} {'hit':>6} {'p50(us)':>9} {'p99(us)':>9}")
+    for r in results:
+        print(
+            f"{r['size']:>8} {r['build_seconds']:>9} {r['build_peak_mib']:>10} {r['fuzzy_index_mib']:>11} "
+            f"{r['delete_entries']:>9} {r['hit_rate']:>6} {r['p50_us']:>9} {r['p99_us']:>9}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+벤치마크용 인메모리 그래프입니다. 라우터와 인증 모듈이 쓰는 쿼리만 흉내 냅니다.
+
+database 모듈의 드라이버 자리에 FakeDriver/FakeAsyncDriver를 넣으면 transactional,
+async_transactional 래퍼를 포함한 실제 코드 경로가 Neo4j 없이 실행됩니다.
+지원하지 않는 쿼리는 NotImplementedError를 발생시키므로 쿼리가 바뀌면 바로 드러납니다.
+"""
+from collections import deque
+from datetime import date
+from neo4j import Bookmarks
+from neo4j.exceptions import Neo4jError
+from typing import Any, Callable
+import asyncio
+import random
+import re
+import time
+
+def _normalize(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+class Record(dict):
+    def values(self) -> list[Any]:
+        return list(super().values())
+
+    def data(self) -> dict[str, Any]:
+        return dict(self)
+
+class FakeResult:
+    def __init__(self, rows: list[dict[str, Any]]):
+        self._rows = [Record(row) for row in rows]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def single(self, strict: bool = False) -> Record | None:
+        return self._rows[0] if self._rows else None
+
+    def data(self, *keys: str) -> list[dict[str, Any]]:
+        return [dict(row) for row in self._rows]
+
+    def values(self, *keys: str) -> list[list[Any]]:
+        return [row.values() for row in self._rows]
+
+    def consume(self) -> None:
+        self._rows = []
+
+class FakeAsyncResult(FakeResult):
+    async def __aiter__(self):
+        for row in self._rows:
+            yield row
+
+    async def single(self, strict: bool = False) -> Record | None:
+        return FakeResult.single(self)
+
+    async def data(self, *keys: str) -> list[dict[str, Any]]:
+        return FakeResult.data(self)
+
+    async def values(self, *keys: str) -> list[list[Any]]:
+        return FakeResult.values(self)
+
+    async def consume(self) -> None:
+        FakeResult.consume(self)
+
+class FakeGraph:
+    """
+    사용자, 냉장고 재료, 레시피 카탈로그를 딕셔너리로 들고 있는 그래프입니다.
+    """
+    def __init__(self):
+        self.users: dict[str, dict[str, Any]] = {}
+        self.pantries: dict[str, dict[str, int]] = {}
+        # (음식 이름, 레시피 이름, 재료 이름 목록)
+        self.recipes: list[tuple[str, str, list[str]]] = []
+        self.ingredients: dict[str, float | None] = {}
+        self.sauces: dict[str, float | None] = {}
+        # 커밋된 쓰기 트랜잭션 수 (가짜 북마크 번호)
+        self.commits = 0
+        # 다음 쿼리들에서 차례로 던질 오류 (재시도할 수 있는 오류면 세션이 드라이버처럼 재시도합니다)
+        self.failures: list[Exception] = []
+        # 쿼리를 실행한 최근 트랜잭션들의 timeout
+        self.timeouts: deque[float | None] = deque(maxlen=64)
+        self._handlers: list[tuple[re.Pattern, Callable[[dict[str, Any]], list[dict[str, Any]]]]] = [
+            (re.compile(r"^MATCH \(u:User \{email: \$email\}\) RETURN u$"), self._user_by_email),
+            (re.compile(r"^MATCH \(u:User \{refresh_token: \$refresh_token\}\) RETURN u$"), self._user_by_refresh_token),
+            (re.compile(r"^MATCH \(u:User \{email: \$email\}\) SET u\.refresh_token = \$refresh_token$"), self._set_refresh_token),
+            (re.compile(r"^MATCH \(u:User \{email: \$email\}\) SET u\.hashed_password = \$hashed_password$"), self._set_password),
+            (re.compile(r"^CREATE \(u:User \{"), self._create_user),
+            (re.compile(r"RETURN i, r\.amount$"), self._pantry),
+            (re.compile(r"RETURN collect\(i\.name\) AS A$"), self._pantry_names),
+            (re.compile(r"MERGE \(u\)-\[r:HAS\]->\(i\)"), self._add_ingredients),
+            (re.compile(r"RETURN f\.name AS food, r\.name AS recipe, collect\(i\.name\) AS ingredients$"), self._catalog),
+            (re.compile(r"^MATCH \(n:(Ingredient|Sauce)\) RETURN n\.name AS name, n\.popularity AS popularity$"), self._labels),
+        ]
+
+    def run(self, query: str, parameters: dict[str, Any] | None = None, **kwparameters: Any) -> list[dict[str, Any]]:
+        parameters = {**(parameters or {}), **kwparameters}
+        text = _normalize(query)
+        for pattern, handler in self._handlers:
+            match = pattern.search(text)
+            if match:
+                parameters["_match"] = match
+                return handler(parameters)
+        raise NotImplementedError(f"Unsupported query: {text[:80]}")
+
+    def add_user(self, email: str, hashed_password: str = "", name: str = "benchmark") -> dict[str, Any]:
+        user = {
+            "email": email,
+            "hashed_password": hashed_password,
+            "name": name,
+            "gender": None,
+            "birth_date": None,
+            "join_date": date(2024, 1, 1),
+            "disabled": False,
+        }
+        self.users[email] = user
+        return user
+
+    def _user_by_email(self, p):
+        user = self.users.get(p["email"])
+        return [{"u": user}] if user else []
+
+    def _user_by_refresh_token(self, p):
+        return [{"u": user} for user in self.users.values() if user.get("refresh_token") == p["refresh_token"]][:1]
+
+    def _set_refresh_token(self, p):
+        if p["email"] in self.users:
+            self.users[p["email"]]["refresh_token"] = p["refresh_token"]
+        return []
+
+    def _set_password(self, p):
+        if p["email"] in self.users:
+            self.users[p["email"]]["hashed_password"] = p["hashed_password"]
+        return []
+
+    def _create_user(self, p):
+        user = self.add_user(p["email"], p["hashed_password"], p["name"])
+        user.update(gender=p.get("gender"), birth_date=p.get("birth_date"), join_date=p["join_date"])
+        return [{"u": user}]
+
+    def _pantry(self, p):
+        return [{"i": {"name": name}, "r.amount": amount} for name, amount in self.pantries.get(p["user_email"], {}).items()]
+
+    def _pantry_names(self, p):
+        return [{"A": list(self.pantries.get(p["user_email"], {}))}]
+
+    def _add_ingredients(self, p):
+        user = self.users.get(p["user_email"])
+        if user is None:
+            return []
+        pantry = self.pantries.setdefault(p["user_email"], {})
+        rows = []
+        for entry in p["ingredients"]:
+            if entry["name"] not in self.ingredients:
+                continue
+            pantry[entry["name"]] = pantry.get(entry["name"], 0) + entry["amount"]
+            rows.append({"u": user, "i": {"name": entry["name"]}, "amount": pantry[entry["name"]]})
+        return rows
+
+    def _catalog(self, p):
+        return [{"food": food, "recipe": recipe, "ingredients": names} for food, recipe, names in self.recipes]
+
+    def _labels(self, p):
+        names = self.ingredients if p["_match"].group(1) == "Ingredient" else self.sauces
+        return [{"name": name, "popularity": popularity} for name, popularity in names.items()]
+
+class FakeTransaction:
+    def __init__(self, graph: FakeGraph, timeout: float | None = None):
+        self._graph = graph
+        self._timeout = timeout
+        self._ran = False
+
+    def _run(self, query: str, parameters: dict[str, Any] | None, kwparameters: dict[str, Any]) -> list[dict[str, Any]]:
+        if not self._ran:
+            self._ran = True
+            self._graph.timeouts.append(self._timeout)
+        if self._graph.failures:
+            raise self._graph.failures.pop(0)
+        return self._graph.run(query, parameters, **kwparameters)
+
+    def run(self, query: str, parameters: dict[str, Any] | None = None, **kwparameters: Any) -> FakeResult:
+        return FakeResult(self._run(query, parameters, kwparameters))
+
+class FakeAsyncTransaction(FakeTransaction):
+    async def run(self, query: str, parameters: dict[str, Any] | None = None, **kwparameters: Any) -> FakeAsyncResult:
+        return FakeAsyncResult(self._run(query, parameters, kwparameters))
+
+class FakeSession:
+    """
+    쓰기 트랜잭션을 실행할 때마다 그래프의 커밋 번호를 올리고, last_bookmarks()로 "fake:<번호>" 북마크를 돌려줍니다.
+    execute_read/execute_write는 드라이버처럼 트랜잭션 함수의 timeout을 호출마다 한 번만 읽고, 재시도할 수 있는
+    Neo4jError가 나면 retry_delay초 쉬었다가 다시 호출합니다. 그 밖의 예외는 재시도하지 않고 그대로 던집니다.
+    """
+    retry_delay = 0.0
+
+    def __init__(self, graph: FakeGraph, bookmarks: Bookmarks | None = None):
+        self._graph = graph
+        self.bookmarks = bookmarks
+        self._last = bookmarks or Bookmarks()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute_read(self, function, *args, **kwargs):
+        return self._execute(function, args, kwargs)
+
+    def execute_write(self, function, *args, **kwargs):
+        value = self._execute(function, args, kwargs)
+        self._commit()
+        return value
+
+    def _execute(self, function, args, kwargs):
+        timeout = getattr(function, "timeout", None)
+        while True:
+            try:
+                return function(FakeTransaction(self._graph, timeout), *args, **kwargs)
+            except Neo4jError as e:
+                if not e.is_retryable():
+                    raise
+            time.sleep(self.retry_delay)
+
+    def _commit(self) -> None:
+        self._graph.commits += 1
+        self._last = Bookmarks.from_raw_values({f"fake:{self._graph.commits}"})
+
+    def last_bookmarks(self) -> Bookmarks:
+        return self._last
+
+    def close(self) -> None:
+        pass
+
+    def run(self, query: str, parameters: dict[str, Any] | None = None, **kwparameters: Any) -> FakeResult:
+        return FakeResult(self._graph.run(query, parameters, **kwparameters))
+
+class FakeAsyncExplicitTransaction(FakeAsyncTransaction):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+class FakeAsyncSession(FakeSession):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute_read(self, function, *args, **kwargs):
+        return await self._execute_async(function, args, kwargs)
+
+    async def execute_write(self, function, *args, **kwargs):
+        value = await self._execute_async(function, args, kwargs)
+        self._commit()
+        return value
+
+    async def _execute_async(self, function, args, kwargs):
+        timeout = getattr(function, "timeout", None)
+        while True:
+            try:
+                return await function(FakeAsyncTransaction(self._graph, timeout), *args, **kwargs)
+            except Neo4jError as e:
+                if not e.is_retryable():
+                    raise
+            await asyncio.sleep(self.retry_delay)
+
+    async def begin_transaction(self, metadata: dict[str, Any] | None = None, timeout: float | None = None) -> FakeAsyncExplicitTransaction:
+        return FakeAsyncExplicitTransaction(self._graph)
+
+    async def last_bookmarks(self) -> Bookmarks:
+        return self._last
+
+    async def close(self) -> None:
+        pass
+
+class FakeDriver:
+    """
+    열린 세션 수와 마지막 세션의 북마크를 기록합니다. 같은 graph로 여러 개를 만들어 읽기 복제본 대역으로 씁니다.
+    """
+    def __init__(self, graph: FakeGraph, name: str = "primary"):
+        self.graph = graph
+        self.name = name
+        self.sessions = 0
+        self.last_session: FakeSession | None = None
+
+    def session(self, **config: Any) -> FakeSession:
+        self.sessions += 1
+        self.last_session = FakeSession(self.graph, config.get("bookmarks"))
+        return self.last_session
+
+    def close(self) -> None:
+        pass
+
+class FakeAsyncDriver(FakeDriver):
+    def session(self, **config: Any) -> FakeAsyncSession:
+        self.sessions += 1
+        self.last_session = FakeAsyncSession(self.graph, config.get("bookmarks"))
+        return self.last_session
+
+    async def close(self) -> None:
+        pass
+
+def install(graph: FakeGraph, read_replicas: int = 0) -> list[FakeAsyncDriver]:
+    """
+    database 모듈의 동기/비동기 드라이버를 graph를 쓰는 가짜 드라이버로 바꿉니다.
+    read_replicas개의 읽기 복제본 대역을 함께 설치하고 그 비동기 드라이버 목록을 반환합니다.
+    """
+    from saveplate import database
+    setattr(database, "__driver", FakeDriver(graph))
+    setattr(database, "__async_driver", FakeAsyncDriver(graph))
+    replicas = [FakeAsyncDriver(graph, f"replica-{i}") for i in range(read_replicas)]
+    database.set_read_replicas(
+        database.ReadReplicas([lambda i=i: FakeDriver(graph, f"replica-{i}") for i in range(read_replicas)]),
+        database.ReadReplicas([lambda driver=driver: driver for driver in replicas]),
+    )
+    return replicas
+
+def synthetic_catalog(graph: FakeGraph, recipes: int, rng: random.Random, ingredients: int | None = None) -> None:
+    """
+    재료 수가 레시피 수의 1/10(최소 50)인 카탈로그를 만듭니다. 재료 인기도는 지프 분포를 따라
+    자주 쓰이는 재료의 posting이 길어지도록 합니다.
+    """
+    count = ingredients or max(50, recipes // 10)
+    names = [f"ingredient-{i}" for i in range(count)]
+    weights = [1 / (i + 1) for i in range(count)]
+    graph.ingredients = {name: rng.random() for name in names}
+    graph.recipes = [
+        (f"food-{r // 3}", f"recipe-{r}", list(set(rng.choices(names, weights, k=rng.randint(3, 12)))))
+        for r in range(recipes)
+    ]
@@ -0,0 +1,266 @@
+"""
+서버 핫 패스의 마이크로 벤치마크입니다. Neo4j 없이 benchmarks.graph의 인메모리 그래프로 실행합니다.
+
+    python -m benchmarks.hot_paths [--sizes 1000 10000 100000] [--only auth recipes] [--json out.json]
+    python -m benchmarks.compare base.json head.json
+
+결과는 케이스마다 호출당 평균/p50/p99(마이크로초)와 초당 처리량이며, --json으로 저장해 커밋 간에 비교합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable
+
+for _key in ("DB_URL", "DB_USER", "DB_PW", "SECRET_KEY"):
+    os.environ.setdefault(_key, "benchmark")
+# 운영 중인 서버의 공유 캐시 파일을 건드리지 않도록 임시 파일을 씁니다.
+_SHARED_CACHE_PATH = os.path.join(tempfile.gettempdir(), f"saveplate-benchmark-{os.getpid()}")
+os.environ.setdefault("SHARED_CACHE_PATH", _SHARED_CACHE_PATH)
+os.environ.setdefault("SHARED_CACHE_SLOTS", "1024")
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "60000")
+
+from benchmarks.graph import FakeAsyncTransaction, FakeGraph, FakeTransaction, install, synthetic_catalog
+from benchmarks.fuzzy_autocompletion import synthetic_names
+from saveplate import auth, database
+from saveplate.completion import CompletionIndex
+from saveplate.matching import RecipeIndex, UserScores
+from saveplate.util import TTLCache, cached
+
+Case = dict[str, Any]
+
+def _summarize(name: str, latencies: list[float], **extra: Any) -> Case:
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "mean_us": round(mean * 1e6, 2),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 2),
+        "p99_us": round(latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1e6, 2),
+        "ops_per_second": round(1 / mean) if mean else None,
+        **extra,
+    }
+
+def measure(name: str, function: Callable[[], Any], calls: int, warmup: int = 100, **extra: Any) -> Case:
+    for _ in range(warmup):
+        function()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+    return _summarize(name, latencies, **extra)
+
+def measure_async(name: str, function: Callable[[], Awaitable[Any]], calls: int, warmup: int = 100, **extra: Any) -> Case:
+    async def run() -> list[float]:
+        for _ in range(warmup):
+            await function()
+        latencies = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            await function()
+            latencies.append(time.perf_counter() - started)
+        return latencies
+    return _summarize(name, asyncio.run(run()), **extra)
+
+def bench_auth(graph: FakeGraph, calls: int) -> list[Case]:
+    email = "bench@example.com"
+    graph.add_user(email, "unused")
+    token = auth.create_access_token({"sub": email})
+
+    def uncached_user():
+        auth.invalidate_user(email)
+        return auth.get_current_user(token)
+
+    def uncached_token():
+        auth._token_cache.clear()
+        return auth.decode_token(token)
+
+    return [
+        measure("auth.jwt_encode", lambda: auth.create_access_token({"sub": email}), calls),
+        measure("auth.jwt_decode", lambda: auth.jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]), calls),
+        measure("auth.decode_token.cached", lambda: auth.decode_token(token), calls),
+        measure("auth.decode_token.uncached", uncached_token, calls),
+        measure_async("auth.get_current_user.cached", lambda: auth.get_current_user(token), calls),
+        measure_async("auth.get_current_user.uncached", uncached_user, calls),
+        measure_async("auth.create_token_pair", lambda: auth.create_token_pair(email), calls),
+    ]
+
+def bench_autocompletion(sizes: list[int], calls: int, seed: int) -> list[Case]:
+    from saveplate.routers import autocompletion as route
+
+    cases = []
+    for size in sizes:
+        rng = random.Random(seed)
+        names = synthetic_names(size, rng)
+        index = CompletionIndex(((name, rng.random()) for name in names), top_n=20, max_prefix_length=16)
+        prefixes = [rng.choice(names)[:rng.randint(1, 2)] for _ in range(1024)]
+        queries = iter(prefixes * (calls // len(prefixes) + 2))
+        cases.append(measure("autocompletion.prefix", lambda: index.lookup(next(queries), 10), calls, size=size))
+        queries = iter(prefixes * (calls // len(prefixes) + 2))
+        cases.append(measure("autocompletion.fuzzy", lambda: index.lookup(next(queries), 10, fuzzy=True), calls, size=size))
+
+    # 라우트 함수의 캐시 적중 경로 (워커 캐시 + 공유 캐시 세대 확인)
+    route.completion_catalog._value = {"ingredient": index, "sauce": index}
+    cases.append(measure_async("autocompletion.route.cached", lambda: route.autocompletion("ingredient", "가", 10, False), calls))
+    return cases
+
+def bench_recipes(graph: FakeGraph, sizes: list[int], calls: int, seed: int) -> list[Case]:
+    cases = []
+    for size in sizes:
+        rng = random.Random(seed)
+        synthetic_catalog(graph, size, rng)
+        started = time.perf_counter()
+        index = RecipeIndex((food, recipe, names) for food, recipe, names in graph.recipes)
+        build_seconds = round(time.perf_counter() - started, 3)
+        ingredient_names = list(graph.ingredients)
+        pantries = [rng.sample(ingredient_names, 15) for _ in range(256)]
+        queries = iter(pantries * (calls // len(pantries) + 2))
+        cases.append(measure("recipes.match", lambda: index.match(next(queries), limit=20), calls, size=size, build_seconds=build_seconds))
+        queries = iter(pantries * (calls // len(pantries) + 2))
+        cases.append(measure("recipes.match.min_similarity", lambda: index.match(next(queries), limit=20, min_similarity=0.5), calls, size=size))
+
+        scores = UserScores(index, pantries[0])
+        cases.append(measure("recipes.user_scores.top", lambda: scores.top(limit=20), calls, size=size))
+        # 재료 하나를 추가하는 증분 갱신만 잽니다 (표는 미리 만들어 둡니다).
+        add_calls = max(1, calls // 10)
+        tables = iter([UserScores(index, pantries[i % len(pantries)]) for i in range(add_calls + 10)])
+        additions = iter([rng.choice(ingredient_names)] for _ in range(add_calls + 10))
+        cases.append(measure("recipes.user_scores.add", lambda: next(tables).add(next(additions)), add_calls, warmup=10, size=size))
+    return cases
+
+def bench_cache(calls: int) -> list[Case]:
+    @cached(ttl_seconds=60, maxsize=1024)
+    def sync_function(x: int) -> int:
+        return x
+
+    @cached(ttl_seconds=60, maxsize=1024)
+    async def async_function(x: int) -> int:
+        return x
+
+    @cached(ttl_seconds=60, maxsize=1024, shared="benchmark")
+    def shared_function(x: int) -> int:
+        return x
+
+    cache: TTLCache[int, int] = TTLCache(maxsize=1024, ttl_seconds=60)
+    cache.set(-1, 1)
+    keys = iter(range(10 ** 9))
+    return [
+        measure("cache.ttlcache.get", lambda: cache.get(-1), calls),
+        measure("cache.ttlcache.set", lambda: cache.set(next(keys), 1), calls),
+        measure("cache.cached.sync.hit", lambda: sync_function(1), calls),
+        measure_async("cache.cached.async.hit", lambda: async_function(1), calls),
+        measure("cache.cached.shared.hit", lambda: shared_function(1), calls),
+        # 워커 캐시를 비워 공유 캐시에서 읽는 경로
+        measure("cache.cached.shared.local_miss", lambda: (shared_function.cache.clear(), shared_function(1)), calls),
+    ]
+
+def bench_transactional(graph: FakeGraph, calls: int) -> list[Case]:
+    graph.add_user("tx@example.com")
+
+    def lookup(tx, email: str):
+        return tx.run("MATCH (u:User {email: $email}) RETURN u", email=email).single()
+
+    async def lookup_async(tx, email: str):
+        result = await tx.run("MATCH (u:User {email: $email}) RETURN u", email=email)
+        return await result.single()
+
+    wrapped = database.transactional("read")(lookup)
+    wrapped_async = database.async_transactional("read")(lookup_async)
+    tx = FakeTransaction(graph)
+    async_tx = FakeAsyncTransaction(graph)
+    return [
+        measure("transactional.baseline", lambda: lookup(tx, "tx@example.com"), calls),
+        measure("transactional.sync", lambda: wrapped("tx@example.com"), calls),
+        measure_async("transactional.async.baseline", lambda: lookup_async(async_tx, "tx@example.com"), calls),
+        measure_async("transactional.async", lambda: wrapped_async("tx@example.com"), calls),
+    ]
+
+def bench_records(graph: FakeGraph, calls: int) -> list[Case]:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from saveplate import records
+    from saveplate.routers import user as route
+
+    email = "records@example.com"
+    graph.add_user(email, "hash")
+    graph.pantries[email] = {f"ingredient-{i}": i + 1 for i in range(50)}
+    pantry = graph.run("MATCH (u:User)-[r:HAS]->(i) WHERE u.email=$user_email RETURN i, r.amount", user_email=email)
+    added = [{"u": graph.users[email], "i": {"name": name}, "amount": amount} for name, amount in graph.pantries[email].items()]
+    rows = [route._ingredient_from_record(record) for record in pantry]
+    adapter = TypeAdapter(list[dict[str, Any]])
+
+    def revalidated():
+        # 라우트가 리스트를 반환할 때 FastAPI가 하는 일: 반환 타입 검증 → jsonable_encoder → json.dumps
+        return json.dumps(jsonable_encoder(adapter.validate_python(rows))).encode()
+
+    return [
+        measure("records.pantry.decode", lambda: [route._ingredient_from_record(record) for record in pantry], calls, rows=len(pantry)),
+        measure("records.pantry.added.decode", lambda: [route._added_from_record(record) for record in added], calls, rows=len(added)),
+        measure("records.pantry.response", lambda: records.json_response(rows).body, calls, rows=len(rows)),
+        measure("records.pantry.response.revalidated", revalidated, calls, rows=len(rows)),
+    ]
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+GROUPS = ("auth", "autocompletion", "recipes", "cache", "transactional", "records")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    graph = FakeGraph()
+    install(graph)
+    results: list[Case] = []
+    if "auth" in args.only:
+        results += bench_auth(graph, args.calls)
+    if "autocompletion" in args.only:
+        results += bench_autocompletion(args.sizes, args.calls, args.seed)
+    if "recipes" in args.only:
+        results += bench_recipes(graph, args.sizes, args.calls, args.seed)
+    if "cache" in args.only:
+        results += bench_cache(args.calls)
+    if "transactional" in args.only:
+        results += bench_transactional(graph, args.calls)
+    if "records" in args.only:
+        results += bench_records(graph, args.calls)
+
+    print(f"{'case':<34} {'size':>8} {'mean(us)':>10} {'p50(us)':>10} {'p99(us)':>10} {'ops/s':>10}")
+    for r in results:
+        print(f"{r['name']:<34} {r.get('size', ''):>8} {r['mean_us']:>10} {r['p50_us']:>10} {r['p99_us']:>10} {r['ops_per_second']:>10}")
+    if args.json:
+        report = {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "arguments": sys.argv[1:],
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        if os.environ["SHARED_CACHE_PATH"] == _SHARED_CACHE_PATH and os.path.exists(_SHARED_CACHE_PATH):
+            os.remove(_SHARED_CACHE_PATH)
@@ -0,0 +1,152 @@
+"""
+라우터 앞에서 요청을 받을지 정하는 입장 제어(admission control)입니다.
+
+경로를 분류(auth: bcrypt를 쓰는 인증, catalog: 카탈로그/레시피 조회, pantry: 냉장고 읽기/쓰기)하고
+분류마다 동시에 처리할 요청 수를 AdaptiveLimit으로 제한합니다. 한도는 응답 시간을 보고 AIMD로 조절합니다.
+목표 지연 시간 안에 성공하면 조금씩 늘리고, 느리거나 5xx가 나면 곱으로 줄입니다.
+한도가 차면 요청을 쌓아 두지 않고 바로 503을 반환하므로, Neo4j가 느려져도 처리 중인 요청은 제시간에 끝납니다.
+
+비싼 엔드포인트에는 사용자별 토큰 버킷을 두어 한 사용자가 한도를 독차지하지 못하게 하고, 넘치면 429를 반환합니다.
+두 경우 모두 Retry-After 헤더를 붙이고 saveplate_requests_rejected_total{class,reason}을 올립니다.
+한도와 버킷은 워커 프로세스마다 따로 있습니다.
+"""
+from dataclasses import dataclass
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from saveplate import auth, metrics
+from saveplate.config import settings
+from saveplate.util import TTLCache
+import math
+import time
+
+# 느리거나 실패한 응답을 보면 한도에 곱할 값
+_BACKOFF = 0.9
+
+class AdaptiveLimit:
+    """
+    AIMD 동시 처리 한도입니다. 이벤트 루프에서만 호출하므로 잠금을 쓰지 않습니다.
+    :param target_seconds: 이보다 오래 걸린 응답은 과부하 신호로 봅니다. 한도는 이 시간에 한 번까지만 줄입니다.
+    """
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int, target_seconds: float):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, seconds: float, ok: bool) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        if not ok or seconds > self.target_seconds:
+            # 한꺼번에 느려진 요청들이 한도를 연달아 깎지 않도록 목표 시간에 한 번만 줄입니다.
+            if now - self._last_decrease >= self.target_seconds:
+                self.limit = max(self.minimum, self.limit * _BACKOFF)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # 한도를 절반 넘게 쓰고 있을 때만 늘립니다(한가할 때 한도가 끝없이 커지지 않도록).
+            # 한도만큼 성공하면 1 늘어납니다.
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.target_seconds))
+
+    def stats(self) -> dict[str, float]:
+        return {"limit": self.limit, "in_flight": self.in_flight}
+
+class TokenBuckets:
+    """
+    키(사용자)마다 초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷입니다.
+    가득 찰 만큼 시간이 지난 버킷은 없는 것과 같으므로 그 시간을 TTL로 두고 버립니다.
+    """
+    def __init__(self, rate: float, burst: int, maxsize: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: TTLCache[str, tuple[float, float]] = TTLCache(maxsize=maxsize, ttl_seconds=burst / rate)
+
+    def take(self, key: str) -> float:
+        """토큰을 하나 쓰고 0을 반환합니다. 토큰이 없으면 다음 토큰까지 기다려야 할 초를 반환합니다."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key) or (float(self.burst), now)
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+@dataclass(frozen=True)
+class RouteClass:
+    limit: AdaptiveLimit
+    # 사용자별 요청 제한. None이면 제한하지 않습니다.
+    buckets: TokenBuckets | None = None
+
+limits = {
+    "auth": AdaptiveLimit("auth", settings.ADMISSION_AUTH_CONCURRENCY, 1, settings.ADMISSION_AUTH_CONCURRENCY * 4, settings.ADMISSION_AUTH_TARGET_SECONDS),
+    "catalog": AdaptiveLimit("catalog", settings.ADMISSION_CATALOG_CONCURRENCY, 4, settings.ADMISSION_CATALOG_CONCURRENCY * 4, settings.ADMISSION_CATALOG_TARGET_SECONDS),
+    "pantry": AdaptiveLimit("pantry", settings.ADMISSION_PANTRY_CONCURRENCY, 2, settings.ADMISSION_PANTRY_CONCURRENCY * 4, settings.ADMISSION_PANTRY_TARGET_SECONDS),
+}
+
+_user_buckets = TokenBuckets(settings.USER_RATE_PER_SECOND, settings.USER_RATE_BURST)
+_AUTH = RouteClass(limits["auth"], TokenBuckets(settings.AUTH_RATE_PER_SECOND, settings.AUTH_RATE_BURST))
+_AUTOCOMPLETION = RouteClass(limits["catalog"])
+_RECIPES = RouteClass(limits["catalog"], _user_buckets)
+_PANTRY_READ = RouteClass(limits["pantry"])
+_PANTRY_WRITE = RouteClass(limits["pantry"], _user_buckets)
+
+def classify(method: str, path: str) -> RouteClass | None:
+    """경로의 분류를 반환합니다. 헬스 체크, 메트릭, 관리 엔드포인트처럼 제한하지 않는 경로는 None입니다."""
+    if path.startswith("/auth/"):
+        return _AUTH
+    if path.startswith("/autocompletion"):
+        return _AUTOCOMPLETION
+    if path.startswith("/recipes/") or path == "/user/recipes":
+        return _RECIPES
+    if path.startswith("/user/"):
+        return _PANTRY_READ if method == "GET" else _PANTRY_WRITE
+    return None
+
+def client_address(request: Request) -> str:
+    """
+    요청을 보낸 클라이언트의 주소입니다. 앞에 역방향 프록시나 로드 밸런서가 TRUSTED_PROXY_HOPS개 있으면
+    X-Forwarded-For에서 그 프록시들이 덧붙인 주소 중 가장 바깥쪽(오른쪽에서 TRUSTED_PROXY_HOPS번째)을 씁니다.
+    그보다 왼쪽 값은 클라이언트가 마음대로 넣을 수 있으므로 쓰지 않습니다.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [value.strip() for header in request.headers.getlist("x-forwarded-for") for value in header.split(",") if value.strip()]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+def client_key(request: Request) -> str:
+    """
+    토큰 버킷의 키입니다. 검증된 액세스 토큰이 있으면 사용자(sub), 없으면(로그인, 회원가입) 클라이언트 주소입니다.
+    서명이 올바르지 않은 토큰으로 버킷을 새로 만들 수 없도록 토큰은 검증한 뒤에만 씁니다.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = auth.decode_token(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except Exception:
+            pass
+    return f"client:{client_address(request)}"
+
+def rejection(status_code: int, route_class: str, reason: str, retry_after: float) -> JSONResponse:
+    # admission_control은 요청 시간 측정 미들웨어 바깥에 있어 거절한 응답이 request_seconds에 잡히지 않으므로 따로 셉니다.
+    metrics.requests_rejected.inc(route_class, reason)
+    return JSONResponse(
+        {"detail": "Too many requests" if status_code == 429 else "Server is busy"},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
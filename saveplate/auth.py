@@ -1,21 +1,23 @@
 from datetime import datetime, timedelta, UTC
 from jose import JWTError, jwt
 import neo4j
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
+from saveplate import records
 from saveplate.config import settings
-from saveplate.database import ManagedTransaction, transactional
-from typing import Literal
+from saveplate.database import AsyncManagedTransaction, async_transactional
+from saveplate.hashing import password_hasher
+from saveplate.util import TTLCache
+from typing import Any, Literal
 from datetime import date
+import time
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 class Token(BaseModel):
@@ -37,33 +39,47 @@ class User(BaseModel):
     class Config:
         from_attributes = True
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# 워커별 캐시: 이메일 → User, 토큰 → 검증된 클레임
+_user_cache: TTLCache[str, User] = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+_token_cache: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# 인증 경로마다 실행되는 쿼리. schema.HOT_QUERIES가 같은 문자열로 실행 계획을 확인합니다.
+GET_USER_QUERY = "MATCH (u:User {email: $email}) RETURN u"
+GET_USER_BY_REFRESH_TOKEN_QUERY = "MATCH (u:User {refresh_token: $refresh_token}) RETURN u"
+SAVE_REFRESH_TOKEN_QUERY = "MATCH (u:User {email: $email}) SET u.refresh_token = $refresh_token"
 
-@transactional("read")
-def get_user(tx: ManagedTransaction, email: str):
-    result = tx.run("MATCH (u:User {email: $email}) RETURN u", email=email)
-    user = result.single()
+def _user_from_node(node) -> User:
+    return User(**records.properties(node))
+
+@async_transactional("read")
+async def get_user(tx: AsyncManagedTransaction, email: str):
+    result = await tx.run(GET_USER_QUERY, email=email)
+    user = await result.single()
     if user:
-        user_data = dict(user["u"])
-        if "birth_date" in user_data and isinstance(user_data["birth_date"], neo4j.time.Date):
-            user_data["birth_date"] = date.fromisoformat(str(user_data["birth_date"]))
-        if "join_date" in user_data and isinstance(user_data["join_date"], neo4j.time.Date):
-            user_data["join_date"] = date.fromisoformat(str(user_data["join_date"]))
-        return User(**user_data)
+        return _user_from_node(user["u"])
     return None
 
-def authenticate_user(email: str, password: str):
-    user = get_user(email)
-    if not user:
-        return False
-    if not verify_password(password, user.hashed_password):
-        return False
+async def get_cached_user(email: str) -> User | None:
+    """
+    get_user 결과를 워커별 캐시에서 먼저 찾습니다. 인증이 필요한 요청마다 사용자 조회 쿼리가 나가지 않게 합니다.
+    """
+    user = _user_cache.get(email)
+    if user is None:
+        user = await get_user(email)
+        if user is not None:
+            _user_cache.set(email, user)
     return user
 
+def cache_stats() -> dict[str, dict[str, int]]:
+    return {"user": _user_cache.stats(), "token": _token_cache.stats()}
+
+def invalidate_user(email: str) -> None:
+    """
+    사용자 노드를 바꾸는 쓰기(비활성화, 프로필 수정 등) 뒤에 호출해 캐시된 User를 버립니다.
+    User에는 refresh_token 필드가 없으므로 리프레시 토큰만 바꾸는 쓰기에는 필요하지 않습니다.
+    """
+    _user_cache.pop(email)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -74,6 +90,20 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    JWT를 검증하고 클레임을 반환합니다. 검증된 토큰은 exp까지만 캐시합니다.
+
+    Raises:
+        JWTError: 서명이 올바르지 않거나 만료된 토큰
+    """
+    claims = _token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = claims.get("exp")
+        _token_cache.set(token, claims, exp - time.time() if exp is not None else None)
+    return claims
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,14 +111,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(email=token_data.email)
+    user = await get_cached_user(token_data.email)
     if user is None:
         raise credentials_exception
     return user
@@ -111,41 +141,89 @@ def create_refresh_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-@transactional("write")
-def save_refresh_token(tx: ManagedTransaction, email: str, refresh_token: str):
-    tx.run(
-        "MATCH (u:User {email: $email}) "
-        "SET u.refresh_token = $refresh_token",
-        email=email, refresh_token=refresh_token
-    )
+@async_transactional("write")
+async def save_refresh_token(tx: AsyncManagedTransaction, email: str, refresh_token: str):
+    await tx.run(SAVE_REFRESH_TOKEN_QUERY, email=email, refresh_token=refresh_token)
 
-@transactional("read")
-def get_user_by_refresh_token(tx: ManagedTransaction, refresh_token: str):
-    result = tx.run(
-        "MATCH (u:User {refresh_token: $refresh_token}) RETURN u",
-        refresh_token=refresh_token
-    )
-    user = result.single()
+@async_transactional("read")
+async def get_user_by_refresh_token(tx: AsyncManagedTransaction, refresh_token: str):
+    result = await tx.run(GET_USER_BY_REFRESH_TOKEN_QUERY, refresh_token=refresh_token)
+    user = await result.single()
     if user:
-        return User(**user["u"])
+        return _user_from_node(user["u"])
 
-def create_token_pair(email: str):
+def _new_token_pair(email: str) -> TokenPair:
     access_token = create_access_token(data={"sub": email})
     refresh_token = create_refresh_token(data={"sub": email})
-    save_refresh_token(email, refresh_token)
     return TokenPair(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
-@transactional("write")
-def create_user(tx: ManagedTransaction, email: str, password: str, name: str, gender: str | None = None, birth_date: date | None = None):
+async def create_token_pair(email: str):
+    pair = _new_token_pair(email)
+    await save_refresh_token(email, pair.refresh_token)
+    return pair
+
+@async_transactional("write")
+async def _complete_login(tx: AsyncManagedTransaction, email: str, refresh_token: str, new_hash: str | None) -> None:
+    if new_hash:
+        # 저장된 해시의 cost가 허용 범위 밖이면 리프레시 토큰과 같은 트랜잭션에서 새 해시로 바꿉니다.
+        await tx.run(
+            "MATCH (u:User {email: $email}) SET u.hashed_password = $hashed_password",
+            email=email, hashed_password=new_hash
+        )
+    await save_refresh_token(email, refresh_token)
+
+async def login(email: str, password: str) -> TokenPair | None:
+    """
+    사용자를 읽고 비밀번호를 확인한 뒤, 성공했을 때만 쓰기 트랜잭션을 열어 (필요하면) 해시 교체와 리프레시 토큰 저장을
+    함께 커밋합니다. bcrypt 검증과 토큰 발급은 트랜잭션 밖에서 한 번만 하므로, 드라이버가 재시도해도 다시 하지 않고
+    검증하는 동안 쓰기 연결을 잡고 있지 않습니다. 로그인한 사용자는 워커 캐시에 넣어 둡니다.
+    """
+    user = await get_user(email)
+    if user is None:
+        return None
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
+        return None
+    pair = _new_token_pair(user.email)
+    await _complete_login(user.email, pair.refresh_token, new_hash)
+    if new_hash:
+        user = user.model_copy(update={"hashed_password": new_hash})
+    _user_cache.set(user.email, user)
+    return pair
+
+@async_transactional("write")
+async def refresh(tx: AsyncManagedTransaction, refresh_token: str) -> TokenPair | None:
+    """리프레시 토큰으로 사용자를 찾고 새 토큰 쌍을 저장하는 과정을 한 트랜잭션으로 커밋합니다."""
+    user = await get_user_by_refresh_token(refresh_token)
+    if not user:
+        return None
+    return await create_token_pair(user.email)
+
+async def register(email: str, password: str, name: str, gender: str | None = None, birth_date: date | None = None) -> TokenPair:
+    """사용자를 만들고 토큰 쌍을 발급합니다. 생성과 리프레시 토큰 저장은 한 트랜잭션으로 커밋합니다."""
+    hashed_password = await password_hasher.hash(password)
+    pair = await _register(email, hashed_password, name, gender, birth_date)
+    invalidate_user(email)
+    return pair
+
+@async_transactional("write")
+async def _register(tx: AsyncManagedTransaction, email: str, hashed_password: str, name: str, gender: str | None = None, birth_date: date | None = None) -> TokenPair:
+    user = await _create_user(email, hashed_password, name, gender, birth_date)
+    return await create_token_pair(user.email)
+
+@async_transactional("write")
+async def _create_user(tx: AsyncManagedTransaction, email: str, hashed_password: str, name: str, gender: str | None = None, birth_date: date | None = None):
     # 이메일 중복 확인
-    existing_user = tx.run("MATCH (u:User {email: $email}) RETURN u", email=email).single()
+    existing = await tx.run(GET_USER_QUERY, email=email)
+    existing_user = await existing.single()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(password)
     join_date = date.today()
     
-    result = tx.run("""
+    # 동시에 같은 이메일로 가입하면 위 확인을 둘 다 통과할 수 있으므로 유일성 제약 조건 위반도 중복으로 처리합니다.
+    try:
+        result = await tx.run("""
     CREATE (u:User {
         email: $email,
         hashed_password: $hashed_password,
@@ -157,12 +235,11 @@ def create_user(tx: ManagedTransaction, email: str, password: str, name: str, ge
     })
     RETURN u
     """, email=email, hashed_password=hashed_password, name=name, gender=gender, birth_date=birth_date, join_date=join_date)
-    
-    user = result.single()
+        user = await result.single()
+    except neo4j.exceptions.ConstraintError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
     if user:
-        user_data = dict(user["u"])
-        user_data["birth_date"] = user_data["birth_date"].to_native() if user_data["birth_date"] else None
-        user_data["join_date"] = user_data["join_date"].to_native()
-        return User(**user_data)
+        return _user_from_node(user["u"])
     else:
         raise HTTPException(status_code=400, detail="Failed to create user")
@@ -0,0 +1,323 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Hashable, Iterable, Literal
+from saveplate import hangul, snapshot
+from saveplate.config import settings
+from saveplate.database import ManagedTransaction, transactional
+from saveplate.util import Reloadable
+import hashlib
+import heapq
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AutoCompletionType = Literal["ingredient"] | Literal["sauce"]
+
+AUTOCOMPLETION_LABELS: dict[AutoCompletionType, str] = {
+    "ingredient": "Ingredient",
+    "sauce": "Sauce",
+}
+
+CompletionEntries = dict[AutoCompletionType, list[tuple[str, float | None]]]
+
+_PREFIX_END = "\U0010ffff"
+
+def _rank(entry: tuple[str, float | None]):
+    name, popularity = entry
+    # Cypher의 ORDER BY ... DESC 와 같이 popularity가 null인 항목이 가장 앞에 옵니다.
+    return (popularity is not None, -(popularity or 0), name)
+
+class PrefixIndex:
+    """
+    이름 접두사 → popularity 상위 이름 목록을 미리 계산해 둔 인덱스입니다.
+
+    max_prefix_length 이하의 모든 접두사에 대해 상위 top_n개의 순위를 저장하므로
+    일반적인 조회는 딕셔너리 조회 한 번으로 끝납니다. 그보다 긴 접두사나 top_n보다 큰 limit은
+    정렬된 키 배열에서 범위를 찾아 처리합니다.
+    """
+    def __init__(
+        self,
+        entries: Iterable[tuple[str, float | None]],
+        *,
+        key: Callable[[str], str] | None = None,
+        top_n: int = 20,
+        max_prefix_length: int = 16,
+    ):
+        self.key = key or (lambda name: name)
+        self.top_n = top_n
+        self.max_prefix_length = max_prefix_length
+
+        ranked = sorted((entry for entry in entries if entry[0] is not None), key=_rank)
+        self.names: list[str] = [name for name, _ in ranked]
+
+        keys = [self.key(name) for name in self.names]
+        keyed = sorted(zip(keys, range(len(keys))))
+        self._keys: list[str] = [k for k, _ in keyed]
+        self._ranks: list[int] = [rank for _, rank in keyed]
+
+        self._top: dict[str, list[int]] = {}
+        for rank, k in enumerate(keys):
+            for length in range(min(len(k), max_prefix_length) + 1):
+                top = self._top.setdefault(k[:length], [])
+                if len(top) < top_n:
+                    top.append(rank)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        prefix로 시작하는 이름을 popularity 내림차순으로 최대 limit개 반환합니다.
+        """
+        k = self.key(prefix)
+        if limit <= self.top_n and len(k) <= self.max_prefix_length:
+            return [self.names[rank] for rank in self._top.get(k, ())[:limit]]
+        lo = bisect_left(self._keys, k)
+        hi = bisect_right(self._keys, k + _PREFIX_END, lo)
+        return [self.names[rank] for rank in heapq.nsmallest(limit, self._ranks[lo:hi])]
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    a와 b의 편집 거리를 계산합니다. max_distance를 넘으면 max_distance + 1을 반환합니다.
+    대각선 주변 폭 2 * max_distance + 1 의 띠만 계산하므로 O(len * max_distance) 입니다.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = max_distance + 1
+    previous = [j if j <= max_distance else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - max_distance)
+        hi = min(len(b), i + max_distance)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= max_distance else over
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost <= max_distance else over
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return over
+        previous = current
+    return previous[len(b)]
+
+# FuzzyIndex를 만들 때 변형의 해시를 나눠 정렬하는 구간 수(2의 거듭제곱)의 지수
+_HASH_BUCKET_BITS = 8
+
+def _deletes(key: str, max_distance: int) -> set[str]:
+    variants = {key}
+    frontier = {key}
+    for _ in range(max_distance):
+        frontier = {v[:i] + v[i + 1:] for v in frontier for i in range(len(v))}
+        variants |= frontier
+    return variants
+
+class FuzzyIndex:
+    """
+    오타를 허용하는 접두사 검색 인덱스입니다 (SymSpell 방식의 삭제 이웃 인덱스).
+
+    자동완성 입력은 이름의 앞부분이므로 이름 전체가 아니라 접두사와 비교합니다. 각 이름 키의 접두사
+    (min_length - max_distance ~ prefix_length 글자)마다 최대 max_distance개 글자를 지운 변형들을 미리 만들어 두고,
+    질의에서도 같은 변형을 만들어 겹치는 이름만 후보로 삼은 뒤 질의 길이 ± max_distance 길이의 접두사와의
+    편집 거리로 검증합니다.
+    변형은 해시값과 순위의 정렬된 배열로 저장하고, 변형 하나당 후보는 popularity 상위 max_candidates개로
+    제한하므로 조회 비용이 카탈로그 크기와 무관합니다.
+    """
+    def __init__(
+        self,
+        names: list[str],
+        *,
+        key: Callable[[str], str],
+        max_distance: int = 1,
+        prefix_length: int = 12,
+        max_candidates: int = 64,
+        min_length: int = 3,
+    ):
+        self.names = names
+        self.key = key
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.max_candidates = max_candidates
+        self.min_length = min_length
+        self.keys = [key(name) for name in names]
+
+        # 키 접두사의 삭제 변형은 키(앞 prefix_length 글자)의 삭제 변형의 접두사와 같습니다. 질의의 변형은
+        # min_length - max_distance 글자보다 짧지 않으므로 그보다 짧은 변형은 넣지 않습니다.
+        # 변형의 해시를 상위 비트로 나눈 구간마다 배열에 모은 뒤 구간별로 정렬해 이어 붙이므로, 정렬에 필요한
+        # 임시 메모리가 한 구간 크기로 제한됩니다. 이름을 순위 순으로 넣고 안정 정렬하므로 같은 해시 안에서는
+        # 순위(popularity) 오름차순이 유지됩니다.
+        shortest = max(1, min_length - max_distance)
+        shift = sys.hash_info.width - _HASH_BUCKET_BITS
+        offset = 1 << (_HASH_BUCKET_BITS - 1)
+        bucket_hashes = [array("q") for _ in range(1 << _HASH_BUCKET_BITS)]
+        bucket_ranks = [array("I") for _ in range(1 << _HASH_BUCKET_BITS)]
+        for rank, k in enumerate(self.keys):
+            variants = {v[:length] for v in _deletes(k[:prefix_length], max_distance) for length in range(shortest, len(v) + 1)}
+            for variant in variants:
+                h = hash(variant)
+                bucket = (h >> shift) + offset
+                bucket_hashes[bucket].append(h)
+                bucket_ranks[bucket].append(rank)
+        self._hashes = array("q")
+        self._ranks = array("I")
+        for hashes, ranks in zip(bucket_hashes, bucket_ranks):
+            order = sorted(range(len(hashes)), key=hashes.__getitem__)
+            self._hashes.extend(map(hashes.__getitem__, order))
+            self._ranks.extend(map(ranks.__getitem__, order))
+
+    def lookup(self, text: str, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        text와 편집 거리가 max_distance 이하인 접두사를 가진 이름을 (이름, 거리) 형태로 거리, popularity 순으로 반환합니다.
+        예를 들어 "양베"는 "양배추"의 접두사 "양배"와 거리 1이므로 "양배추"를 찾습니다.
+        """
+        k = self.key(text)[:self.prefix_length]
+        if len(k) < self.min_length:
+            return []
+        candidates: set[int] = set()
+        for variant in _deletes(k, self.max_distance):
+            h = hash(variant)
+            lo = bisect_left(self._hashes, h)
+            hi = bisect_right(self._hashes, h, lo, min(lo + self.max_candidates, len(self._hashes)))
+            candidates.update(self._ranks[lo:hi])
+
+        scored = []
+        lengths = range(len(k) - self.max_distance, len(k) + self.max_distance + 1)
+        for rank in candidates:
+            key = self.keys[rank]
+            distance = min(bounded_levenshtein(k, key[:length], self.max_distance) for length in lengths)
+            if distance <= self.max_distance:
+                scored.append((distance, rank))
+        return [(self.names[rank], distance) for distance, rank in heapq.nsmallest(limit, scored)]
+
+class CompletionIndex:
+    """
+    한글 입력 중간 상태까지 고려한 자동완성 인덱스입니다.
+
+    이름을 낱자 자모로 분해한 키("감자" → "ㄱㅏㅁㅈㅏ")와 초성 키("ㄱㅈ") 두 가지로 접두사 인덱스를 만듭니다.
+    "감ㅈ"처럼 음절이 덜 완성된 입력은 자모 키로, "ㄱㅈ"처럼 자음만 있는 입력은 초성 키로 찾습니다.
+    한글이 아닌 문자는 분해해도 그대로이므로 일반 접두사 검색도 자모 키로 처리됩니다.
+    """
+    def __init__(
+        self,
+        entries: Iterable[tuple[str, float | None]],
+        *,
+        top_n: int,
+        max_prefix_length: int,
+        fuzzy_max_distance: int = 1,
+        fuzzy: bool = True,
+    ):
+        entries = list(entries)
+        self.jamo = PrefixIndex(entries, key=hangul.decompose, top_n=top_n, max_prefix_length=max_prefix_length)
+        self.chosung = PrefixIndex(entries, key=hangul.chosung, top_n=top_n, max_prefix_length=max_prefix_length)
+        self.fuzzy_max_distance = fuzzy_max_distance
+        self.fuzzy: FuzzyIndex | None = None
+        if fuzzy:
+            self.build_fuzzy()
+
+    def build_fuzzy(self) -> None:
+        """
+        오타 검색용 FuzzyIndex를 만듭니다. 접두사 인덱스보다 훨씬 오래 걸리므로 나중에 따로 만들 수 있고,
+        만들기 전에는 fuzzy 조회도 접두사가 일치하는 이름만 반환합니다.
+        """
+        self.fuzzy = FuzzyIndex(self.jamo.names, key=hangul.decompose, max_distance=self.fuzzy_max_distance)
+
+    def __len__(self) -> int:
+        return len(self.jamo)
+
+    def lookup(self, prefix: str, limit: int = 10, fuzzy: bool = False) -> list[str]:
+        """
+        fuzzy가 참이면 접두사가 일치하는 이름을 먼저 두고(거리 0),
+        남은 자리를 편집 거리가 가까운 이름으로 채웁니다.
+        """
+        index = self.chosung if hangul.is_chosung_only(prefix) else self.jamo
+        names = index.lookup(prefix, limit)
+        if fuzzy and self.fuzzy is not None and len(names) < limit:
+            seen = set(names)
+            for name, _ in self.fuzzy.lookup(prefix, limit):
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+                    if len(names) == limit:
+                        break
+        return names
+
+def _load_label(tx: ManagedTransaction, label: str) -> list[tuple[str, float | None]]:
+    result = tx.run(f"MATCH (n:{label}) RETURN n.name AS name, n.popularity AS popularity")
+    return [(record["name"], record["popularity"]) for record in result]
+
+def build_completion_index(entries: Iterable[tuple[str, float | None]], fuzzy: bool = True) -> CompletionIndex:
+    return CompletionIndex(
+        entries,
+        top_n=settings.AUTOCOMPLETION_TOP_N,
+        max_prefix_length=settings.AUTOCOMPLETION_MAX_PREFIX_LENGTH,
+        fuzzy_max_distance=settings.AUTOCOMPLETION_FUZZY_MAX_DISTANCE,
+        fuzzy=fuzzy,
+    )
+
+@transactional("read")
+def load_completion_entries(tx: ManagedTransaction) -> CompletionEntries:
+    return {type: _load_label(tx, label) for type, label in AUTOCOMPLETION_LABELS.items()}
+
+def read_completion_entries() -> CompletionEntries:
+    snap = snapshot.current()
+    if snap is not None:
+        return {type: snap.completion_entries(type) for type in AUTOCOMPLETION_LABELS}
+    return load_completion_entries()
+
+def build_completion_indexes(entries: CompletionEntries) -> dict[AutoCompletionType, CompletionIndex]:
+    """
+    자동완성 인덱스는 스냅숏을 써도 워커마다 만듭니다. 처음 로드할 때는 기동과 첫 요청을 오래 막지 않도록
+    접두사 인덱스만 만들고 FuzzyIndex는 백그라운드 스레드에서 만듭니다. 다시 로드할 때는 이미 갱신 스레드에서
+    실행 중이고 만드는 동안 이전 인덱스가 계속 쓰이므로 바로 만듭니다.
+    """
+    initial = not completion_catalog.loaded
+    indexes = {type: build_completion_index(names, fuzzy=not initial) for type, names in entries.items()}
+    if initial:
+        threading.Thread(target=_build_fuzzy_indexes, args=(indexes,), name="build-fuzzy-autocompletion", daemon=True).start()
+    return indexes
+
+def _build_fuzzy_indexes(indexes: dict[AutoCompletionType, CompletionIndex]) -> None:
+    started = time.perf_counter()
+    try:
+        for index in indexes.values():
+            index.build_fuzzy()
+    except Exception as e:
+        logger.error(f"Failed to build fuzzy autocompletion index: {str(e)}")
+        return
+    logger.info(f"fuzzy autocompletion index built in {time.perf_counter() - started:.3f}s")
+
+def completion_digest(entries: CompletionEntries) -> str:
+    # 워커마다 읽은 순서가 달라도 내용이 같으면 같은 값이 되도록 정렬한 뒤 해시합니다.
+    ranked = {type: sorted((entry for entry in entries[type] if entry[0] is not None), key=_rank) for type in sorted(entries)}
+    return hashlib.blake2b(repr(ranked).encode(), digest_size=16).hexdigest()
+
+# 스냅숏을 쓰면 popularity도 스냅숏 버전이 바뀔 때만 달라지므로 그때만 다시 만듭니다.
+# 스냅숏이 없으면 주기마다 이름과 popularity만 다시 읽고, digest가 바뀌었을 때만 인덱스를 다시 만듭니다.
+completion_catalog = Reloadable(
+    "autocompletion index",
+    read_completion_entries,
+    interval_seconds=settings.COMPLETION_REFRESH_SECONDS,
+    fingerprint=snapshot.fingerprint if settings.CATALOG_SNAPSHOT_PATH else None,
+    digest=completion_digest,
+    build=build_completion_indexes,
+)
+
+def get_completion_index(type: AutoCompletionType) -> CompletionIndex:
+    return completion_catalog.get()[type]
+
+def completion_version() -> Hashable:
+    """
+    자동완성 결과 캐시의 버전입니다. FuzzyIndex가 만들어지기 전의 결과가 캐시에 남지 않도록 준비 여부를 함께 씁니다.
+    """
+    key = completion_catalog.key()
+    return key, all(index.fuzzy is not None for index in completion_catalog.get().values())
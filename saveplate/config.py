@@ -6,7 +6,104 @@ class Settings(BaseSettings):
     DB_PW: str
     SECRET_KEY: str
 
+    # 읽기 트랜잭션을 나눠 보낼 Neo4j 주소 (쉼표로 구분). 비어 있으면 읽기도 DB_URL로 보냅니다.
+    DB_READ_URLS: str = ""
+
+    # Neo4j 연결 풀 (워커 프로세스와 드라이버마다 따로 있습니다): 최대 연결 수, 풀에서 연결을 기다리는 최대 시간,
+    # 연결 최대 수명, 새 연결을 맺는 제한 시간, 이보다 오래 쉰 연결은 쓰기 전에 확인하는 시간(없으면 확인하지 않음)
+    DB_MAX_POOL_SIZE: int = 100
+    DB_CONNECTION_ACQUISITION_TIMEOUT_SECONDS: float = 60
+    DB_MAX_CONNECTION_LIFETIME_SECONDS: float = 60 * 60
+    DB_CONNECTION_TIMEOUT_SECONDS: float = 30
+    DB_LIVENESS_CHECK_SECONDS: float | None = None
+    # 시작할 때 워커마다 미리 열어 둘 연결 수와, 준비됨으로 볼 풀마다의 최소 연결 수(없으면 DB_WARM_CONNECTIONS개 모두).
+    # 모자라면 /health/ready는 503이고 백그라운드에서 다시 시도합니다.
+    DB_WARM_CONNECTIONS: int = 8
+    DB_WARM_MIN_CONNECTIONS: int | None = None
+
+    # 요청 마감 시간(기본값과 라우트별 값). 지나면 Neo4j 트랜잭션을 끝내고 504를 반환합니다.
+    REQUEST_DEADLINE_SECONDS: float = 10
+    RECIPE_DEADLINE_SECONDS: float = 3
+    USER_DEADLINE_SECONDS: float = 3
+    AUTOCOMPLETION_DEADLINE_SECONDS: float = 1
+
+    # 입장 제어: 경로 분류별 동시 처리 한도의 초기값(최대 4배까지 늘어납니다)과 목표 지연 시간.
+    # 목표보다 느린 응답이나 5xx를 보면 한도를 줄이고, 한도가 차면 503을 반환합니다.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_AUTH_CONCURRENCY: int = 8
+    ADMISSION_AUTH_TARGET_SECONDS: float = 1
+    ADMISSION_CATALOG_CONCURRENCY: int = 64
+    ADMISSION_CATALOG_TARGET_SECONDS: float = 0.5
+    ADMISSION_PANTRY_CONCURRENCY: int = 32
+    ADMISSION_PANTRY_TARGET_SECONDS: float = 0.5
+    # 사용자(로그인 전에는 클라이언트 주소)별 초당 요청 수와 버스트. 넘으면 429를 반환합니다.
+    USER_RATE_PER_SECOND: float = 10
+    USER_RATE_BURST: int = 20
+    AUTH_RATE_PER_SECOND: float = 1
+    AUTH_RATE_BURST: int = 10
+    # 서버 앞의 역방향 프록시/로드 밸런서 수. 0보다 크면 로그인 전 요청의 클라이언트 주소를 X-Forwarded-For에서 읽습니다.
+    # 프록시 뒤에서 0으로 두면 모든 로그인 요청이 프록시 주소 하나의 버킷을 나눠 씁니다.
+    TRUSTED_PROXY_HOPS: int = 0
+
+    # 레시피 카탈로그(인메모리 인덱스) 갱신 주기
+    CATALOG_REFRESH_SECONDS: float = 60
+    CATALOG_MAX_AGE_SECONDS: float = 60 * 60
+    # python -m saveplate.snapshot export 로 만든 카탈로그 스냅숏 경로. 설정하면 워커는 이 파일을 mmap하고
+    # Neo4j에는 새 스냅숏 버전만 확인합니다.
+    CATALOG_SNAPSHOT_PATH: str | None = None
+    # 자동완성 인덱스 갱신 주기 (popularity 변화를 반영하기 위해 주기적으로 전체를 다시 읽습니다)
+    COMPLETION_REFRESH_SECONDS: float = 60 * 5
+    # 접두사마다 미리 저장할 상위 이름 수와 저장할 최대 접두사 길이(자모 단위). 워커당 메모리 상한을 정합니다.
+    AUTOCOMPLETION_TOP_N: int = 20
+    AUTOCOMPLETION_MAX_PREFIX_LENGTH: int = 16
+    # fuzzy 자동완성에서 허용할 최대 편집 거리(자모 단위)
+    AUTOCOMPLETION_FUZZY_MAX_DISTANCE: int = 1
+
+    # 인증된 사용자(User)와 검증된 토큰 클레임의 워커별 캐시
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60
+    TOKEN_CACHE_SIZE: int = 10_000
+    TOKEN_CACHE_TTL_SECONDS: float = 60 * 5
+
+    # bcrypt 전용 프로세스 풀 크기와 대기열 상한(넘으면 503)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # 시작 시 로그인 한 번의 해시 시간 예산에 맞춰 bcrypt cost를 이 범위에서 고릅니다.
+    PASSWORD_HASH_BUDGET_MS: float = 250
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 15
+    # 저장된 해시의 cost가 보정값과 이만큼까지 다르면 다시 해시하지 않습니다 (워커/노드마다 보정값이 다를 수 있으므로).
+    PASSWORD_HASH_ROUNDS_TOLERANCE: int = 1
+
+    # 워커 프로세스 간 공유 캐시 (기본 경로는 /dev/shm 아래, 파일 이름에 DB_URL과 DB_USER의 해시가 들어갑니다)
+    SHARED_CACHE_PATH: str | None = None
+    SHARED_CACHE_SLOTS: int = 8192
+    SHARED_CACHE_SLOT_SIZE: int = 8192
+    RECIPE_CACHE_TTL_SECONDS: float = 60
+
+    # 사용자별 레시피 유사도 표의 워커별 캐시 (재료가 바뀌면 버전으로 무효화되므로 TTL은 안전망입니다).
+    # 표 하나는 재료가 겹치는 레시피마다 약 200바이트를 쓰고 카탈로그 크기까지 커질 수 있으므로, 사용자 수와 함께
+    # 모든 표의 레시피 수 합(USER_SCORE_CACHE_MAX_RECIPES, 기본값은 워커당 약 100MiB)으로도 제한합니다.
+    USER_SCORE_CACHE_SIZE: int = 1_000
+    USER_SCORE_CACHE_MAX_RECIPES: int = 500_000
+    USER_SCORE_CACHE_TTL_SECONDS: float = 60 * 10
+
+    # 시작 시 인덱스가 ONLINE이 되기를 기다리는 시간과 실행 계획 확인 여부
+    SCHEMA_INDEX_TIMEOUT_SECONDS: float = 300
+    SCHEMA_VERIFY_PLANS: bool = True
+
+    # NDJSON 스트리밍 응답에서 Neo4j로부터 한 번에 당겨 올 레코드 수와 한 번에 보낼 행 수
+    STREAM_FETCH_SIZE: int = 100
+    STREAM_CHUNK_ROWS: int = 32
+
+    # 슬로 쿼리 로그: 임계값, 보관 개수, 실행 계획을 캡처할 비율
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_PROFILE_SAMPLE_RATE: float = 0.1
+    # /admin 엔드포인트의 X-Admin-Token 값. 설정하지 않으면 /admin 엔드포인트를 쓸 수 없습니다.
+    ADMIN_TOKEN: str | None = None
+
     class Config:
         env_file = '.env'
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
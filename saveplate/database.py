@@ -1,18 +1,134 @@
 from neo4j import GraphDatabase, Driver, ManagedTransaction, Session
-from typing import Optional, Callable, Concatenate, Literal, Generator
-from contextlib import contextmanager
-from functools import wraps
+from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncManagedTransaction, AsyncSession, Bookmarks, Record, READ_ACCESS, unit_of_work
+from neo4j.exceptions import Neo4jError
+from typing import Optional, Callable, Concatenate, Literal, Generator, AsyncGenerator, Awaitable, Coroutine, Any, Iterable
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+from saveplate import deadlines, metrics, slowlog
+from saveplate.config import settings
+import asyncio
 import inspect
+import itertools
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
 __driver: Optional[Driver] = None
+__async_driver: Optional[AsyncDriver] = None
+# 드라이버를 만든 프로세스와 인자. fork된 자식은 상속한 드라이버를 버리고 같은 인자로 새로 만듭니다.
+_driver_pid: int | None = None
+_async_driver_pid: int | None = None
+_driver_arguments: tuple[str, tuple[str, str], dict[str, Any]] | None = None
+_async_driver_arguments: tuple[str, tuple[str, str], dict[str, Any]] | None = None
 
-def initialize(url: str, auth: tuple[str, str]) -> Driver:
-    global __driver
+# warm_up_async()가 끝나면 참이 됩니다. 준비 상태(readiness) 확인에 사용합니다.
+pool_ready = False
+
+def driver_config() -> dict[str, Any]:
+    """config.Settings의 연결 풀 설정을 드라이버 인자로 바꿉니다."""
+    config: dict[str, Any] = {
+        "max_connection_pool_size": settings.DB_MAX_POOL_SIZE,
+        "connection_acquisition_timeout": settings.DB_CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+        "max_connection_lifetime": settings.DB_MAX_CONNECTION_LIFETIME_SECONDS,
+        "connection_timeout": settings.DB_CONNECTION_TIMEOUT_SECONDS,
+        "keep_alive": True,
+    }
+    if settings.DB_LIVENESS_CHECK_SECONDS is not None:
+        config["liveness_check_timeout"] = settings.DB_LIVENESS_CHECK_SECONDS
+    return config
+
+def _forget_inherited_drivers() -> None:
+    # fork된 자식은 부모와 소켓을 공유하므로 닫지 않고(GOODBYE를 보내면 부모 연결이 끊깁니다) 참조만 버립니다.
+    global __driver, __async_driver, pool_ready
+    if _driver_pid is not None and _driver_pid != os.getpid():
+        __driver = None
+    if _async_driver_pid is not None and _async_driver_pid != os.getpid():
+        __async_driver = None
+    pool_ready = False
+
+os.register_at_fork(after_in_child=_forget_inherited_drivers)
+
+def _get_driver() -> Driver:
+    global __driver, _driver_pid
+    if __driver is None and _driver_arguments is not None:
+        url, auth, config = _driver_arguments
+        __driver = GraphDatabase.driver(url, auth=auth, **config)
+        _driver_pid = os.getpid()
+        logger.info(f"Database driver recreated in process {_driver_pid}")
+    return __driver
+
+def _get_async_driver() -> AsyncDriver:
+    global __async_driver, _async_driver_pid
+    if __async_driver is None and _async_driver_arguments is not None:
+        url, auth, config = _async_driver_arguments
+        __async_driver = AsyncGraphDatabase.driver(url, auth=auth, **config)
+        _async_driver_pid = os.getpid()
+        logger.info(f"Async database driver recreated in process {_async_driver_pid}")
+    return __async_driver
+
+class ReadReplicas:
+    """
+    읽기 트랜잭션을 나눠 받을 드라이버들입니다. 세션을 열 때마다 차례대로(round-robin) 하나를 고릅니다.
+    factories로 드라이버를 만들므로, fork된 자식은 상속한 드라이버를 닫지 않고 버린 뒤 새로 만듭니다.
+    테스트에서는 드라이버 대역을 돌려주는 함수를 넘기면 됩니다.
+    """
+    def __init__(self, factories: Iterable[Callable[[], Any]]):
+        self._factories = list(factories)
+        self._drivers: list[Any] | None = None
+        self._pid: int | None = None
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def drivers(self) -> list[Any]:
+        if self._drivers is None or self._pid != os.getpid():
+            self._drivers = [factory() for factory in self._factories]
+            self._pid = os.getpid()
+        return self._drivers
+
+    def pick(self) -> Any:
+        drivers = self.drivers()
+        return drivers[next(self._counter) % len(drivers)] if drivers else None
+
+    def opened(self) -> list[Any]:
+        # 이 프로세스에서 이미 만든 드라이버만 (닫을 때 새로 만들지 않도록)
+        return self._drivers if self._drivers is not None and self._pid == os.getpid() else []
+
+_read_replicas = ReadReplicas(())
+_async_read_replicas = ReadReplicas(())
+
+def initialize_read_replicas(urls: Iterable[str], auth: tuple[str, str], **config: Any) -> None:
+    """
+    읽기 트랜잭션을 urls의 인스턴스로 보냅니다. 쓰기는 계속 initialize()의 주 인스턴스로 갑니다.
+    드라이버는 처음 쓸 때 만듭니다.
+    """
+    config = {**driver_config(), **config}
+    urls = list(urls)
+    set_read_replicas(
+        ReadReplicas([partial(GraphDatabase.driver, url, auth=auth, **config) for url in urls]),
+        ReadReplicas([partial(AsyncGraphDatabase.driver, url, auth=auth, **config) for url in urls]),
+    )
+    logger.info(f"Routing read transactions to {len(urls)} read endpoints")
+
+def set_read_replicas(replicas: ReadReplicas, async_replicas: ReadReplicas) -> None:
+    global _read_replicas, _async_read_replicas
+    _read_replicas = replicas
+    _async_read_replicas = async_replicas
+
+def initialize(url: str, auth: tuple[str, str], **config: Any) -> Driver:
+    """
+    :param config: driver_config()의 풀 설정을 덮어쓸 드라이버 설정
+    """
+    global __driver, _driver_pid, _driver_arguments
     try:
-        __driver = GraphDatabase.driver(url, auth=auth)
+        config = {**driver_config(), **config}
+        __driver = GraphDatabase.driver(url, auth=auth, **config)
+        _driver_pid = os.getpid()
+        _driver_arguments = (url, auth, config)
         __driver.verify_connectivity()
         logger.info("Database driver initialized successfully")
         return __driver
@@ -20,11 +136,78 @@ def initialize(url: str, auth: tuple[str, str]) -> Driver:
         logger.error(f"Failed to initialize database driver: {str(e)}")
         raise
 
+async def initialize_async(url: str, auth: tuple[str, str], **config: Any) -> AsyncDriver:
+    global __async_driver, _async_driver_pid, _async_driver_arguments
+    try:
+        config = {**driver_config(), **config}
+        __async_driver = AsyncGraphDatabase.driver(url, auth=auth, **config)
+        _async_driver_pid = os.getpid()
+        _async_driver_arguments = (url, auth, config)
+        await __async_driver.verify_connectivity()
+        logger.info("Async database driver initialized successfully")
+        return __async_driver
+    except Exception as e:
+        logger.error(f"Failed to initialize async database driver: {str(e)}")
+        raise
+
+async def warm_up_async(connections: int, database: str = "neo4j", minimum: int | None = None) -> int:
+    """
+    비동기 드라이버(읽기 복제본 포함)의 풀마다 연결을 connections개까지 미리 열어 둡니다. 배포 직후 첫 요청들이
+    연결을 맺는 비용(TCP, TLS, 인증)을 치르지 않게 합니다. 트랜잭션을 동시에 열어 두어야 서로 다른 연결을 받으므로
+    모두 연 뒤에 한꺼번에 닫습니다. 실제로 연 연결 수를 반환합니다.
+    모든 풀에서 minimum개(None이면 connections개) 이상 열었을 때만 pool_ready를 참으로 바꿉니다.
+    """
+    global pool_ready
+
+    async def open_transaction(session: AsyncSession) -> Any:
+        tx = await session.begin_transaction()
+        await (await tx.run("RETURN 1")).consume()
+        return tx
+
+    started = time.perf_counter()
+    drivers = [_get_async_driver(), *_async_read_replicas.drivers()]
+    sessions = [
+        driver.session(database=database, default_access_mode=READ_ACCESS)
+        for driver in drivers
+        for _ in range(connections)
+    ]
+    opened = await asyncio.gather(*(open_transaction(session) for session in sessions), return_exceptions=True)
+    per_driver = [0] * len(drivers)
+    for i, result in enumerate(opened):
+        if isinstance(result, BaseException):
+            logger.warning(f"Failed to open a connection while warming up the pool: {type(result).__name__}")
+            continue
+        per_driver[i // connections] += 1
+        await result.rollback()
+    for session in sessions:
+        await session.close()
+    warmed = sum(per_driver)
+    required = connections if minimum is None else min(minimum, connections)
+    pool_ready = all(count >= required for count in per_driver)
+    logger.info(f"Warmed up {warmed}/{len(sessions)} database connections in {time.perf_counter() - started:.3f}s")
+    if not pool_ready:
+        logger.warning(f"Database pool is not ready: {per_driver} connections per pool, {required} required")
+    return warmed
+
+async def warm_up_until_ready(connections: int, minimum: int | None = None, retry_seconds: float = 5.0) -> None:
+    """pool_ready가 될 때까지 retry_seconds마다 warm_up_async를 다시 시도합니다. 시작 시 웜업이 모자랐을 때 백그라운드에서 실행합니다."""
+    while not pool_ready:
+        await asyncio.sleep(retry_seconds)
+        try:
+            await warm_up_async(connections, minimum=minimum)
+        except Exception as e:
+            logger.warning(f"Failed to warm up the database pool: {type(e).__name__}")
+
 def close() -> None:
-    global __driver
+    global __driver, _driver_arguments
+    for replica in _read_replicas.opened():
+        replica.close()
     if __driver is not None:
         try:
-            __driver.close()
+            if _driver_pid == os.getpid():
+                __driver.close()
+            __driver = None
+            _driver_arguments = None
             logger.info("Database driver closed successfully")
         except Exception as e:
             logger.error(f"Error while closing database driver: {str(e)}")
@@ -33,29 +216,471 @@ def close() -> None:
         logger.warning("Attempted to close uninitialized database driver")
         raise Exception("Driver is not initialized.")
 
+async def close_async() -> None:
+    global __async_driver, _async_driver_arguments, pool_ready
+    pool_ready = False
+    for replica in _async_read_replicas.opened():
+        await replica.close()
+    if __async_driver is not None:
+        try:
+            if _async_driver_pid == os.getpid():
+                await __async_driver.close()
+            __async_driver = None
+            _async_driver_arguments = None
+            logger.info("Async database driver closed successfully")
+        except Exception as e:
+            logger.error(f"Error while closing async database driver: {str(e)}")
+            raise
+    else:
+        logger.warning("Attempted to close uninitialized async database driver")
+        raise Exception("Async driver is not initialized.")
+
 @contextmanager
 def useSession(driver: Driver | None = None, database: str = "neo4j") -> Generator[Session, None, None]:
     if driver is None:
-        global __driver
-        driver = __driver
+        driver = _get_driver()
     with driver.session(database=database) as session:
         yield session
 
+@asynccontextmanager
+async def useAsyncSession(driver: AsyncDriver | None = None, database: str = "neo4j", **config: Any) -> AsyncGenerator[AsyncSession, None]:
+    """
+    :param config: fetch_size, default_access_mode 등 driver.session()에 넘길 세션 설정
+    """
+    if driver is None:
+        driver = _get_async_driver()
+    async with driver.session(database=database, **config) as session:
+        yield session
+
 TransactionType = Literal["read"] | Literal["write"]
 
+# 쓰기 뒤의 북마크를 응답에 싣고, 클라이언트가 다음 요청에 돌려보내는 헤더 (쉼표로 구분)
+BOOKMARK_HEADER = "X-Neo4j-Bookmark"
+_MAX_BOOKMARKS = 8
+_MAX_BOOKMARK_LENGTH = 256
+
+class _RequestSession:
+    """
+    요청 하나의 비동기 세션입니다. 첫 트랜잭션에서 열고, 같은 요청의 트랜잭션은 lock으로 차례대로 씁니다.
+    읽기 복제본이 있으면 읽기용 세션을 따로 엽니다. 두 세션 모두 bookmarks(클라이언트가 보낸 북마크와 이 요청에서
+    커밋한 쓰기의 북마크)에 도달한 뒤에 트랜잭션을 시작하므로, 사용자는 자기가 쓴 내용을 항상 읽습니다.
+    """
+    def __init__(self, bookmarks: Iterable[str] = ()):
+        self.session: AsyncSession | None = None
+        self.read_session: AsyncSession | None = None
+        self.bookmarks: frozenset[str] = frozenset(bookmarks)
+        # 이 요청에서 쓰기를 커밋했으면 마지막 쓰기 뒤의 북마크
+        self.written: frozenset[str] | None = None
+        self.transactions = 0
+        self.lock = asyncio.Lock()
+
+    def session_config(self) -> dict[str, Any]:
+        return {"bookmarks": Bookmarks.from_raw_values(self.bookmarks)} if self.bookmarks else {}
+
+_request_session: ContextVar[_RequestSession | None] = ContextVar("saveplate_request_session", default=None)
+# 실행 중인 트랜잭션 함수의 (트랜잭션, 접근 모드). 안쪽 transactional 호출은 새 트랜잭션을 열지 않고 여기에 합류합니다.
+_current_transaction: ContextVar[tuple[Any, TransactionType] | None] = ContextVar("saveplate_transaction", default=None)
+_current_async_transaction: ContextVar[tuple[Any, TransactionType] | None] = ContextVar("saveplate_async_transaction", default=None)
+
+def parse_bookmarks(values: Iterable[str]) -> list[str]:
+    """BOOKMARK_HEADER 값을 북마크 목록으로 바꿉니다. 형식이 이상하거나 너무 많으면 버립니다."""
+    bookmarks = [value.strip() for header in values for value in header.split(",") if value.strip()]
+    if len(bookmarks) > _MAX_BOOKMARKS or any(len(value) > _MAX_BOOKMARK_LENGTH for value in bookmarks):
+        logger.warning(f"Ignoring {len(bookmarks)} malformed bookmarks")
+        return []
+    return bookmarks
+
+@asynccontextmanager
+async def request_scope(bookmarks: Iterable[str] = ()) -> AsyncGenerator[_RequestSession, None]:
+    """
+    이 블록 안(요청 하나)의 async_transactional 호출이 세션 하나를 함께 쓰게 합니다.
+    세션은 처음 필요할 때 열고 블록을 나갈 때 닫습니다. stream_read는 응답 본문을 보내는 동안에도
+    커서를 써야 하므로 따로 세션을 엽니다.
+
+    Args:
+        bookmarks: 이 요청의 트랜잭션이 기다려야 할 북마크 (클라이언트가 보낸 BOOKMARK_HEADER)
+    """
+    scope = _RequestSession(bookmarks)
+    token = _request_session.set(scope)
+    try:
+        yield scope
+    finally:
+        _request_session.reset(token)
+        if scope.session is not None or scope.read_session is not None:
+            metrics.db_session_transactions.observe(scope.transactions)
+        for session in (scope.session, scope.read_session):
+            if session is None:
+                continue
+            try:
+                await session.close()
+            except Exception as e:
+                logger.error(f"Error while closing request session: {str(e)}")
+
+@asynccontextmanager
+async def _transaction_session(type: TransactionType, primary: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    scope = _request_session.get()
+    replica = _async_read_replicas.pick() if type == "read" and not primary and _async_read_replicas else None
+    if scope is None:
+        if replica is not None:
+            async with replica.session(database="neo4j", default_access_mode=READ_ACCESS) as session:
+                yield session
+        else:
+            async with useAsyncSession() as session:
+                yield session
+        return
+    # 세션은 동시에 여러 트랜잭션을 실행할 수 없으므로 같은 요청 안의 동시 호출은 차례를 기다립니다.
+    async with scope.lock:
+        scope.transactions += 1
+        if replica is not None:
+            if scope.read_session is None:
+                scope.read_session = replica.session(database="neo4j", default_access_mode=READ_ACCESS, **scope.session_config())
+            yield scope.read_session
+            return
+        if scope.session is None:
+            scope.session = _get_async_driver().session(database="neo4j", **scope.session_config())
+        yield scope.session
+        if type == "write":
+            scope.written = (await scope.session.last_bookmarks()).raw_values
+            scope.bookmarks = scope.written
+            # 읽기 세션은 쓰기 전의 북마크로 열렸으므로 다음 읽기에서 새 북마크로 다시 엽니다.
+            if scope.read_session is not None:
+                read_session, scope.read_session = scope.read_session, None
+                await read_session.close()
+
+def _joined_transaction(variable: ContextVar, name: str, type: TransactionType) -> Any:
+    current = variable.get()
+    if current is None:
+        return None
+    tx, access = current
+    if type == "write" and access == "read":
+        raise RuntimeError(f"{name} needs a write transaction but was called inside a read transaction")
+    return tx
+
+def _strip_transaction_parameter(wrapper: Callable, function: Callable, transaction_type: type) -> None:
+    # FastAPI가 트랜잭션 파라미터를 요청 파라미터로 해석하지 않도록 시그니처에서 제거합니다.
+    wrapper.__annotations__ = {k: v for k, v in function.__annotations__.items() if v != transaction_type}
+
+    original_sig = inspect.signature(function)
+    params = list(original_sig.parameters.values())[1:]  # ManagedTransaction 파라미터 제거
+    wrapper.__signature__ = original_sig.replace(parameters=params)
+
+class _Query:
+    __slots__ = ("text", "parameters", "seconds")
+
+    def __init__(self, text: str, parameters: dict[str, Any]):
+        self.text = text
+        self.parameters = parameters
+        self.seconds = 0.0
+
+class _QueryStats:
+    __slots__ = ("access", "execute", "consume", "records", "queries")
+
+    def __init__(self, access: TransactionType):
+        self.access = access
+        self.execute = 0.0
+        self.consume = 0.0
+        self.records = 0
+        self.queries: list[_Query] = []
+
+    def add_query(self, query: str, parameters: dict[str, Any] | None = None, **kwparameters: Any) -> _Query:
+        # tx.run()과 같은 방식으로 파라미터를 합칩니다.
+        record = _Query(str(query), {**(parameters or {}), **kwparameters})
+        self.queries.append(record)
+        return record
+
+    def observe(self, function_name: str) -> None:
+        metrics.db_seconds.observe(self.execute, function_name, "execute")
+        metrics.db_seconds.observe(self.consume, function_name, "consume")
+        metrics.db_records.observe(self.records, function_name)
+        metrics.record_timing("db-execute", self.execute)
+        metrics.record_timing("db-consume", self.consume)
+        slowlog.slow_queries.observe(function_name, self.access, self.execute + self.consume, self.queries)
+
+def _count(value: Any) -> int:
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, list) else 1
+
+class _TimedResult:
+    """
+    Result를 감싸 레코드를 받아 오는 데 걸린 시간(consume)과 레코드 수를 셉니다.
+    레코드 사이에 호출한 쪽이 하는 일은 포함하지 않습니다.
+    """
+    def __init__(self, result: Any, stats: _QueryStats, query: _Query):
+        self._result = result
+        self._stats = stats
+        self._query = query
+
+    def _spent(self, seconds: float) -> None:
+        self._stats.consume += seconds
+        self._query.seconds += seconds
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        iterator = iter(self._result)
+        while True:
+            started = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._spent(time.perf_counter() - started)
+            self._stats.records += 1
+            yield record
+
+    def _timed(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            value = getattr(self._result, method)(*args, **kwargs)
+        finally:
+            self._spent(time.perf_counter() - started)
+        if method != "consume":
+            self._stats.records += _count(value)
+        return value
+
+    def single(self, *args: Any, **kwargs: Any) -> Any:
+        return self._timed("single", *args, **kwargs)
+
+    def data(self, *args: Any, **kwargs: Any) -> Any:
+        return self._timed("data", *args, **kwargs)
+
+    def values(self, *args: Any, **kwargs: Any) -> Any:
+        return self._timed("values", *args, **kwargs)
+
+    def fetch(self, *args: Any, **kwargs: Any) -> Any:
+        return self._timed("fetch", *args, **kwargs)
+
+    def consume(self, *args: Any, **kwargs: Any) -> Any:
+        return self._timed("consume", *args, **kwargs)
+
+class _TimedAsyncResult(_TimedResult):
+    async def __aiter__(self):
+        iterator = self._result.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                record = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                self._spent(time.perf_counter() - started)
+            self._stats.records += 1
+            yield record
+
+    async def _timed(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            value = await getattr(self._result, method)(*args, **kwargs)
+        finally:
+            self._spent(time.perf_counter() - started)
+        if method != "consume":
+            self._stats.records += _count(value)
+        return value
+
+class _TimedTransaction:
+    """tx.run()이 첫 응답을 받기까지의 시간(execute)을 재고 결과를 _TimedResult로 감쌉니다."""
+    def __init__(self, tx: Any, stats: _QueryStats):
+        self._tx = tx
+        self._stats = stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tx, name)
+
+    def run(self, *args: Any, **kwargs: Any) -> _TimedResult:
+        query = self._stats.add_query(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return _TimedResult(self._tx.run(*args, **kwargs), self._stats, query)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats.execute += elapsed
+            query.seconds += elapsed
+
+class _TimedAsyncTransaction(_TimedTransaction):
+    async def run(self, *args: Any, **kwargs: Any) -> _TimedAsyncResult:
+        query = self._stats.add_query(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return _TimedAsyncResult(await self._tx.run(*args, **kwargs), self._stats, query)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats.execute += elapsed
+            query.seconds += elapsed
+
+def _timed_out(error: Exception) -> bool:
+    # 서버가 트랜잭션 timeout으로 중단한 경우 (Neo.ClientError.Transaction.TransactionTimedOut[ClientConfiguration])
+    return isinstance(error, Neo4jError) and "TransactionTimedOut" in (error.code or "")
+
+def _with_timeout(function: Callable, timeout: float | None) -> Callable:
+    return unit_of_work(timeout=timeout)(function) if timeout is not None else function
+
+class _Restart(Exception):
+    """드라이버의 재시도를 멈추고 남은 시간으로 timeout을 다시 정해 execute_read/execute_write를 새로 호출하게 합니다."""
+
+class _Attempts:
+    """
+    트랜잭션 함수 호출을 세고, 첫 호출까지 걸린 시간을 세션/연결 획득 시간(acquire)으로 기록합니다.
+    드라이버가 재시도하면 호출이 여러 번 일어납니다.
+
+    드라이버는 트랜잭션 timeout을 execute_read/execute_write 호출마다 한 번만 읽으므로, 마감 시각이 있으면
+    재시도를 드라이버에 맡기지 않습니다. 재시도 시점(드라이버의 대기 뒤)에 _Restart로 빠져나오면 호출한 쪽이
+    그때 남은 시간을 timeout으로 다시 호출합니다.
+    """
+    def __init__(self, function_name: str, access: TransactionType):
+        self.function_name = function_name
+        self.access = access
+        self.count = 0
+        self.started = time.perf_counter()
+        self._call_started = 0
+        self._call_timeout: float | None = None
+
+    def start_call(self, timeout: float | None) -> None:
+        self._call_started = self.count
+        self._call_timeout = timeout
+
+    def begin(self) -> _QueryStats:
+        if self._call_timeout is not None and self.count > self._call_started:
+            raise _Restart()
+        self.count += 1
+        if self.count == 1:
+            acquire = time.perf_counter() - self.started
+            metrics.db_seconds.observe(acquire, self.function_name, "acquire")
+            metrics.record_timing("db-acquire", acquire)
+        return _QueryStats(self.access)
+
+    def finish(self) -> None:
+        if self.count > 1:
+            metrics.db_retries.inc(self.function_name, amount=self.count - 1)
+
 def transactional(type: TransactionType = "read"):
+    """
+    함수를 managed transaction 안에서 실행합니다. 드라이버가 일시적인 오류를 재시도하므로 함수는 여러 번 호출될 수 있습니다.
+    다른 트랜잭션 함수 안에서 호출하면 새 트랜잭션을 열지 않고 바깥 트랜잭션에 합류하므로 전체가 한 번에 커밋되고
+    재시도도 바깥 함수 단위로 일어납니다.
+    요청의 마감 시각(deadlines)이 있으면 시도할 때마다 그때 남은 시간을 트랜잭션 timeout으로 쓰고, 마감 시각이 지나면
+    재시도하지 않고 DeadlineExceeded를 던집니다.
+    """
     def decorator[**P, R](function: Callable[Concatenate[ManagedTransaction, P], R]) -> Callable[P, R]:
+        name = function.__qualname__
+
         @wraps(function)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            with useSession() as session:
-                execute_method = session.execute_write if type == "write" else session.execute_read
-                return execute_method(function, *args, **kwargs)
-        
-        wrapper.__annotations__ = {k: v for k, v in function.__annotations__.items() if v != ManagedTransaction}
+            joined = _joined_transaction(_current_transaction, name, type)
+            if joined is not None:
+                return function(joined, *args, **kwargs)
+            attempts = _Attempts(name, type)
+
+            def attempt(tx: ManagedTransaction, *args: P.args, **kwargs: P.kwargs) -> R:
+                # 마감 시각이 지났으면 드라이버가 재시도하지 않도록 재시도할 수 없는 오류로 끝냅니다.
+                deadlines.check(name)
+                stats = attempts.begin()
+                timed = _TimedTransaction(tx, stats)
+                token = _current_transaction.set((timed, type))
+                try:
+                    return function(timed, *args, **kwargs)
+                finally:
+                    _current_transaction.reset(token)
+                    stats.observe(name)
 
-        original_sig = inspect.signature(function)
-        params = list(original_sig.parameters.values())[1:]  # ManagedTransaction 파라미터 제거
-        wrapper.__signature__ = original_sig.replace(parameters=params)
+            try:
+                replica = _read_replicas.pick() if type == "read" and _read_replicas else None
+                with useSession(replica) as session:
+                    execute_method = session.execute_write if type == "write" else session.execute_read
+                    while True:
+                        timeout = deadlines.transaction_timeout(name)
+                        attempts.start_call(timeout)
+                        try:
+                            return execute_method(_with_timeout(attempt, timeout), *args, **kwargs)
+                        except _Restart:
+                            continue
+            except Neo4jError as e:
+                if _timed_out(e):
+                    raise deadlines.DeadlineExceeded(f"{name}: transaction timed out") from e
+                raise
+            finally:
+                attempts.finish()
 
+        _strip_transaction_parameter(wrapper, function, ManagedTransaction)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def async_transactional(type: TransactionType = "read", *, primary: bool = False):
+    """
+    transactional의 비동기 버전입니다. AsyncDriver 세션에서 managed transaction으로 함수를 실행하므로
+    스레드풀을 거치지 않고 이벤트 루프에서 여러 쿼리를 동시에 기다릴 수 있습니다.
+    request_scope() 안에서는 요청의 세션을 함께 씁니다.
+    primary가 참이면 읽기 트랜잭션도 읽기 복제본이 아닌 주 인스턴스에서 실행합니다. 다른 요청(다른 기기)이
+    방금 커밋한 쓰기를 북마크 없이도 반드시 읽어야 할 때 씁니다.
+    """
+    def decorator[**P, R](function: Callable[Concatenate[AsyncManagedTransaction, P], Awaitable[R]]) -> Callable[P, Coroutine[Any, Any, R]]:
+        name = function.__qualname__
+
+        @wraps(function)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            joined = _joined_transaction(_current_async_transaction, name, type)
+            if joined is not None:
+                return await function(joined, *args, **kwargs)
+            attempts = _Attempts(name, type)
+
+            async def attempt(tx: AsyncManagedTransaction, *args: P.args, **kwargs: P.kwargs) -> R:
+                deadlines.check(name)
+                stats = attempts.begin()
+                timed = _TimedAsyncTransaction(tx, stats)
+                token = _current_async_transaction.set((timed, type))
+                try:
+                    return await function(timed, *args, **kwargs)
+                finally:
+                    _current_async_transaction.reset(token)
+                    stats.observe(name)
+
+            try:
+                async with _transaction_session(type, primary) as session:
+                    execute_method = session.execute_write if type == "write" else session.execute_read
+                    while True:
+                        timeout = deadlines.transaction_timeout(name)
+                        attempts.start_call(timeout)
+                        try:
+                            return await execute_method(_with_timeout(attempt, timeout), *args, **kwargs)
+                        except _Restart:
+                            continue
+            except Neo4jError as e:
+                if _timed_out(e):
+                    raise deadlines.DeadlineExceeded(f"{name}: transaction timed out") from e
+                raise
+            finally:
+                attempts.finish()
+
+        _strip_transaction_parameter(wrapper, function, AsyncManagedTransaction)
+        return wrapper
+    return decorator
+
+async def stream_read(query: str, parameters: dict[str, Any] | None = None, *, fetch_size: int = 100) -> AsyncGenerator[Record, None]:
+    """
+    읽기 쿼리의 레코드를 커서에서 fetch_size개씩 받아 오며 하나씩 내보냅니다.
+    소비자가 다음 레코드를 요청할 때만 서버에서 다음 묶음을 가져오므로 메모리 사용량이 fetch_size로 제한됩니다.
+    이미 내보낸 레코드는 되돌릴 수 없으므로 managed transaction과 달리 재시도하지 않습니다.
+    요청의 마감 시각까지 남은 시간이 트랜잭션 timeout이 되므로, 너무 느리게 받아 가는 스트림은 중간에 끊깁니다.
+    """
+    timeout = deadlines.transaction_timeout("stream_read")
+    attempts = _Attempts("stream_read", "read")
+    stats = None
+    scope = _request_session.get()
+    config = scope.session_config() if scope is not None else {}
+    try:
+        async with useAsyncSession(
+            _async_read_replicas.pick() if _async_read_replicas else None,
+            fetch_size=fetch_size,
+            default_access_mode=READ_ACCESS,
+            **config,
+        ) as session:
+            async with await session.begin_transaction(timeout=timeout) as tx:
+                stats = attempts.begin()
+                result = await _TimedAsyncTransaction(tx, stats).run(query, parameters)
+                async for record in result:
+                    yield record
+    finally:
+        if stats is not None:
+            stats.observe("stream_read")
@@ -0,0 +1,164 @@
+"""
+요청마다 마감 시각(deadline)을 둡니다.
+
+DeadlineMiddleware가 요청을 받을 때 REQUEST_DEADLINE_SECONDS로 마감 시각을 정하고, 라우트는
+dependencies=[Depends(deadline(초))]로 자기 마감 시각을 다시 정할 수 있습니다(요청 시작 시각 기준).
+- transactional/async_transactional/stream_read는 남은 시간을 Neo4j 트랜잭션 timeout으로 넘기고,
+  마감 시각이 지나면 드라이버의 재시도를 멈춥니다(DeadlineExceeded).
+- 응답을 시작하기 전에 마감 시각이 지나면 미들웨어가 라우트를 취소하고 504를 반환합니다.
+- 클라이언트가 연결을 끊으면 라우트를 바로 취소합니다. 세션은 request_scope가 닫으며 연결을 풀에 돌려줍니다.
+"""
+from contextvars import ContextVar
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from saveplate import metrics
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Neo4j 트랜잭션 timeout의 최솟값 (0이면 서버 기본값을 쓰므로)
+_MIN_TIMEOUT_SECONDS = 0.001
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.started = time.monotonic()
+        self.expires = self.started + seconds
+        # 라우트가 마감 시각을 바꾸면 미들웨어의 대기를 깨웁니다.
+        self.changed = asyncio.Event()
+
+    def reset(self, seconds: float) -> None:
+        self.expires = self.started + seconds
+        self.changed.set()
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+_current: ContextVar[Deadline | None] = ContextVar("saveplate_deadline", default=None)
+
+def current() -> Deadline | None:
+    return _current.get()
+
+def check(name: str) -> None:
+    """마감 시각이 지났으면 DeadlineExceeded를 던집니다. 마감 시각이 없는 컨텍스트(백그라운드 갱신 등)에서는 아무것도 하지 않습니다."""
+    deadline = _current.get()
+    if deadline is not None and deadline.remaining() <= 0:
+        raise DeadlineExceeded(f"{name}: request deadline exceeded")
+
+def transaction_timeout(name: str) -> float | None:
+    """남은 시간(초)을 트랜잭션 timeout으로 반환합니다. 마감 시각이 없으면 None, 이미 지났으면 DeadlineExceeded."""
+    deadline = _current.get()
+    if deadline is None:
+        return None
+    check(name)
+    return max(deadline.remaining(), _MIN_TIMEOUT_SECONDS)
+
+def deadline(seconds: float) -> Callable[[], Awaitable[None]]:
+    """
+    라우트의 마감 시각을 요청 시작 후 seconds초로 정하는 의존성을 만듭니다.
+
+        @router.post("/available", dependencies=[Depends(deadline(settings.RECIPE_DEADLINE_SECONDS))])
+    """
+    async def dependency() -> None:
+        current = _current.get()
+        if current is not None:
+            current.reset(seconds)
+    return dependency
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded) -> JSONResponse:
+    metrics.requests_abandoned.inc("deadline")
+    logger.warning(f"Deadline exceeded: {exc}")
+    return JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)
+
+class DeadlineMiddleware:
+    """
+    요청 본문과 연결 끊김 메시지를 미리 읽어 두는 ASGI 미들웨어입니다. 라우트가 데이터베이스를 기다리는 동안에도
+    연결 끊김을 알아챌 수 있도록 receive는 이 미들웨어만 읽고 라우트에는 큐로 전달합니다.
+    """
+    def __init__(self, app: ASGIApp, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        deadline = Deadline(self.seconds)
+        token = _current.set(deadline)
+        try:
+            await self._run(deadline, scope, receive, send)
+        finally:
+            _current.reset(token)
+
+    async def _run(self, deadline: Deadline, scope: Scope, receive: Receive, send: Send) -> None:
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_started = False
+
+        async def pump() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def app_receive() -> Message:
+            if disconnected.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def app_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        app_task = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+        pump_task = asyncio.ensure_future(pump())
+        disconnect_task = asyncio.ensure_future(disconnected.wait())
+        changed_task: asyncio.Future | None = None
+        reason = None
+        try:
+            while not app_task.done():
+                if disconnected.is_set():
+                    reason = "disconnect"
+                    break
+                # 응답을 시작한 뒤(스트리밍)에는 504를 보낼 수 없으므로 연결 끊김만 봅니다.
+                timeout = None if response_started else deadline.remaining()
+                if timeout is not None and timeout <= 0:
+                    reason = "deadline"
+                    break
+                if changed_task is None or changed_task.done():
+                    deadline.changed.clear()
+                    changed_task = asyncio.ensure_future(deadline.changed.wait())
+                await asyncio.wait({app_task, disconnect_task, changed_task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (pump_task, disconnect_task, changed_task):
+                if task is not None:
+                    task.cancel()
+            if not app_task.done():
+                app_task.cancel()
+                try:
+                    await app_task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Error while cancelling {scope['path']}: {type(e).__name__}")
+
+        if reason is None:
+            app_task.result()
+            return
+        metrics.requests_abandoned.inc(reason)
+        if reason == "disconnect":
+            logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+            return
+        logger.warning(f"Deadline exceeded after {time.monotonic() - deadline.started:.3f}s, cancelled {scope['method']} {scope['path']}")
+        if not response_started:
+            await JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)(scope, app_receive, send)
@@ -0,0 +1,55 @@
+"""
+한글 음절을 호환용 자모로 분해하는 유틸리티입니다.
+자동완성에서 "ㄱ", "감ㅈ"처럼 음절이 완성되지 않은 입력도 접두사로 비교할 수 있게 합니다.
+"""
+import unicodedata
+
+_SYLLABLE_BASE = 0xAC00
+_SYLLABLE_COUNT = 11172
+_JUNG_COUNT = 21
+_JONG_COUNT = 28
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSUNG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+            "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 겹모음/겹받침은 입력 도중의 상태("고" → "과", "갑" → "값")와 접두사가 맞도록 낱자로 나눕니다.
+_COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+def _split(jamo: str) -> str:
+    return _COMPOUND_JAMO.get(jamo, jamo)
+
+_JAMO_TABLE: dict[int, str] = {ord(jamo): split for jamo, split in _COMPOUND_JAMO.items()}
+_CHOSUNG_TABLE: dict[int, str] = {}
+for _offset in range(_SYLLABLE_COUNT):
+    _cho, _rest = divmod(_offset, _JUNG_COUNT * _JONG_COUNT)
+    _jung, _jong = divmod(_rest, _JONG_COUNT)
+    _JAMO_TABLE[_SYLLABLE_BASE + _offset] = CHOSUNG[_cho] + _split(JUNGSUNG[_jung]) + _split(JONGSUNG[_jong])
+    _CHOSUNG_TABLE[_SYLLABLE_BASE + _offset] = CHOSUNG[_cho]
+
+_CONSONANTS = frozenset(CHOSUNG)
+
+def decompose(text: str) -> str:
+    """
+    한글 음절을 낱자 단위의 호환용 자모로 분해합니다. 한글이 아닌 문자는 그대로 둡니다.
+    예: "감자" → "ㄱㅏㅁㅈㅏ", "과" → "ㄱㅗㅏ"
+    """
+    return unicodedata.normalize("NFC", text).translate(_JAMO_TABLE)
+
+def chosung(text: str) -> str:
+    """
+    한글 음절을 초성으로 바꿉니다. 한글이 아닌 문자는 그대로 둡니다.
+    예: "감자 전" → "ㄱㅈ ㅈ"
+    """
+    return unicodedata.normalize("NFC", text).translate(_CHOSUNG_TABLE)
+
+def is_chosung_only(text: str) -> bool:
+    """
+    입력이 공백을 제외하고 자음(초성)으로만 이루어져 있는지 확인합니다.
+    """
+    return any(c in _CONSONANTS for c in text) and all(c in _CONSONANTS or c.isspace() for c in text)
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from saveplate import metrics
+from saveplate.config import settings
+from typing import Any, Callable
+import asyncio
+import logging
+import multiprocessing
+import time
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=8)
+def _context(rounds: int, min_rounds: int, max_rounds: int) -> CryptContext:
+    # cost가 min_rounds~max_rounds 밖인 해시는 needs_update로 판정되어 로그인 시 rounds로 다시 해시됩니다.
+    return pwd_context.copy(bcrypt__default_rounds=rounds, bcrypt__min_rounds=min_rounds, bcrypt__max_rounds=max_rounds)
+
+# 아래 함수들은 풀의 자식 프로세스에서 실행됩니다.
+def hash_password(password: str, rounds: int) -> str:
+    return _context(rounds, rounds, rounds).hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str, rounds: int, min_rounds: int, max_rounds: int) -> tuple[bool, str | None]:
+    return _context(rounds, min_rounds, max_rounds).verify_and_update(plain_password, hashed_password)
+
+def measure_hash_seconds(rounds: int) -> float:
+    context = _context(rounds, rounds, rounds)
+    started = time.perf_counter()
+    context.hash("calibration")
+    return time.perf_counter() - started
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증을 요청 스레드풀과 GIL 밖의 전용 프로세스 풀에서 실행합니다.
+
+    대기 중인 작업이 max_pending개에 이르면 더 받지 않고 503(Retry-After)으로 돌려보내므로
+    로그인이 몰려도 /autocompletion 같은 다른 엔드포인트의 지연 시간에 영향을 주지 않습니다.
+    포화 상태는 stats()와 경고 로그로 확인할 수 있습니다.
+
+    워커와 노드는 각자 cost를 보정하므로 측정 오차로 서로 1 정도 다른 값을 고를 수 있습니다.
+    그래서 저장된 해시는 보정값 ± rounds_tolerance 안이면 그대로 두고, 그 밖일 때만 로그인 시 다시 해시합니다.
+    """
+    def __init__(self, *, workers: int, max_pending: int, rounds: int = 12, rounds_tolerance: int = 1):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.rounds_tolerance = rounds_tolerance
+        self.min_rounds = 4  # bcrypt가 허용하는 최솟값. calibrate()가 설정한 최솟값으로 바꿉니다.
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+        self._saturated = False
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        # fork 대신 spawn을 써서 드라이버 소켓이나 스레드 상태를 자식 프로세스로 물려주지 않습니다.
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Password hashing pool started with {self.workers} workers")
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def calibrate(self, budget_seconds: float, min_rounds: int, max_rounds: int) -> int:
+        """
+        해시 한 번이 budget_seconds 안에 끝나는 가장 높은 bcrypt cost를 찾아 이후 해시에 사용합니다.
+        cost가 1 오를 때마다 시간이 두 배가 되므로, 다음 단계가 예산을 넘을 것이 확실하면 측정을 멈춥니다.
+        """
+        await self._submit(measure_hash_seconds, min_rounds)  # 자식 프로세스 기동 시간은 측정에서 제외합니다.
+        rounds = min_rounds
+        for candidate in range(min_rounds, max_rounds + 1):
+            elapsed = await self._submit(measure_hash_seconds, candidate)
+            if elapsed > budget_seconds:
+                break
+            rounds = candidate
+            if elapsed * 2 > budget_seconds:
+                break
+        self.rounds = rounds
+        self.min_rounds = min_rounds
+        logger.info(f"Calibrated bcrypt cost to {rounds} for a {budget_seconds * 1000:.0f}ms budget")
+        return rounds
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        비밀번호를 검증하고, 저장된 해시의 cost가 허용 범위(rounds_band) 밖이면 새 해시를 함께 반환합니다.
+        """
+        return await self._submit(verify_and_update, plain_password, hashed_password, self.rounds, *self.rounds_band())
+
+    def rounds_band(self) -> tuple[int, int]:
+        """다시 해시하지 않고 받아들이는 cost 범위입니다. 설정한 최솟값보다 낮은 해시는 항상 다시 해시합니다."""
+        return max(self.min_rounds, self.rounds - self.rounds_tolerance), self.rounds + self.rounds_tolerance
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "rounds_tolerance": self.rounds_tolerance,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "mean_seconds": self._busy_seconds / self.completed if self.completed else 0.0,
+        }
+
+    async def _submit[R](self, function: Callable[..., R], *args: Any) -> R:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            if not self._saturated:
+                self._saturated = True
+                logger.warning(f"Password hashing pool saturated, shedding requests: {self.stats()}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login attempts, please retry later",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            if self._executor is None:
+                result = await run_in_threadpool(function, *args)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+            succeeded = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.pending -= 1
+            # 실패(풀 종료, 잘못된 해시 형식, 취소 등)는 완료 횟수와 평균 시간에 넣지 않습니다.
+            if succeeded:
+                self.completed += 1
+                self._busy_seconds += elapsed
+            else:
+                self.failed += 1
+            metrics.password_hash_seconds.observe(elapsed, function.__name__)
+            metrics.record_timing("bcrypt", elapsed)
+            if self._saturated and self.pending <= self.max_pending // 2:
+                self._saturated = False
+                logger.info(f"Password hashing pool recovered: {self.stats()}")
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds_tolerance=settings.PASSWORD_HASH_ROUNDS_TOLERANCE,
+)
@@ -1,9 +1,11 @@
 from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
-from saveplate import database
-from saveplate.routers import autocompletion, recipes, user, auth
+from saveplate import admission, database, deadlines, matching, completion, hashing, schema, metrics
+from saveplate.routers import autocompletion, recipes, user, auth, monitoring, admin, health
 from saveplate.config import settings
+import asyncio
 import logging
+import time
 from fastapi.middleware.cors import CORSMiddleware
 
 logging.basicConfig(level=logging.INFO)
@@ -11,31 +13,102 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    warm_up_task: asyncio.Task | None = None
     try:
         database.initialize(settings.DB_URL, (settings.DB_USER, settings.DB_PW))
+        await database.initialize_async(settings.DB_URL, (settings.DB_USER, settings.DB_PW))
+        read_urls = [url.strip() for url in settings.DB_READ_URLS.split(",") if url.strip()]
+        if read_urls:
+            database.initialize_read_replicas(read_urls, (settings.DB_USER, settings.DB_PW))
         logger.info("Database connection initialized successfully")
+        await database.warm_up_async(settings.DB_WARM_CONNECTIONS, minimum=settings.DB_WARM_MIN_CONNECTIONS)
+        if not database.pool_ready:
+            warm_up_task = asyncio.create_task(database.warm_up_until_ready(settings.DB_WARM_CONNECTIONS, settings.DB_WARM_MIN_CONNECTIONS))
+        schema.bootstrap(settings.SCHEMA_INDEX_TIMEOUT_SECONDS, verify=settings.SCHEMA_VERIFY_PLANS)
+        matching.recipe_catalog.start()
+        completion.completion_catalog.start()
+        hashing.password_hasher.start()
+        await hashing.password_hasher.calibrate(
+            settings.PASSWORD_HASH_BUDGET_MS / 1000,
+            settings.PASSWORD_HASH_MIN_ROUNDS,
+            settings.PASSWORD_HASH_MAX_ROUNDS,
+        )
         yield
     except Exception as e:
         logger.error(f"Failed to initialize database connection: {str(e)}")
         raise
     finally:
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+        hashing.password_hasher.stop()
+        completion.completion_catalog.stop()
+        matching.recipe_catalog.stop()
         try:
+            await database.close_async()
             database.close()
             logger.info("Database connection closed")
         except Exception as e:
             logger.error(f"Error while closing database connection: {str(e)}")
 
 app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(deadlines.DeadlineExceeded, deadlines.deadline_exceeded_handler)
+# 요청 처리 시간 측정 안쪽에서 마감 시간을 지키고 연결 끊김을 감지합니다. 취소된 요청의 세션은 database_session_scope가 닫습니다.
+app.add_middleware(deadlines.DeadlineMiddleware, seconds=settings.REQUEST_DEADLINE_SECONDS)
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
+    # 스트리밍 응답은 본문 전송 전(헤더를 보낼 때)까지의 시간이 기록됩니다.
+    timings = metrics.timing_scope()
+    started = time.perf_counter()
     response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    # 매칭되지 않은 경로는 레이블 수가 늘어나지 않도록 하나로 모읍니다.
+    metrics.request_seconds.observe(elapsed, request.method, route.path if route else "unmatched", str(response.status_code))
+    response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
     return response
 
+@app.middleware("http")
+async def database_session_scope(request: Request, call_next):
+    # 한 요청 안의 트랜잭션 함수(인증, 라우트)가 Neo4j 세션 하나를 함께 씁니다.
+    # 클라이언트가 보낸 북마크까지 반영된 데이터를 읽고, 쓰기를 커밋했으면 새 북마크를 돌려줍니다.
+    bookmarks = database.parse_bookmarks(request.headers.getlist(database.BOOKMARK_HEADER))
+    async with database.request_scope(bookmarks) as scope:
+        response = await call_next(request)
+    if scope.written:
+        response.headers[database.BOOKMARK_HEADER] = ",".join(sorted(scope.written))
+    return response
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # 과부하일 때 요청을 쌓아 두지 않고 바로 거절해, 받아들인 요청은 제시간에 끝나게 합니다.
+    route_class = admission.classify(request.method, request.url.path) if settings.ADMISSION_CONTROL_ENABLED else None
+    if route_class is None:
+        return await call_next(request)
+    limit = route_class.limit
+    if route_class.buckets is not None:
+        wait = route_class.buckets.take(admission.client_key(request))
+        if wait > 0:
+            return admission.rejection(429, limit.name, "rate", wait)
+    if not limit.try_acquire():
+        return admission.rejection(503, limit.name, "concurrency", limit.retry_after())
+    started = time.perf_counter()
+    ok = False
+    try:
+        # 스트리밍 응답은 본문을 보내기 전(헤더를 보낼 때)까지만 한도를 차지합니다.
+        response = await call_next(request)
+        ok = response.status_code < 500
+        return response
+    finally:
+        limit.release(time.perf_counter() - started, ok)
+
 app.include_router(autocompletion.router)
 app.include_router(recipes.router)
 app.include_router(user.router)
 app.include_router(auth.router)
+app.include_router(monitoring.router)
+app.include_router(admin.router)
+app.include_router(health.router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,4 +116,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # 모든 HTTP 메서드 허용
     allow_headers=["*"],  # 모든 헤더 허용
+    expose_headers=[database.BOOKMARK_HEADER],
 )
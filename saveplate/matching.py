@@ -0,0 +1,220 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+import heapq
+from typing import Iterable, Sequence
+from saveplate import snapshot
+from saveplate.config import settings
+from saveplate.database import ManagedTransaction, transactional
+from saveplate.util import Reloadable, cached
+import logging
+
+logger = logging.getLogger(__name__)
+
+RecipeMatch = tuple[str, str, float]
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+class RecipeIndex:
+    """
+    레시피→재료 카탈로그의 인메모리 역색인입니다.
+
+    재료 이름은 정수 id로 바꿔 저장하고, 재료마다 그 재료를 쓰는 레시피 id 목록(posting)을 둡니다.
+    레시피 id는 재료 수 오름차순으로 부여하므로 posting도 재료 수 순서로 정렬되어 있습니다.
+    유사도는 기존 Cypher 쿼리와 같이 |A ∩ R| / |R| 로 계산합니다.
+    """
+    def __init__(self, rows: Iterable[tuple[str, str, Iterable[str]]]):
+        self.ingredient_ids: dict[str, int] = {}
+        entries: list[tuple[str, str, list[int]]] = []
+        for food, recipe, names in rows:
+            ids = {self.ingredient_ids.setdefault(name, len(self.ingredient_ids)) for name in names if name is not None}
+            if ids:
+                entries.append((food, recipe, sorted(ids)))
+        entries.sort(key=lambda entry: len(entry[2]))
+
+        self.foods: Sequence[str] = [food for food, _, _ in entries]
+        self.recipes: Sequence[str] = [recipe for _, recipe, _ in entries]
+        self.sizes: Sequence[int] = array("I", (len(ids) for _, _, ids in entries))
+        self.postings: list[Sequence[int]] = [array("I") for _ in range(len(self.ingredient_ids))]
+        for recipe_id, (_, _, ids) in enumerate(entries):
+            for ingredient_id in ids:
+                self.postings[ingredient_id].append(recipe_id)
+
+    @classmethod
+    def from_snapshot(cls, snap: snapshot.Snapshot) -> "RecipeIndex":
+        """
+        스냅숏의 배열을 복사하지 않고 그대로 쓰는 인덱스를 만듭니다. 재료 이름 → id 딕셔너리만 새로 만듭니다.
+        """
+        index = cls.__new__(cls)
+        names = snap.column("ingredient.names")
+        index.ingredient_ids = {names[i]: i for i in range(len(names))}
+        index.foods = snap.column("recipe.foods")
+        index.recipes = snap.column("recipe.names")
+        index.sizes = snap.array("recipe.sizes")
+        index.postings = snap.csr("posting")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def match(
+        self,
+        ingredients: Iterable[str],
+        *,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = 0,
+        min_similarity: float = 0.0,
+    ) -> list[RecipeMatch]:
+        """
+        주어진 재료와 하나 이상 겹치는 레시피 중 유사도 상위 결과만 반환합니다.
+
+        전체를 정렬하지 않고 크기 offset+limit의 힙으로 상위 결과만 유지합니다.
+        유사도는 min(|A|, |R|) / |R| 을 넘을 수 없으므로, 레시피를 재료 수 오름차순으로 보다가
+        이 상한이 min_similarity나 힙의 최솟값 이하가 되면 남은 레시피는 보지 않습니다.
+
+        Args:
+            ingredients (Iterable[str]): 가지고 있는 재료 이름
+            limit (int): 반환할 최대 개수
+            offset (int): 건너뛸 상위 결과 개수
+            min_similarity (float): 최소 유사도
+
+        Returns:
+            list[RecipeMatch]: (음식 이름, 레시피 이름, 유사도) 목록, 유사도 내림차순
+        """
+        query = {self.ingredient_ids[name] for name in ingredients if name in self.ingredient_ids}
+        if not query or limit <= 0:
+            return []
+        available = len(query)
+
+        # |R| > |A| / min_similarity 인 레시피는 min_similarity에 도달할 수 없습니다.
+        end = len(self.sizes)
+        if min_similarity > 0:
+            end = bisect_right(self.sizes, int(available / min_similarity + 1e-9))
+
+        counts: Counter[int] = Counter()
+        for ingredient_id in query:
+            posting = self.postings[ingredient_id]
+            counts.update(posting[:bisect_left(posting, end)])
+
+        k = offset + limit
+        heap: list[tuple[float, int]] = []
+        for recipe_id in sorted(counts):
+            size = self.sizes[recipe_id]
+            if len(heap) == k and min(available, size) / size <= heap[0][0]:
+                break
+            sim = counts[recipe_id] / size
+            if sim < min_similarity:
+                continue
+            # 유사도가 같으면 재료 수가 적은(id가 작은) 레시피가 앞에 옵니다.
+            item = (sim, -recipe_id)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        top = sorted(heap, reverse=True)[offset:]
+        return [(self.foods[-neg_id], self.recipes[-neg_id], sim) for sim, neg_id in top]
+
+class UserScores:
+    """
+    한 사용자의 재료에 대한 레시피별 유사도 표입니다.
+
+    레시피마다 겹치는 재료 수를 세어 두고, (-유사도, 레시피 id) 정렬 목록을 유지하므로
+    조회는 정렬된 목록을 앞에서부터 읽기만 하면 됩니다. 재료를 추가하면 그 재료의 posting에 있는
+    레시피만 갱신하므로 비용이 카탈로그 크기가 아니라 재료당 레시피 수에 비례합니다.
+    순서는 RecipeIndex.match와 같습니다 (유사도 내림차순, 같으면 재료 수 오름차순).
+    """
+    def __init__(self, index: RecipeIndex, ingredients: Iterable[str] = ()):
+        self.index = index
+        self.pantry: set[int] = set()
+        self.counts: dict[int, int] = {}
+        self.ranking: list[tuple[float, int]] = []
+        self.add(ingredients)
+
+    def add(self, ingredients: Iterable[str]) -> int:
+        """
+        재료를 추가하고 유사도가 바뀐 레시피 수를 반환합니다. 이미 가진 재료나 어느 레시피에도 없는 재료는 무시합니다.
+        """
+        added = {self.index.ingredient_ids[name] for name in ingredients if name in self.index.ingredient_ids} - self.pantry
+        if not added:
+            return 0
+        self.pantry |= added
+        changed: Counter[int] = Counter()
+        for ingredient_id in added:
+            changed.update(self.index.postings[ingredient_id])
+
+        # 처음 만들 때처럼 바뀌는 레시피가 많으면 하나씩 삽입하는 것보다 다시 정렬하는 편이 빠릅니다.
+        rebuild = len(changed) * 4 > len(self.ranking)
+        sizes = self.index.sizes
+        for recipe_id, delta in changed.items():
+            size = sizes[recipe_id]
+            count = self.counts.get(recipe_id, 0)
+            if count and not rebuild:
+                del self.ranking[bisect_left(self.ranking, (-count / size, recipe_id))]
+            self.counts[recipe_id] = count + delta
+            if not rebuild:
+                insort(self.ranking, (-(count + delta) / size, recipe_id))
+        if rebuild:
+            self.ranking = sorted((-count / sizes[recipe_id], recipe_id) for recipe_id, count in self.counts.items())
+        return len(changed)
+
+    def top(self, *, limit: int = DEFAULT_LIMIT, offset: int = 0, min_similarity: float = 0.0) -> list[RecipeMatch]:
+        # 정렬 목록에서 -유사도가 -min_similarity 이하인 구간만 봅니다.
+        end = bisect_right(self.ranking, (-min_similarity, len(self.index))) if min_similarity > 0 else len(self.ranking)
+        return [
+            (self.index.foods[recipe_id], self.index.recipes[recipe_id], -neg_sim)
+            for neg_sim, recipe_id in self.ranking[offset:min(end, offset + limit)]
+        ]
+
+@transactional("read")
+def load_recipe_index(tx: ManagedTransaction) -> RecipeIndex:
+    result = tx.run("""
+    MATCH (i)-[]->(r:Recipe)-[:RECIPE_OF]->(f:Food)
+    RETURN f.name AS food, r.name AS recipe, collect(i.name) AS ingredients
+    """)
+    return RecipeIndex((record["food"], record["recipe"], record["ingredients"]) for record in result)
+
+@transactional("read")
+def recipe_catalog_fingerprint(tx: ManagedTransaction) -> tuple[int, int, int]:
+    # 모두 count store에서 바로 읽히는 카운트라 카탈로그 크기와 무관하게 저렴합니다.
+    recipes = tx.run("MATCH (r:Recipe) RETURN count(r) AS c").single()["c"]
+    foods = tx.run("MATCH (f:Food) RETURN count(f) AS c").single()["c"]
+    edges = tx.run("MATCH ()-[e]->(:Recipe) RETURN count(e) AS c").single()["c"]
+    return recipes, foods, edges
+
+def load_recipe_catalog() -> RecipeIndex:
+    # 스냅숏이 있으면 mmap해서 쓰고, 없으면 Neo4j에서 카탈로그 전체를 읽습니다.
+    snap = snapshot.current()
+    if snap is not None:
+        return RecipeIndex.from_snapshot(snap)
+    return load_recipe_index()
+
+recipe_catalog = Reloadable(
+    "recipe catalog",
+    load_recipe_catalog,
+    interval_seconds=settings.CATALOG_REFRESH_SECONDS,
+    fingerprint=snapshot.fingerprint if settings.CATALOG_SNAPSHOT_PATH else recipe_catalog_fingerprint,
+    max_age_seconds=settings.CATALOG_MAX_AGE_SECONDS,
+)
+
+def get_recipe_index() -> RecipeIndex:
+    return recipe_catalog.get()
+
+@cached(ttl_seconds=settings.RECIPE_CACHE_TTL_SECONDS, maxsize=1024, shared="recipes", version=recipe_catalog.key)
+def match_recipes(
+    ingredients: tuple[str, ...],
+    limit: int = DEFAULT_LIMIT,
+    offset: int = 0,
+    min_similarity: float = 0.0,
+) -> list[RecipeMatch]:
+    """
+    RecipeIndex.match의 결과를 워커 간 공유 캐시에 담아 둡니다.
+    같은 재료 조합이 순서만 다르게 들어와도 같은 항목을 쓰도록 ingredients는 정렬된 튜플로 넘깁니다.
+    공유 캐시에서 읽은 결과는 튜플 대신 리스트일 수 있습니다.
+    항목은 카탈로그 fingerprint별로 나뉘므로, 카탈로그가 바뀌면 새 카탈로그를 로드한 워커부터 새 결과를 씁니다.
+    """
+    return get_recipe_index().match(ingredients, limit=limit, offset=offset, min_similarity=min_similarity)
+
+def ingredient_key(ingredients: Iterable[str]) -> tuple[str, ...]:
+    return tuple(sorted(set(ingredients)))
@@ -0,0 +1,170 @@
+"""
+요청/쿼리 지연 시간 지표를 모아 Prometheus 텍스트 형식으로 내보냅니다.
+
+운영에서 항상 켜 둘 수 있도록 관측 한 번은 버킷 이분 탐색과 잠금 아래의 덧셈 몇 번으로 끝납니다.
+지표는 워커 프로세스마다 따로 집계됩니다.
+
+요청마다 단계별 소요 시간(db, bcrypt 등)을 Server-Timing 헤더로도 돌려줍니다.
+미들웨어가 요청 시작 시 timing_scope()로 목록을 만들고, record_timing()이 그 목록에 더합니다.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator
+import threading
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # 레이블 값 → [버킷별 개수..., +Inf 개수, 합계]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class GaugeCollector:
+    """
+    스크레이프할 때 callback을 호출해 값을 읽는 게이지입니다. callback은 (레이블 값 튜플, 값) 목록을 반환합니다.
+    다른 모듈의 stats()를 그대로 노출할 때 씁니다.
+    """
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], callback: Callable[[], Iterable[tuple[tuple[str, ...], float]]]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in self.callback():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Histogram | Counter | GaugeCollector] = []
+
+    def register[M: (Histogram, Counter, GaugeCollector)](self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+request_seconds = registry.register(Histogram(
+    "saveplate_request_seconds", "HTTP request latency until the response starts",
+    ("method", "route", "status"),
+))
+db_seconds = registry.register(Histogram(
+    "saveplate_db_seconds", "Time spent per transactional function and phase (acquire, execute, consume)",
+    ("function", "phase"),
+))
+db_records = registry.register(Histogram(
+    "saveplate_db_records", "Records consumed per transactional function call",
+    ("function",), buckets=COUNT_BUCKETS,
+))
+db_retries = registry.register(Counter(
+    "saveplate_db_retries_total", "Transaction function attempts retried by the driver",
+    ("function",),
+))
+db_session_transactions = registry.register(Histogram(
+    "saveplate_db_session_transactions", "Transactions run on one request-scoped session",
+    buckets=COUNT_BUCKETS,
+))
+requests_abandoned = registry.register(Counter(
+    "saveplate_requests_abandoned_total", "Requests cut short by their deadline or by the client disconnecting",
+    ("reason",),
+))
+requests_rejected = registry.register(Counter(
+    "saveplate_requests_rejected_total", "Requests rejected by admission control (429 rate, 503 concurrency) before reaching a route",
+    ("class", "reason"),
+))
+password_hash_seconds = registry.register(Histogram(
+    "saveplate_password_hash_seconds", "bcrypt work including time queued for the hashing pool",
+    ("operation",),
+))
+
+_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("saveplate_timings", default=None)
+
+def timing_scope() -> list[tuple[str, float]]:
+    """요청 단위의 타이밍 목록을 만들어 현재 컨텍스트에 둡니다. 자식 태스크와 스레드풀도 같은 목록을 봅니다."""
+    timings: list[tuple[str, float]] = []
+    _timings.set(timings)
+    return timings
+
+def record_timing(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+def server_timing_header(timings: list[tuple[str, float]], total_seconds: float) -> str:
+    totals: dict[str, float] = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    totals["app"] = total_seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
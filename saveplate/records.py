@@ -0,0 +1,75 @@
+"""
+Neo4j 레코드를 응답용 값으로 바꾸는 디코더입니다.
+
+쿼리마다 "응답 필드 ← 레코드 키 / 노드 속성"을 한 번 선언해 두고(mapping, node, value) 모든 행에 그대로 적용합니다.
+neo4j.time 값은 문자열을 거치지 않고 to_native()로 바로 datetime 타입이 됩니다.
+디코더가 만든 dict는 이미 JSON으로 보낼 수 있는 형태이므로 json_response()로 출력 모델 검증 없이 orjson으로 직렬화합니다.
+"""
+from fastapi import Response
+from typing import Any, Callable, Iterable, Mapping
+import orjson
+
+Decoder = Callable[[Mapping[str, Any]], Any]
+
+def native(value: Any) -> Any:
+    # neo4j.time.Date/DateTime/Time/Duration → datetime.date/datetime/time/timedelta
+    to_native = getattr(value, "to_native", None)
+    return to_native() if to_native is not None else value
+
+def properties(entity: Mapping[str, Any] | None, exclude: frozenset[str] = frozenset()) -> dict[str, Any] | None:
+    """노드나 관계의 속성을 dict로 바꿉니다."""
+    if entity is None:
+        return None
+    return {key: native(value) for key, value in entity.items() if key not in exclude}
+
+def value(key: str) -> Decoder:
+    """레코드의 key 값을 그대로 씁니다."""
+    def decode(record: Mapping[str, Any]) -> Any:
+        return native(record[key])
+    return decode
+
+def node(key: str, *, exclude: Iterable[str] = ()) -> Decoder:
+    """레코드의 key에 있는 노드 속성 전체를 dict로 씁니다. exclude의 속성은 뺍니다."""
+    excluded = frozenset(exclude)
+
+    def decode(record: Mapping[str, Any]) -> dict[str, Any] | None:
+        return properties(record[key], excluded)
+    return decode
+
+def mapping(*spread: Decoder, **fields: Decoder | str) -> Decoder:
+    """
+    레코드 하나를 dict 하나로 바꾸는 디코더를 만듭니다.
+
+    Args:
+        *spread: 결과 dict에 펼쳐 넣을 디코더 (보통 node(...))
+        **fields: 응답 필드 이름 → 디코더. 문자열이면 value(문자열)과 같습니다.
+
+    Returns:
+        Decoder: record → dict
+    """
+    decoders = [(name, value(decoder) if isinstance(decoder, str) else decoder) for name, decoder in fields.items()]
+
+    def decode(record: Mapping[str, Any]) -> dict[str, Any]:
+        row: dict[str, Any] = {}
+        for decoder in spread:
+            row.update(decoder(record) or ())
+        for name, decoder in decoders:
+            row[name] = decoder(record)
+        return row
+    return decode
+
+# 응답에 내보내면 안 되는 사용자 속성
+USER_PRIVATE_FIELDS = ("hashed_password", "refresh_token")
+
+class JSONBytesResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+def json_response(content: Any, status_code: int = 200) -> JSONBytesResponse:
+    """
+    디코더가 만든 값을 orjson으로 직렬화해 반환합니다.
+    라우트가 Response를 반환하면 FastAPI는 반환 타입으로 다시 검증하고 jsonable_encoder를 거치는 과정을 건너뜁니다.
+    """
+    return JSONBytesResponse(content, status_code=status_code)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from saveplate.config import settings
+from saveplate.slowlog import slow_queries
+from typing import Any
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    # ADMIN_TOKEN이 없으면 엔드포인트가 없는 것처럼 404를 반환합니다.
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = 50) -> list[dict[str, Any]]:
+    """
+    최근 슬로 쿼리 기록을 조회합니다.
+
+    Args:
+        limit (int, optional): 반환할 최대 개수. 기본값은 50.
+
+    Returns:
+        list[dict[str, Any]]: 최근 것부터 정렬된 기록. 파라미터는 형태만 포함하며, 캡처된 경우 실행 계획(plan)을 포함합니다.
+    """
+    return slow_queries.entries()[:limit]
+
+@router.delete("/slow-queries")
+async def clear_slow_queries() -> dict[str, str]:
+    """
+    슬로 쿼리 기록을 비웁니다.
+    """
+    slow_queries.clear()
+    return {"status": "cleared"}
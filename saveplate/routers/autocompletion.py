@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
-from saveplate.database import ManagedTransaction, transactional
-from saveplate.util import lru_with_ttl
-from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException
+from saveplate.config import settings
+from saveplate.deadlines import deadline
+from saveplate.completion import AutoCompletionType, completion_version, get_completion_index
+from saveplate.util import cached
 import logging
 
 router = APIRouter(
@@ -12,28 +13,24 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-AutoCompletionType = Literal["ingredient"] | Literal["sauce"]
-
-@router.get("")
-@lru_with_ttl(ttl_seconds=60*10)
-@transactional("read")
-def autocompletion(tx: ManagedTransaction, type: AutoCompletionType, data: str, limit: int = 10) -> list[str]:
+@router.get("", dependencies=[Depends(deadline(settings.AUTOCOMPLETION_DEADLINE_SECONDS))])
+@cached(ttl_seconds=60, maxsize=4096, stale_seconds=60, version=completion_version)
+async def autocompletion(type: AutoCompletionType, data: str, limit: int = 10, fuzzy: bool = False) -> list[str]:
     """
     재료나 소스 이름의 자동완성 결과를 제공합니다.
+    워커 메모리의 접두사 인덱스에서 바로 조회하므로 데이터베이스에 접근하지 않습니다.
 
     Args:
         type (AutoCompletionType): "ingredient" 또는 "sauce"
         data (str): 검색할 문자열
         limit (int, optional): 반환할 결과의 최대 개수. 기본값은 10.
+        fuzzy (bool, optional): 참이면 오타가 있는 입력도 편집 거리가 가까운 이름으로 보완합니다. 기본값은 False.
 
     Returns:
         list[str]: 자동완성된 이름 목록
     """
     try:
-        t = type.capitalize()
-        result = tx.run(f'match (n: {t}) where n.name starts with $prefix return n.name as name order by n.popularity desc limit $limit', prefix=data, limit=limit)
-        names = result.value(key="name")
-        return names
+        return get_completion_index(type).lookup(data, limit, fuzzy=fuzzy)
     except Exception as e:
         logger.error(f"Error in autocompletion: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
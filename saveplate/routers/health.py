@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from saveplate import database, schema
+from saveplate.completion import completion_catalog
+from saveplate.matching import recipe_catalog
+import logging
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+    include_in_schema=False,
+)
+
+logger = logging.getLogger(__name__)
+
+@router.get("/live")
+async def live() -> dict[str, str]:
+    """
+    프로세스가 요청을 처리할 수 있는지(liveness)만 확인합니다. 데이터베이스는 보지 않습니다.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """
+    이 워커가 트래픽을 받을 준비가 되었는지 확인합니다.
+    연결 풀을 미리 채우고, 스키마를 확인하고, 카탈로그를 메모리에 올린 뒤에만 200을 반환합니다.
+
+    Returns:
+        JSONResponse: 항목별 상태. 하나라도 준비되지 않았으면 503
+    """
+    checks = {
+        "database_pool": database.pool_ready,
+        "schema": schema.ready,
+        "recipe_catalog": recipe_catalog.loaded,
+        "completion_catalog": completion_catalog.loaded,
+    }
+    ok = all(checks.values())
+    return JSONResponse({"status": "ready" if ok else "starting", "checks": checks}, status_code=200 if ok else 503)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from saveplate import admission, auth, metrics, scores
+from saveplate.hashing import password_hasher
+from saveplate.matching import match_recipes
+from saveplate.routers.autocompletion import autocompletion
+from anyio import to_thread
+import logging
+
+router = APIRouter(
+    tags=["monitoring"],
+)
+
+logger = logging.getLogger(__name__)
+
+def _cache_stats():
+    caches = {
+        **auth.cache_stats(),
+        "user_scores": scores.cache_stats(),
+        "autocompletion": autocompletion.cache.stats(),
+        "recipes": match_recipes.cache.stats(),
+    }
+    for cache, stats in caches.items():
+        for stat, value in stats.items():
+            yield (cache, stat), value
+
+def _password_hasher_stats():
+    for stat, value in password_hasher.stats().items():
+        yield (stat,), value
+
+def _threadpool_stats():
+    # 동기 엔드포인트와 run_in_threadpool이 쓰는 anyio 기본 스레드풀입니다.
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    yield ("limit",), limiter.total_tokens
+    yield ("busy",), statistics.borrowed_tokens
+    yield ("waiting",), statistics.tasks_waiting
+
+def _admission_stats():
+    for route_class, limit in admission.limits.items():
+        for stat, value in limit.stats().items():
+            yield (route_class, stat), value
+
+metrics.registry.register(metrics.GaugeCollector(
+    "saveplate_cache", "Worker cache statistics", ("cache", "stat"), _cache_stats,
+))
+metrics.registry.register(metrics.GaugeCollector(
+    "saveplate_password_hasher", "Password hashing pool statistics", ("stat",), _password_hasher_stats,
+))
+metrics.registry.register(metrics.GaugeCollector(
+    "saveplate_threadpool", "Request threadpool usage", ("stat",), _threadpool_stats,
+))
+metrics.registry.register(metrics.GaugeCollector(
+    "saveplate_admission", "Adaptive concurrency limit and requests in flight per route class", ("route_class", "stat"), _admission_stats,
+))
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    이 워커의 지표를 Prometheus 텍스트 형식으로 반환합니다.
+
+    Returns:
+        PlainTextResponse: text/plain; version=0.0.4 형식의 지표
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from saveplate.database import ManagedTransaction, transactional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from saveplate.config import settings
+from saveplate.deadlines import deadline
+from saveplate.matching import ingredient_key, match_recipes, DEFAULT_LIMIT, MAX_LIMIT
 from saveplate.model import AvailableRecipeRequest
+from saveplate.streaming import ndjson_response, wants_ndjson
 import logging
 
 router = APIRouter(
@@ -11,32 +14,32 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-@router.post("/available")
-@transactional("read")
-def available_recipes(tx: ManagedTransaction, req: AvailableRecipeRequest) -> list[tuple[str, str, float]]:
+@router.post("/available", dependencies=[Depends(deadline(settings.RECIPE_DEADLINE_SECONDS))])
+def available_recipes(
+    request: Request,
+    req: AvailableRecipeRequest,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0),
+) -> list[tuple[str, str, float]]:
     """
     주어진 재료로 만들 수 있는 레시피를 조회합니다.
+    Accept: application/x-ndjson 이면 결과를 한 줄에 하나씩 보냅니다.
 
     Args:
         req (AvailableRecipeRequest): 사용 가능한 재료와 소스 목록
+        limit (int, optional): 반환할 결과의 최대 개수. 기본값은 20.
+        offset (int, optional): 건너뛸 결과 개수. 기본값은 0.
+        min_similarity (float, optional): 최소 유사도. 기본값은 0.
 
     Returns:
         list[tuple[str, str, float]]: 음식 이름, 레시피 이름, 유사도를 포함한 레시피 목록
     """
     try:
-        result = tx.run("""
-        WITH $ingredients as A
-        MATCH (i)-[]->(r:Recipe)-[:RECIPE_OF]->(f:Food)
-        with A, f, r, collect(i.name) as R 
-        with *, apoc.coll.intersection(A, R) as X
-        where size(X) <> 0
-        with *, size(apoc.coll.intersection(X, R)) as i, size(apoc.coll.union(X, R)) as u
-        where u <> 0
-        with f.name as food, r.name as recipe, i/toFloat(u) as sim
-        return food, recipe, sim order by sim desc
-        """, ingredients=req.ingredients)
-        values: list[tuple[str, str, float]] = result.values()
-        return values
+        matches = match_recipes(ingredient_key(req.ingredients), limit, offset, min_similarity)
+        if wants_ndjson(request):
+            return ndjson_response(matches, "available_recipes")
+        return matches
     except Exception as e:
         logger.error(f"Error in available_recipes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
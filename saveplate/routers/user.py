@@ -1,61 +1,100 @@
-from fastapi import APIRouter, HTTPException, Depends
-from saveplate.database import ManagedTransaction, transactional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from saveplate.config import settings
+from saveplate.database import AsyncManagedTransaction, async_transactional, stream_read
+from saveplate.deadlines import DeadlineExceeded, deadline
 from saveplate.model import AddUserIngredient
 from saveplate.auth import get_current_active_user, User
+from saveplate import records, scores
+from saveplate.matching import DEFAULT_LIMIT, MAX_LIMIT
+from saveplate.streaming import ndjson_response, wants_ndjson
 from typing import List, Dict, Any
 import logging
-from datetime import date
-import neo4j
 
 router = APIRouter(
     prefix="/user",
     tags=["user"],
+    dependencies=[Depends(deadline(settings.USER_DEADLINE_SECONDS))],
     responses={404: {"description": "Not found"}},
 )
 
 logger = logging.getLogger(__name__)
 
+# 요청마다 실행되는 쿼리. schema.HOT_QUERIES가 같은 문자열로 실행 계획을 확인합니다.
+MY_INGREDIENTS_QUERY = """
+    MATCH (u:User)-[r:HAS]->(i) WHERE u.email=$user_email RETURN i, r.amount
+"""
+
+ADD_INGREDIENTS_QUERY = """
+    UNWIND $ingredients AS e
+    MATCH (u:User {email: $user_email})
+    MATCH (i:Ingredient {name: e.name})
+    MERGE (u)-[r:HAS]->(i)
+    ON CREATE SET r.amount = e.amount
+    ON MATCH SET r.amount = r.amount + e.amount
+    RETURN u, i, r.amount AS amount
+"""
+
+PANTRY_NAMES_QUERY = """
+    MATCH (u:User {email: $user_email})-[:HAS]->(i)
+    WHERE labels(i)[0] IN ['Ingredient', 'Sauce']
+    RETURN collect(i.name) AS A
+"""
+
+# 재료 노드의 속성 + amount
+_ingredient_from_record = records.mapping(records.node("i"), amount="r.amount")
+
+# 추가된 재료 한 행. 사용자 노드에서 비밀번호 해시와 리프레시 토큰은 내보내지 않습니다.
+_added_from_record = records.mapping(
+    user=records.node("u", exclude=records.USER_PRIVATE_FIELDS),
+    ingredient=records.node("i"),
+    amount="amount",
+)
+
+@async_transactional("read")
+async def get_ingredients(tx: AsyncManagedTransaction, email: str) -> List[Dict[str, Any]]:
+    result = await tx.run(MY_INGREDIENTS_QUERY, user_email=email)
+    return [_ingredient_from_record(record) async for record in result]
+
+async def stream_ingredients(email: str):
+    async for record in stream_read(MY_INGREDIENTS_QUERY, {"user_email": email}, fetch_size=settings.STREAM_FETCH_SIZE):
+        yield _ingredient_from_record(record)
+
 @router.get("/ingredients")
-@transactional("read")
-def my_ingredients(
-    tx: ManagedTransaction,
+async def my_ingredients(
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ) -> List[Dict[str, Any]]:
     """
     사용자의 재료 목록을 조회합니다.
+    Accept: application/x-ndjson 이면 데이터베이스 커서에서 읽는 대로 한 줄에 하나씩 보냅니다.
 
     Returns:
         List[Dict[str, Any]]: 사용자가 가지고 있는 재료 목록
     """
+    if wants_ndjson(request):
+        return ndjson_response(stream_ingredients(current_user.email), "my_ingredients")
     try:
-        result = tx.run("""
-            MATCH (u:User)-[r:HAS]->(i) WHERE u.email=$user_email RETURN i, r.amount
-        """, user_email=current_user.email)
-
-        ingredients = []
-        for record in result:
-            ingredient = dict(record["i"])
-            ingredient["amount"] = record["r.amount"]
-            if "birth_date" in ingredient and isinstance(ingredient["birth_date"], neo4j.time.Date):
-                ingredient["birth_date"] = date.fromisoformat(str(ingredient["birth_date"]))
-            if "join_date" in ingredient and isinstance(ingredient["join_date"], neo4j.time.Date):
-                ingredient["join_date"] = date.fromisoformat(str(ingredient["join_date"]))
-            ingredients.append(ingredient)
-
-        return ingredients
+        return records.json_response(await get_ingredients(current_user.email))
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error in my_ingredients: {type(e).__name__}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@async_transactional("write")
+async def add_ingredients(tx: AsyncManagedTransaction, email: str, ingredients: list[dict[str, Any]]) -> List[Dict[str, Any]]:
+    user_result = await tx.run(ADD_INGREDIENTS_QUERY, user_email=email, ingredients=ingredients)
+
+    return [_added_from_record(record) async for record in user_result]
+
 @router.post("/ingredient")
-@transactional("write")
-def add_ingredient(
-    tx: ManagedTransaction,
+async def add_ingredient(
     req: AddUserIngredient,
     current_user: User = Depends(get_current_active_user)
 ) -> List[Dict[str, Any]]:
     """
     사용자의 재료를 추가합니다.
+    커밋된 뒤 사용자의 레시피 유사도 표에 추가된 재료만 반영합니다.
 
     Args:
         req (AddUserIngredient): 추가할 재료 목록
@@ -64,58 +103,43 @@ def add_ingredient(
         List[Dict[str, Any]]: 추가된 사용자와 재료 정보
     """
     try:
-        ingredients = req.ingredients
-        user_result = tx.run("""
-            UNWIND $ingredients AS e
-            MATCH (u:User {email: $user_email})
-            MATCH (i:Ingredient {name: e.name})
-            MERGE (u)-[r:HAS]->(i)
-            ON CREATE SET r.amount = e.amount
-            ON MATCH SET r.amount = r.amount + e.amount
-            RETURN u, i, r.amount AS amount
-        """, user_email=current_user.email, ingredients=[ing.model_dump() for ing in ingredients])
-        
-        result = []
-        for record in user_result:
-            user_data = dict(record["u"])
-            ingredient_data = dict(record["i"])
-            if "birth_date" in user_data and isinstance(user_data["birth_date"], neo4j.time.Date):
-                user_data["birth_date"] = date.fromisoformat(str(user_data["birth_date"]))
-            if "join_date" in user_data and isinstance(user_data["join_date"], neo4j.time.Date):
-                user_data["join_date"] = date.fromisoformat(str(user_data["join_date"]))
-            result.append({
-                "user": user_data,
-                "ingredient": ingredient_data,
-                "amount": record["amount"]
-            })
-
-        return result
+        result = await add_ingredients(current_user.email, [ing.model_dump() for ing in req.ingredients])
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error in add_ingredient: {type(e).__name__}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    scores.apply_added(current_user.email, [row["ingredient"].get("name") for row in result])
+    return records.json_response(result)
+
+# 유사도 표를 다시 만들 때 씁니다. 표는 재료를 바꾼 뒤 올린 버전으로 캐시되는데, 그 쓰기의 북마크를 모르는 요청
+# (다른 기기 등)이 지연된 복제본에서 바뀌기 전 재료를 읽으면 새 버전으로 캐시되므로 주 인스턴스에서 읽습니다.
+@async_transactional("read", primary=True)
+async def get_pantry_names(tx: AsyncManagedTransaction, email: str) -> list[str]:
+    result = await tx.run(PANTRY_NAMES_QUERY, user_email=email)
+    record = await result.single()
+    return record["A"]
 
 # 주석 처리된 쿼리는 함수로 구현하지 않았지만, 필요하다면 다음과 같이 구현할 수 있습니다:
-@router.get("/recipes")
-@transactional("read")
-def get_available_recipes(
-    tx: ManagedTransaction,
+@router.get("/recipes", dependencies=[Depends(deadline(settings.RECIPE_DEADLINE_SECONDS))])
+async def get_available_recipes(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0),
     current_user: User = Depends(get_current_active_user)
 ) -> List[Dict[str, Any]]:
     try:
-        result = tx.run('''
-        MATCH (u:User {email: $user_email})-[:HAS]->(i)
-        WHERE labels(i)[0] IN ['Ingredient', 'Sauce']
-        WITH collect(i.name) AS A
-        MATCH (i)-[]->(r:Recipe)-[:RECIPE_OF]->(f:Food)
-        WITH A, f, r, collect(i.name) AS R 
-        WITH *, apoc.coll.intersection(A, R) AS X
-        WHERE size(X) <> 0
-        WITH *, size(apoc.coll.intersection(X, R)) AS i, size(apoc.coll.union(X, R)) AS u
-        WHERE u <> 0
-        WITH f.name AS food, r.name AS recipe, i/toFloat(u) AS sim
-        RETURN food, recipe, sim ORDER BY sim DESC
-        ''', user_email=current_user.email)
-        return result.data()
+        user_scores = await scores.get_user_scores(current_user.email, get_pantry_names)
+        rows = (
+            {"food": food, "recipe": recipe, "sim": sim}
+            for food, recipe, sim in user_scores.top(limit=limit, offset=offset, min_similarity=min_similarity)
+        )
+        if wants_ndjson(request):
+            return ndjson_response(rows, "get_available_recipes")
+        return records.json_response(list(rows))
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error in get_available_recipes: {type(e).__name__}")
         raise HTTPException(status_code=500, detail="Internal server error")
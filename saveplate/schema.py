@@ -0,0 +1,108 @@
+"""
+서버가 의존하는 제약 조건과 인덱스를 시작 시 만들고 확인합니다.
+
+- SCHEMA에 선언한 제약 조건/인덱스 중 없는 것을 만들고, 모두 ONLINE이 될 때까지 기다립니다.
+- HOT_QUERIES의 실행 계획(EXPLAIN)에 레이블 전체 스캔이 있으면 로그를 남기고 ready를 거짓으로 두어,
+  /health/ready가 503을 반환해 인덱스 없이 트래픽을 받지 않도록 합니다. 워커는 계속 실행됩니다.
+"""
+from saveplate import auth
+from saveplate.database import useSession
+from saveplate.routers import user
+from typing import Any, Iterator
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SchemaError(Exception):
+    pass
+
+# bootstrap()이 성공하면 참이 됩니다. 준비 상태(readiness) 확인에 사용합니다.
+ready = False
+
+SCHEMA: dict[str, str] = {
+    # 로그인, 회원가입 중복 확인, 토큰 갱신 등 모든 인증 경로의 이메일 조회
+    "user_email_unique": "CREATE CONSTRAINT user_email_unique IF NOT EXISTS FOR (u:User) REQUIRE u.email IS UNIQUE",
+    # /auth/refresh 의 refresh_token 조회
+    "user_refresh_token": "CREATE INDEX user_refresh_token IF NOT EXISTS FOR (u:User) ON (u.refresh_token)",
+    # 냉장고 재료 추가와 이름 접두사(STARTS WITH) 검색
+    "ingredient_name": "CREATE INDEX ingredient_name IF NOT EXISTS FOR (n:Ingredient) ON (n.name)",
+    "sauce_name": "CREATE INDEX sauce_name IF NOT EXISTS FOR (n:Sauce) ON (n.name)",
+}
+
+# 요청마다 실행되는 쿼리와 EXPLAIN에 넘길 예시 파라미터. 쿼리는 실제로 실행하는 모듈의 상수를 그대로 씁니다.
+# (EXPLAIN은 쿼리를 실행하지 않으므로 쓰기 쿼리도 그대로 확인할 수 있습니다.)
+HOT_QUERIES: dict[str, tuple[str, dict[str, Any]]] = {
+    "get_user": (auth.GET_USER_QUERY, {"email": ""}),
+    "get_user_by_refresh_token": (auth.GET_USER_BY_REFRESH_TOKEN_QUERY, {"refresh_token": ""}),
+    "save_refresh_token": (auth.SAVE_REFRESH_TOKEN_QUERY, {"email": "", "refresh_token": ""}),
+    "my_ingredients": (user.MY_INGREDIENTS_QUERY, {"user_email": ""}),
+    "add_ingredient": (user.ADD_INGREDIENTS_QUERY, {"ingredients": [{"name": "", "amount": 0}], "user_email": ""}),
+    "pantry_names": (user.PANTRY_NAMES_QUERY, {"user_email": ""}),
+}
+
+# 인덱스를 쓰지 못하고 레이블/전체 노드를 훑는 연산자
+_SCAN_OPERATORS = ("NodeByLabelScan", "AllNodesScan")
+
+def _operators(plan: dict[str, Any]) -> Iterator[str]:
+    # Neo4j 5는 "NodeByLabelScan@neo4j" 형태로 반환합니다.
+    yield plan["operatorType"].split("@")[0]
+    for child in plan.get("children", ()):
+        yield from _operators(child)
+
+def ensure_schema(timeout_seconds: float) -> list[str]:
+    """
+    없는 제약 조건과 인덱스를 만들고 모두 ONLINE이 될 때까지 기다립니다.
+
+    Args:
+        timeout_seconds (float): 인덱스 생성을 기다릴 최대 시간
+
+    Returns:
+        list[str]: 새로 만든 제약 조건/인덱스 이름 목록
+    """
+    with useSession() as session:
+        # 스키마 변경은 데이터 변경과 한 트랜잭션에 섞을 수 없으므로 자동 커밋 쿼리로 실행합니다.
+        created = []
+        for name, statement in SCHEMA.items():
+            counters = session.run(statement).consume().counters
+            if counters.indexes_added or counters.constraints_added:
+                created.append(name)
+        if created:
+            logger.info(f"Created schema: {', '.join(created)}")
+        try:
+            session.run("CALL db.awaitIndexes($timeout)", timeout=int(timeout_seconds)).consume()
+        except Exception as e:
+            raise SchemaError(f"Indexes did not come online within {timeout_seconds}s: {str(e)}") from e
+        return created
+
+def verify_plans() -> dict[str, list[str]]:
+    """
+    HOT_QUERIES의 실행 계획을 확인하고, 레이블 스캔이 포함된 쿼리와 그 연산자를 반환합니다.
+    """
+    problems: dict[str, list[str]] = {}
+    with useSession() as session:
+        for name, (query, parameters) in HOT_QUERIES.items():
+            plan = session.run(f"EXPLAIN {query}", parameters).consume().plan
+            scans = [operator for operator in _operators(plan) if operator in _SCAN_OPERATORS]
+            if scans:
+                problems[name] = scans
+    return problems
+
+def bootstrap(timeout_seconds: float, verify: bool = True) -> None:
+    """
+    main.lifespan에서 호출합니다. 인덱스가 ONLINE이 되지 않으면 SchemaError로 시작을 중단하고,
+    실행 계획에 레이블 스캔이 있으면 시작은 계속하되 ready를 거짓으로 둡니다.
+    """
+    global ready
+    ready = False
+    ensure_schema(timeout_seconds)
+    if not verify:
+        ready = True
+        return
+    problems = verify_plans()
+    if problems:
+        for name, scans in problems.items():
+            logger.error(f"Query {name} is not using an index: {', '.join(scans)}")
+        logger.error(f"Not ready: hot queries without index support: {', '.join(problems)}")
+        return
+    ready = True
+    logger.info(f"Verified index usage of {len(HOT_QUERIES)} queries")
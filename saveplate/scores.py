@@ -0,0 +1,85 @@
+"""
+사용자별 레시피 유사도 표(matching.UserScores)를 워커 메모리에 유지합니다.
+
+표는 재료 목록의 버전과 함께 저장합니다. 버전은 워커 간 공유 캐시의 카운터라서,
+어느 워커에서든 재료가 바뀌면(bump_pantry_version) 다른 워커의 표는 다음 조회 때 다시 만들어집니다.
+재료를 바꾼 워커는 자신의 표에 추가된 재료만 반영(apply_added)해 다시 만들지 않고 씁니다.
+"""
+from fastapi.concurrency import run_in_threadpool
+from saveplate.config import settings
+from saveplate.matching import UserScores, get_recipe_index
+from saveplate.sharedcache import shared_cache
+from saveplate.util import TTLCache
+from typing import Awaitable, Callable, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+_NAMESPACE = "pantry-version"
+# 표보다 오래 남아야 버전이 사라져 불필요하게 다시 만드는 일이 줄어듭니다.
+_VERSION_TTL_SECONDS = 60 * 60 * 24
+
+def _entry_weight(entry: tuple[int | None, UserScores]) -> int:
+    # 표의 크기는 재료가 하나 이상 겹치는 레시피 수에 비례합니다 (counts와 ranking에 하나씩).
+    return len(entry[1].counts)
+
+_score_cache: TTLCache[str, tuple[int | None, UserScores]] = TTLCache(
+    maxsize=settings.USER_SCORE_CACHE_SIZE,
+    ttl_seconds=settings.USER_SCORE_CACHE_TTL_SECONDS,
+    weigh=_entry_weight,
+    max_weight=settings.USER_SCORE_CACHE_MAX_RECIPES,
+)
+
+def cache_stats() -> dict[str, int]:
+    return _score_cache.stats()
+
+def _current_version(email: str) -> int | None:
+    # 공유 캐시를 쓸 수 없으면 None을 반환하고, 이 경우 표를 매번 다시 만듭니다.
+    try:
+        version = shared_cache.get(_NAMESPACE, email)
+        return version if isinstance(version, int) else shared_cache.incr(_NAMESPACE, email, _VERSION_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Pantry version unavailable: {type(e).__name__}")
+        return None
+
+def _bump_version(email: str) -> int | None:
+    try:
+        return shared_cache.incr(_NAMESPACE, email, _VERSION_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Pantry version unavailable: {type(e).__name__}")
+        return None
+
+async def get_user_scores(email: str, load_pantry: Callable[[str], Awaitable[list[str]]]) -> UserScores:
+    """
+    사용자의 유사도 표를 반환합니다. 재료 목록이나 레시피 카탈로그가 바뀌었으면 load_pantry로 다시 만듭니다.
+    load_pantry는 읽기 복제본이 아닌 주 인스턴스에서 읽어야 합니다. 복제 지연으로 바뀌기 전 재료를 읽으면
+    그 표가 바뀐 뒤의 버전으로 캐시되기 때문입니다.
+    """
+    # 재료를 읽기 전에 버전을 읽어야, 읽는 도중에 바뀐 내용이 다음 조회에서 버전 차이로 드러납니다.
+    version = _current_version(email)
+    index = get_recipe_index()
+    entry = _score_cache.get(email)
+    if entry is not None and version is not None and entry[0] == version and entry[1].index is index:
+        return entry[1]
+    pantry = await load_pantry(email)
+    # 표를 새로 만드는 비용은 재료가 겹치는 레시피 수(최대 카탈로그 크기)에 비례하므로 이벤트 루프 밖에서 만듭니다.
+    scores = await run_in_threadpool(UserScores, index, pantry)
+    _score_cache.set(email, (version, scores))
+    return scores
+
+def apply_added(email: str, ingredients: Iterable[str]) -> None:
+    """
+    재료를 추가한 트랜잭션이 커밋된 뒤 호출합니다. 버전을 올리고, 이 워커의 표가 직전 버전이면
+    추가된 재료만 반영합니다. 그 사이 다른 워커가 버전을 올렸다면 표를 버립니다.
+    """
+    entry = _score_cache.get(email)
+    version = _bump_version(email)
+    if entry is None:
+        return
+    previous, scores = entry
+    if version is None or previous is None or version != previous + 1 or scores.index is not get_recipe_index():
+        _score_cache.pop(email)
+        return
+    changed = scores.add(ingredients)
+    _score_cache.set(email, (version, scores))
+    logger.debug(f"Updated {changed} recipe scores for a pantry change")
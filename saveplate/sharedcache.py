@@ -0,0 +1,202 @@
+"""
+같은 머신의 모든 워커 프로세스가 공유하는 캐시입니다.
+
+/dev/shm 등의 파일을 mmap해서 고정 크기 슬롯의 4-way set-associative 해시 테이블로 사용합니다.
+- 읽기는 잠금 없이 슬롯의 시퀀스 번호(seqlock)로 일관성을 확인합니다. 쓰는 중(홀수)이거나
+  읽는 동안 번호가 바뀌면 miss로 처리합니다.
+- 쓰기는 해당 set의 바이트 범위에 fcntl 잠금을 걸고 시퀀스 번호를 홀수 → 짝수로 올립니다.
+  fcntl 잠금은 같은 프로세스의 스레드끼리는 막지 못하므로 프로세스 안의 잠금도 함께 잡습니다.
+- 네임스페이스마다 세대(generation) 번호가 있어, invalidate()로 번호를 올리면 모든 워커에서
+  그 네임스페이스의 기존 항목이 한 번에 무효가 됩니다.
+값은 JSON으로 직렬화하며, 슬롯에 들어가지 않는 큰 값은 공유하지 않습니다.
+"""
+from contextlib import contextmanager
+from saveplate.config import settings
+from typing import Any, Hashable, Iterator
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MISSING: Any = object()
+
+_MAGIC = b"SPCACHE1"
+_HEADER = struct.Struct("<8sII")  # magic, slot_count, slot_size
+_NAMESPACES = 64
+_GENERATIONS_OFFSET = 64
+_GENERATION = struct.Struct("<Q")
+_SLOTS_OFFSET = 4096
+_WAYS = 4
+
+# seq, key_hash, expires_at, generation, namespace, key_len, value_len
+_SLOT = struct.Struct("<QQdQIII")
+_SLOT_HEADER_SIZE = 48
+_SEQ = struct.Struct("<Q")
+
+def _default_path(identity: str, slot_count: int, slot_size: int) -> str:
+    # 같은 머신의 다른 배포(다른 데이터베이스)나 슬롯 구성이 다른 배포가 같은 파일을 쓰지 않도록
+    # 파일 이름에 데이터베이스 식별자의 해시와 구성을 넣습니다.
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    digest = hashlib.blake2b(identity.encode(), digest_size=6).hexdigest()
+    return os.path.join(directory, f"saveplate-cache-{digest}-{slot_count}x{slot_size}")
+
+def _namespace_index(namespace: str) -> int:
+    return int.from_bytes(hashlib.blake2b(namespace.encode(), digest_size=4).digest(), "little") % _NAMESPACES
+
+def _encode_key(namespace: str, key: Hashable) -> tuple[bytes, int]:
+    # 프로세스마다 달라지는 hash() 대신 repr의 blake2b 해시를 씁니다.
+    key_bytes = f"{namespace}:{key!r}".encode()
+    key_hash = int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") or 1
+    return key_bytes, key_hash
+
+class SharedCache:
+    """
+    :param path: 공유 파일 경로
+    :param slot_count: 슬롯 수 (_WAYS의 배수로 내림합니다)
+    :param slot_size: 슬롯 하나의 바이트 수. 키와 JSON 값이 이 안에 들어가야 공유됩니다.
+    """
+    def __init__(self, path: str, *, slot_count: int, slot_size: int):
+        self.path = path
+        self.slot_count = max(_WAYS, slot_count - slot_count % _WAYS)
+        self.slot_size = slot_size
+        self.oversized = 0
+        self._set_count = self.slot_count // _WAYS
+        self._size = _SLOTS_OFFSET + self.slot_count * self.slot_size
+        self._fd: int | None = None
+        self._mm: mmap.mmap | None = None
+        self._pid: int | None = None
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _map(self) -> mmap.mmap:
+        # fork 뒤에는 파일 잠금이 프로세스별이므로 워커마다 다시 엽니다.
+        if self._mm is not None and self._pid == os.getpid():
+            return self._mm
+        with self._open_lock:
+            if self._mm is None or self._pid != os.getpid():
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.lockf(fd, fcntl.LOCK_EX, _SLOTS_OFFSET, 0)
+                try:
+                    header = _HEADER.pack(_MAGIC, self.slot_count, self.slot_size)
+                    if os.fstat(fd).st_size < self._size or os.pread(fd, _HEADER.size, 0) != header:
+                        # 다른 프로세스가 매핑 중일 수 있으므로 파일을 줄이지는 않습니다.
+                        os.ftruncate(fd, max(self._size, os.fstat(fd).st_size))
+                        os.pwrite(fd, header, 0)
+                        logger.info(f"Initialized shared cache at {self.path} ({self._size // (1 << 20)}MiB)")
+                finally:
+                    fcntl.lockf(fd, fcntl.LOCK_UN, _SLOTS_OFFSET, 0)
+                self._fd = fd
+                self._mm = mmap.mmap(fd, self._size)
+                self._pid = os.getpid()
+        return self._mm
+
+    def generation(self, namespace: str) -> int:
+        return _GENERATION.unpack_from(self._map(), _GENERATIONS_OFFSET + _namespace_index(namespace) * 8)[0]
+
+    def invalidate(self, namespace: str) -> None:
+        """네임스페이스의 세대 번호를 올려 모든 워커에서 기존 항목을 무효화합니다."""
+        mm = self._map()
+        offset = _GENERATIONS_OFFSET + _namespace_index(namespace) * 8
+        with self._locked(offset, _GENERATION.size):
+            _GENERATION.pack_into(mm, offset, _GENERATION.unpack_from(mm, offset)[0] + 1)
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        mm = self._map()
+        key_bytes, key_hash = _encode_key(namespace, key)
+        generation = self.generation(namespace)
+        now = time.time()
+        base = _SLOTS_OFFSET + (key_hash % self._set_count) * _WAYS * self.slot_size
+        for way in range(_WAYS):
+            offset = base + way * self.slot_size
+            seq, slot_hash, expires_at, slot_generation, _, key_len, value_len = _SLOT.unpack_from(mm, offset)
+            if seq & 1 or slot_hash != key_hash:
+                continue
+            if expires_at <= now or slot_generation != generation:
+                return MISSING
+            start = offset + _SLOT_HEADER_SIZE
+            data = mm[start:start + key_len + value_len]
+            if _SEQ.unpack_from(mm, offset)[0] != seq or data[:key_len] != key_bytes:
+                continue
+            return json.loads(data[key_len:])
+        return MISSING
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl_seconds: float) -> bool:
+        mm = self._map()
+        key_bytes, key_hash = _encode_key(namespace, key)
+        payload = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        if _SLOT_HEADER_SIZE + len(key_bytes) + len(payload) > self.slot_size:
+            self.oversized += 1
+            return False
+        with self._locked_set(key_hash) as base:
+            self._store(mm, base, namespace, key_bytes, key_hash, payload, ttl_seconds)
+        return True
+
+    def incr(self, namespace: str, key: Hashable, ttl_seconds: float) -> int:
+        """
+        정수 값을 원자적으로 1 올리고 새 값을 반환합니다.
+        항목이 없으면(만료, 밀려남 포함) 임의의 값에서 시작하므로, 값이 사라졌다가 다시 만들어져도
+        이전에 본 값과 우연히 같아질 가능성이 거의 없습니다.
+        """
+        mm = self._map()
+        key_bytes, key_hash = _encode_key(namespace, key)
+        with self._locked_set(key_hash) as base:
+            current = self.get(namespace, key)
+            value = int.from_bytes(os.urandom(6), "little") if current is MISSING else current + 1
+            self._store(mm, base, namespace, key_bytes, key_hash, str(value).encode(), ttl_seconds)
+        return value
+
+    @contextmanager
+    def _locked(self, offset: int, length: int) -> Iterator[None]:
+        # fcntl 잠금은 프로세스 단위이므로 같은 워커의 스레드끼리는 threading.Lock으로 막습니다.
+        with self._write_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, offset)
+
+    @contextmanager
+    def _locked_set(self, key_hash: int) -> Iterator[int]:
+        base = _SLOTS_OFFSET + (key_hash % self._set_count) * _WAYS * self.slot_size
+        with self._locked(base, _WAYS * self.slot_size):
+            yield base
+
+    def _store(self, mm: mmap.mmap, base: int, namespace: str, key_bytes: bytes, key_hash: int, payload: bytes, ttl_seconds: float) -> None:
+        generation = self.generation(namespace)
+        now = time.time()
+        # 같은 키 > 비었거나 만료된 슬롯 > 가장 먼저 만료되는 슬롯 순으로 고릅니다.
+        victim, victim_rank = base, None
+        for way in range(_WAYS):
+            offset = base + way * self.slot_size
+            _, slot_hash, expires_at, slot_generation, slot_namespace, _, _ = _SLOT.unpack_from(mm, offset)
+            if slot_hash == key_hash:
+                victim = offset
+                break
+            stale = slot_hash == 0 or expires_at <= now or slot_generation != self._generation_at(mm, slot_namespace)
+            rank = (not stale, expires_at)
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+        writing = _SEQ.unpack_from(mm, victim)[0] | 1
+        _SEQ.pack_into(mm, victim, writing)
+        start = victim + _SLOT_HEADER_SIZE
+        mm[start:start + len(key_bytes) + len(payload)] = key_bytes + payload
+        _SLOT.pack_into(mm, victim, writing, key_hash, now + ttl_seconds, generation,
+                        _namespace_index(namespace), len(key_bytes), len(payload))
+        _SEQ.pack_into(mm, victim, writing + 1)
+
+    def _generation_at(self, mm: mmap.mmap, namespace_index: int) -> int:
+        return _GENERATION.unpack_from(mm, _GENERATIONS_OFFSET + namespace_index * 8)[0]
+
+shared_cache = SharedCache(
+    settings.SHARED_CACHE_PATH or _default_path(f"{settings.DB_URL}|{settings.DB_USER}", settings.SHARED_CACHE_SLOTS, settings.SHARED_CACHE_SLOT_SIZE),
+    slot_count=settings.SHARED_CACHE_SLOTS,
+    slot_size=settings.SHARED_CACHE_SLOT_SIZE,
+)
@@ -0,0 +1,141 @@
+"""
+트랜잭션 함수가 임계값보다 오래 걸리면 쿼리를 기록하는 슬로 쿼리 로그입니다.
+
+- 기록은 크기가 고정된 링 버퍼에 남고 /admin/slow-queries 로 조회합니다.
+- 파라미터 값은 남기지 않고 형태(타입, 길이, 키)만 남깁니다.
+- 일부(sample_rate)는 백그라운드 스레드에서 가장 느린 쿼리를 다시 실행해 실행 계획을 붙입니다.
+  읽기 트랜잭션은 PROFILE(실제 db hits 포함), 쓰기 트랜잭션은 데이터를 바꾸지 않도록 EXPLAIN을 씁니다.
+  같은 쿼리는 profile_interval_seconds 동안 한 번만, 한 번에 하나씩만 실행합니다.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from saveplate import database
+from saveplate.config import settings
+from typing import Any, Iterable, Protocol
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class QueryTiming(Protocol):
+    text: str
+    parameters: dict[str, Any]
+    seconds: float
+
+def parameter_shape(value: Any, depth: int = 0) -> Any:
+    """
+    값을 지우고 형태만 남깁니다. 예: {"email": "a@b.c"} → {"email": "str(5)"}
+    """
+    if depth > 3:
+        return type(value).__name__
+    if isinstance(value, dict):
+        return {str(k): parameter_shape(v, depth + 1) for k, v in list(value.items())[:20]}
+    if isinstance(value, (list, tuple)):
+        return [f"{type(value).__name__}({len(value)})", *(parameter_shape(v, depth + 1) for v in value[:1])]
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+def _plan_tree(plan: dict[str, Any]) -> dict[str, Any]:
+    # 드라이버가 돌려주는 계획에서 회귀를 알아보는 데 필요한 항목만 남깁니다.
+    args = plan.get("args", {})
+    return {
+        "operator": plan.get("operatorType", "").split("@")[0],
+        "details": args.get("Details"),
+        "estimated_rows": args.get("EstimatedRows"),
+        "rows": plan.get("rows"),
+        "db_hits": plan.get("dbHits"),
+        "children": [_plan_tree(child) for child in plan.get("children", ())],
+    }
+
+def _total_db_hits(plan: dict[str, Any]) -> int:
+    return (plan.get("dbHits") or 0) + sum(_total_db_hits(child) for child in plan.get("children", ()))
+
+class SlowQueryLog:
+    """
+    :param capacity: 보관할 최대 기록 수
+    :param threshold_seconds: 트랜잭션 함수 한 번의 쿼리 시간(execute + consume)이 이를 넘으면 기록합니다.
+    :param sample_rate: 실행 계획을 캡처할 기록의 비율
+    :param profile_interval_seconds: 같은 쿼리의 실행 계획을 다시 캡처하기까지의 최소 간격
+    """
+    def __init__(self, *, capacity: int, threshold_seconds: float, sample_rate: float, profile_interval_seconds: float = 60):
+        self.threshold_seconds = threshold_seconds
+        self.sample_rate = sample_rate
+        self.profile_interval_seconds = profile_interval_seconds
+        self._entries: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._profiled_at: dict[str, float] = {}
+        self._profiling = False
+        self._executor: ThreadPoolExecutor | None = None
+
+    def observe(self, function_name: str, access: str, seconds: float, queries: Iterable[QueryTiming]) -> None:
+        if seconds < self.threshold_seconds:
+            return
+        queries = list(queries)
+        entry = {
+            "time": datetime.now(UTC).isoformat(),
+            "function": function_name,
+            "access": access,
+            "duration_ms": round(seconds * 1000, 3),
+            "queries": [
+                {"query": q.text.strip(), "parameters": parameter_shape(q.parameters), "duration_ms": round(q.seconds * 1000, 3)}
+                for q in queries
+            ],
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(f"Slow transaction {function_name} took {seconds * 1000:.1f}ms ({len(queries)} queries)")
+        if queries and random.random() < self.sample_rate:
+            self._schedule_profile(entry, max(queries, key=lambda q: q.seconds), access)
+
+    def entries(self) -> list[dict[str, Any]]:
+        """최근 기록부터 반환합니다."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _schedule_profile(self, entry: dict[str, Any], query: QueryTiming, access: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._profiling or now - self._profiled_at.get(query.text, -self.profile_interval_seconds) < self.profile_interval_seconds:
+                return
+            self._profiling = True
+            self._profiled_at[query.text] = now
+            if len(self._profiled_at) > 1000:
+                self._profiled_at.clear()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-profile")
+        # 요청을 처리하는 스레드나 이벤트 루프를 막지 않도록 별도 스레드에서 실행합니다.
+        self._executor.submit(self._profile, entry, query.text, dict(query.parameters), access)
+
+    def _profile(self, entry: dict[str, Any], text: str, parameters: dict[str, Any], access: str) -> None:
+        mode = "PROFILE" if access == "read" else "EXPLAIN"
+        try:
+            with database.useSession() as session:
+                summary = session.run(f"{mode} {text}", parameters).consume()
+            plan = summary.profile if mode == "PROFILE" else summary.plan
+            entry["plan"] = {
+                "mode": mode,
+                "query": text.strip(),
+                "db_hits": _total_db_hits(plan) if mode == "PROFILE" else None,
+                "tree": _plan_tree(plan),
+            }
+        except Exception as e:
+            logger.error(f"Failed to capture plan for slow query: {type(e).__name__}")
+            entry["plan"] = {"mode": mode, "error": type(e).__name__}
+        finally:
+            with self._lock:
+                self._profiling = False
+
+slow_queries = SlowQueryLog(
+    capacity=settings.SLOW_QUERY_LOG_SIZE,
+    threshold_seconds=settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+    sample_rate=settings.SLOW_QUERY_PROFILE_SAMPLE_RATE,
+)
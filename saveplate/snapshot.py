@@ -0,0 +1,294 @@
+"""
+레시피/자동완성 카탈로그의 바이너리 스냅숏입니다.
+
+    python -m saveplate.snapshot export [--output PATH]
+
+export는 Neo4j에서 카탈로그를 읽어 파일로 쓰고(임시 파일에 쓴 뒤 os.replace로 교체), 새 버전 번호를
+(:CatalogMeta) 노드에 기록합니다. CATALOG_SNAPSHOT_PATH가 설정된 워커는 파일을 읽기 전용으로 mmap하고
+배열을 복사하지 않고 memoryview로 바로 쓰므로, 시작이 빠르고 페이지는 OS 페이지 캐시로 모든 워커가 공유합니다.
+Neo4j에는 새 버전이 나왔는지만 묻습니다. popularity도 export할 때의 값이므로 export를 주기적으로 실행해야 합니다.
+레시피 인덱스(CSR)는 스냅숏을 그대로 쓰지만, 자동완성은 이름과 popularity만 스냅숏에서 읽고 접두사/오타 인덱스는
+워커마다 만듭니다 (completion.build_completion_indexes).
+
+형식 (리틀 엔디언, 섹션은 8바이트 정렬):
+- 헤더: magic, 버전, 만든 시각, 섹션 수. 이어서 섹션 표 (이름, 오프셋, 원소 수, 타입 코드)
+- strings.offsets / strings.data: 모든 이름을 한 번씩만 담은 UTF-8 문자열 표
+- ingredient.names: 재료 id → 문자열 id
+- recipe.foods / recipe.names / recipe.sizes: 레시피 id(재료 수 오름차순) → 음식 이름, 레시피 이름, 재료 수
+- recipe.offsets / recipe.items: 레시피 → 재료 id (CSR)
+- posting.offsets / posting.items: 재료 → 레시피 id (CSR, RecipeIndex.postings)
+- completion.<타입>.names / completion.<타입>.popularity: 자동완성 이름과 popularity (null은 NaN)
+"""
+from array import array
+from collections.abc import Sequence
+from saveplate import database
+from saveplate.config import settings
+from saveplate.database import ManagedTransaction, transactional
+from typing import Hashable, Iterable
+import argparse
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SPSNAP01"
+_HEADER = struct.Struct("<8sQdI")  # magic, version, created_at, section_count
+_SECTION = struct.Struct("<32sQQ1s")  # name, offset, length(원소 수), typecode
+_ALIGN = 8
+
+class SnapshotError(Exception):
+    pass
+
+class StringTable(Sequence[str]):
+    """오프셋 배열과 UTF-8 바이트로 된 문자열 표입니다. 읽을 때마다 해당 이름만 디코드합니다."""
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+class Column(Sequence[str]):
+    """문자열 id 배열을 문자열 표로 풀어 보여 줍니다 (RecipeIndex.foods 등)."""
+    def __init__(self, strings: StringTable, ids: Sequence[int]):
+        self._strings = strings
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i: int) -> str:
+        return self._strings[self._ids[i]]
+
+class Snapshot:
+    """
+    mmap한 스냅숏 파일입니다. 반환하는 memoryview가 살아 있는 동안 매핑도 유지됩니다.
+    """
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise SnapshotError("Snapshots can only be mapped on little-endian hosts")
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat.st_size < _HEADER.size:
+            raise SnapshotError(f"{path} is too small to be a snapshot")
+        magic, self.version, self.created_at, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise SnapshotError(f"{path} is not a catalog snapshot")
+        self._sections: dict[str, tuple[int, int, str]] = {}
+        for i in range(count):
+            name, offset, length, typecode = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            typecode = typecode.decode()
+            if offset + length * array(typecode).itemsize > stat.st_size:
+                raise SnapshotError(f"{path} is truncated")
+            self._sections[name.rstrip(b"\0").decode()] = (offset, length, typecode)
+        self.strings = StringTable(self.array("strings.offsets"), self.array("strings.data"))
+
+    def array(self, name: str) -> memoryview:
+        try:
+            offset, length, typecode = self._sections[name]
+        except KeyError:
+            raise SnapshotError(f"{self.path} has no section {name}") from None
+        view = memoryview(self._mm)[offset:offset + length * array(typecode).itemsize]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def column(self, name: str) -> Column:
+        return Column(self.strings, self.array(name))
+
+    def csr(self, name: str) -> list[memoryview]:
+        offsets, items = self.array(f"{name}.offsets"), self.array(f"{name}.items")
+        return [items[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def completion_entries(self, type: str) -> list[tuple[str, float | None]]:
+        names, popularity = self.array(f"completion.{type}.names"), self.array(f"completion.{type}.popularity")
+        strings = self.strings
+        return [(strings[names[i]], None if math.isnan(popularity[i]) else popularity[i]) for i in range(len(names))]
+
+def _csr(rows: Iterable[Iterable[int]]) -> tuple[array, array]:
+    offsets, items = array("I", [0]), array("I")
+    for row in rows:
+        items.extend(row)
+        offsets.append(len(items))
+    return offsets, items
+
+def write_snapshot(
+    path: str,
+    version: int,
+    *,
+    ingredient_names: Sequence[str],
+    foods: Sequence[str],
+    recipes: Sequence[str],
+    sizes: Sequence[int],
+    postings: Sequence[Sequence[int]],
+    completion: dict[str, list[tuple[str, float | None]]],
+) -> int:
+    """
+    스냅숏을 path 옆의 임시 파일에 쓴 뒤 원자적으로 교체하고 파일 크기를 반환합니다.
+    이미 mmap한 워커는 교체 전 파일(inode)을 계속 읽으므로 도중에 깨진 데이터를 보지 않습니다.
+    """
+    if sys.byteorder != "little":
+        raise SnapshotError("Snapshots can only be written on little-endian hosts")
+    interned: dict[str, int] = {}
+
+    def intern(names: Iterable[str]) -> array:
+        return array("I", (interned.setdefault(name, len(interned)) for name in names))
+
+    adjacency: list[list[int]] = [[] for _ in range(len(sizes))]
+    for ingredient_id, posting in enumerate(postings):
+        for recipe_id in posting:
+            adjacency[recipe_id].append(ingredient_id)
+
+    sections: dict[str, array | bytes] = {
+        "ingredient.names": intern(ingredient_names),
+        "recipe.foods": intern(foods),
+        "recipe.names": intern(recipes),
+        "recipe.sizes": array("I", sizes),
+    }
+    sections["recipe.offsets"], sections["recipe.items"] = _csr(adjacency)
+    sections["posting.offsets"], sections["posting.items"] = _csr(postings)
+    for type, entries in completion.items():
+        sections[f"completion.{type}.names"] = intern(name for name, _ in entries if name is not None)
+        sections[f"completion.{type}.popularity"] = array("d", (math.nan if p is None else p for name, p in entries if name is not None))
+    encoded = [name.encode() for name in interned]
+    string_offsets = array("I", [0])
+    for name in encoded:
+        string_offsets.append(string_offsets[-1] + len(name))
+    sections["strings.offsets"] = string_offsets
+    sections["strings.data"] = b"".join(encoded)
+
+    offset = _HEADER.size + len(sections) * _SECTION.size
+    table = []
+    for name, values in sections.items():
+        offset += -offset % _ALIGN
+        typecode = values.typecode if isinstance(values, array) else "B"
+        table.append((name, offset, len(values), typecode, values))
+        offset += len(values) * (values.itemsize if isinstance(values, array) else 1)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(temporary, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, version, time.time(), len(table)))
+            for name, offset, length, typecode, _ in table:
+                f.write(_SECTION.pack(name.encode(), offset, length, typecode.encode()))
+            for _, offset, _, _, values in table:
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(values.tobytes() if isinstance(values, array) else values)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return size
+
+@transactional("read")
+def published_version(tx: ManagedTransaction) -> int | None:
+    record = tx.run("MATCH (m:CatalogMeta {name: 'catalog'}) RETURN m.snapshot_version AS version").single()
+    return record["version"] if record else None
+
+@transactional("write")
+def publish_version(tx: ManagedTransaction, version: int, created_at: float) -> None:
+    tx.run("""
+    MERGE (m:CatalogMeta {name: 'catalog'})
+    SET m.snapshot_version = $version, m.snapshot_created_at = $created_at
+    """, version=version, created_at=created_at)
+
+_current: Snapshot | None = None
+_current_lock = threading.Lock()
+
+def current() -> Snapshot | None:
+    """
+    CATALOG_SNAPSHOT_PATH의 스냅숏을 반환합니다. 파일이 바뀌었으면 다시 mmap하고, 레시피/자동완성 카탈로그가
+    같은 매핑을 씁니다. 설정하지 않았거나 아직 export하지 않았거나 읽을 수 없으면 None(Neo4j에서 직접 로드)입니다.
+    """
+    global _current
+    path = settings.CATALOG_SNAPSHOT_PATH
+    if not path:
+        return None
+    with _current_lock:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            logger.warning(f"Catalog snapshot {path} not found, loading the catalog from Neo4j")
+            return None
+        if _current is None or _current.path != path or _current.identity != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            try:
+                _current = Snapshot(path)
+            except (OSError, SnapshotError) as e:
+                logger.error(f"Failed to map catalog snapshot {path}: {str(e)}")
+                return None
+            logger.info(f"Mapped catalog snapshot {path} (version {_current.version})")
+        return _current
+
+def fingerprint() -> Hashable:
+    """
+    Reloadable의 fingerprint로 씁니다. Neo4j에 기록된 버전과 파일 자체(inode, 수정 시각)를 함께 보므로
+    버전이 먼저 올라가고 파일이 나중에 도착해도 다음 확인 때 다시 로드합니다.
+    """
+    path = settings.CATALOG_SNAPSHOT_PATH
+    try:
+        stat = os.stat(path)
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        identity = None
+    return published_version(), identity
+
+def export(path: str) -> int:
+    """Neo4j에서 카탈로그를 읽어 path에 스냅숏을 쓰고 새 버전을 기록합니다."""
+    # matching, completion이 이 모듈을 import하므로 순환을 피해 여기서 가져옵니다.
+    from saveplate.completion import load_completion_entries
+    from saveplate.matching import load_recipe_index
+
+    started = time.perf_counter()
+    index = load_recipe_index()
+    completion = load_completion_entries()
+    version = (published_version() or 0) + 1
+    size = write_snapshot(
+        path,
+        version,
+        ingredient_names=list(index.ingredient_ids),
+        foods=index.foods,
+        recipes=index.recipes,
+        sizes=index.sizes,
+        postings=index.postings,
+        completion=completion,
+    )
+    publish_version(version, time.time())
+    logger.info(
+        f"Exported catalog snapshot version {version} to {path} "
+        f"({len(index)} recipes, {size / 1024 / 1024:.1f} MiB) in {time.perf_counter() - started:.2f}s"
+    )
+    return version
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog snapshot tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Neo4j의 카탈로그를 스냅숏 파일로 씁니다")
+    export_parser.add_argument("--output", default=settings.CATALOG_SNAPSHOT_PATH, help="기본값은 CATALOG_SNAPSHOT_PATH")
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("--output 또는 CATALOG_SNAPSHOT_PATH가 필요합니다")
+
+    logging.basicConfig(level=logging.INFO)
+    database.initialize(settings.DB_URL, (settings.DB_USER, settings.DB_PW))
+    try:
+        export(args.output)
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Accept: application/x-ndjson 요청에 결과를 한 줄에 JSON 하나씩 흘려보내는 응답을 만듭니다.
+
+결과 전체를 리스트로 모으지 않고 행을 만드는 대로 보내므로 요청당 메모리가 결과 크기와 무관합니다.
+StreamingResponse는 클라이언트가 받아 가야(send가 끝나야) 다음 행을 읽으므로, Neo4j 커서도
+fetch_size만큼씩만 서버에서 당겨 옵니다.
+"""
+from datetime import date, datetime
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from saveplate.config import settings
+from typing import Any, AsyncIterable, Iterable
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "to_native"):  # neo4j.time 타입
+        return value.to_native().isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _line(row: Any) -> bytes:
+    # orjson은 date/datetime을 직접 직렬화하므로 _default는 그 밖의 타입에만 불립니다.
+    return orjson.dumps(row, default=_default) + b"\n"
+
+async def _encode(rows: AsyncIterable[Any] | Iterable[Any], name: str):
+    # 작은 행을 하나씩 보내면 send 호출이 너무 많아지므로 chunk_rows개씩 묶어 보냅니다.
+    chunk_rows = settings.STREAM_CHUNK_ROWS
+    chunk: list[bytes] = []
+    try:
+        if hasattr(rows, "__aiter__"):
+            async for row in rows:
+                chunk.append(_line(row))
+                if len(chunk) >= chunk_rows:
+                    yield b"".join(chunk)
+                    chunk.clear()
+        else:
+            for row in rows:
+                chunk.append(_line(row))
+                if len(chunk) >= chunk_rows:
+                    yield b"".join(chunk)
+                    chunk.clear()
+        if chunk:
+            yield b"".join(chunk)
+    except Exception as e:
+        # 상태 코드는 이미 보냈으므로 로그만 남기고 연결을 끊어 클라이언트가 잘린 응답을 알 수 있게 합니다.
+        logger.error(f"Error while streaming {name}: {type(e).__name__}")
+        raise
+
+def ndjson_response(rows: AsyncIterable[Any] | Iterable[Any], name: str) -> StreamingResponse:
+    """
+    Args:
+        rows: JSON으로 직렬화할 행. 비동기 이터러블이면 행을 기다리는 동안 이벤트 루프를 막지 않습니다.
+        name (str): 오류 로그에 표시할 이름
+
+    Returns:
+        StreamingResponse: application/x-ndjson 응답
+    """
+    return StreamingResponse(_encode(rows, name), media_type=NDJSON_MEDIA_TYPE)
@@ -1,29 +1,485 @@
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
 import time
-from typing import Callable
+from typing import Any, Callable, Hashable
+import asyncio
 import inspect
+import logging
+import os
+import random
+import threading
+from saveplate.sharedcache import MISSING, shared_cache
 
-def lru_with_ttl(*, ttl_seconds: int, maxsize: int=128):
+logger = logging.getLogger(__name__)
+
+class TTLCache[K, V]:
+    """
+    항목마다 만료 시각을 가지는 스레드 안전한 LRU 캐시입니다.
+    모든 항목이 같은 순간에 만료되지 않도록 TTL을 항목마다 최대 jitter 비율만큼 무작위로 줄입니다(늘리지는 않습니다).
+    :param maxsize: 최대 항목 수. 넘으면 가장 오래 쓰이지 않은 항목부터 버립니다.
+    :param ttl_seconds: 기본 TTL. set()에서 항목별로 더 짧게 줄 수 있습니다.
+    :param jitter: TTL을 줄이는 최대 비율 (0~1)
+    :param stale_seconds: 만료 후에도 lookup()이 오래된 값으로 돌려주는 기간 (stale-while-revalidate)
+    :param weigh: 값의 크기를 재는 함수. 주면 항목 수와 함께 크기의 합도 max_weight 이하로 유지합니다.
+    :param max_weight: weigh로 잰 크기 합의 상한
+    """
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl_seconds: float,
+        jitter: float = 0.0,
+        stale_seconds: float = 0.0,
+        weigh: Callable[[V], int] | None = None,
+        max_weight: int | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.jitter = jitter
+        self.stale_seconds = stale_seconds
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.weigh = weigh
+        self.max_weight = max_weight
+        self.weight = 0
+        self._weights: dict[K, int] = {}
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: K) -> tuple[V, bool] | None:
+        """
+        (값, 만료 전 여부)를 반환합니다. 항목이 없거나 stale 기간까지 지났으면 None입니다.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at + self.stale_seconds <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if expires_at <= now:
+                self.stale_hits += 1
+                return value, False
+            self.hits += 1
+            return value, True
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self.lookup(key)
+        if entry is None or not entry[1]:
+            return default
+        return entry[0]
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if self.jitter:
+            ttl *= 1 - self.jitter * random.random()
+        if ttl <= 0:
+            return
+        weight = self.weigh(value) if self.weigh is not None else 0
+        with self._lock:
+            self._remove(key)
+            # 혼자서 상한을 넘는 값은 다른 항목을 모두 밀어내지 않도록 캐시하지 않습니다.
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            if self.weigh is not None:
+                self._weights[key] = weight
+                self.weight += weight
+            while len(self._data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def _remove(self, key: K) -> None:
+        if self._data.pop(key, MISSING) is not MISSING and self.weigh is not None:
+            self.weight -= self._weights.pop(key)
+
+    def stats(self) -> dict[str, int]:
+        stats = {
+            "size": len(self._data),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+        if self.weigh is not None:
+            stats["weight"] = self.weight
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def _make_key(args: tuple, kwargs: dict) -> Hashable:
+    return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+class _SharedLayer:
+    """
+    cached 데코레이터의 워커 간 공유 계층입니다.
+    공유 캐시 호출이 실패하면 그 호출만 워커 캐시로 처리하고, 잠시(최대 _MAX_BACKOFF_SECONDS) 쉬었다가 다시 씁니다.
+    실패해서 다른 워커에 알리지 못한 invalidate()는 다시 쓸 수 있게 되면 보냅니다.
+    """
+    _MIN_BACKOFF_SECONDS = 1.0
+    _MAX_BACKOFF_SECONDS = 60.0
+
+    def __init__(self, namespace: str, ttl_seconds: float, local: TTLCache):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = local
+        self.generation: int | None = None
+        self.failures = 0
+        self._retry_at = 0.0
+        self._pending_invalidate = False
+        self._lock = threading.Lock()
+
+    def _failed(self, e: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            backoff = min(self._MAX_BACKOFF_SECONDS, self._MIN_BACKOFF_SECONDS * 2 ** min(self.failures - 1, 16))
+            self._retry_at = time.monotonic() + backoff
+        if self.failures == 1:
+            logger.warning(f"Shared cache unavailable for {self.namespace}, using the worker cache: {str(e)}")
+
+    def _call(self, operation: Callable[[], Any], default: Any) -> Any:
+        if self.failures and time.monotonic() < self._retry_at:
+            return default
+        try:
+            if self._pending_invalidate:
+                shared_cache.invalidate(self.namespace)
+                self._pending_invalidate = False
+            result = operation()
+        except Exception as e:
+            self._failed(e)
+            return default
+        if self.failures:
+            self.failures = 0
+            logger.info(f"Shared cache available again for {self.namespace}")
+        return result
+
+    def sync_generation(self) -> None:
+        # 다른 워커가 invalidate()했으면 이 워커의 캐시도 비웁니다.
+        generation = self._call(lambda: shared_cache.generation(self.namespace), self.generation)
+        if generation != self.generation:
+            if self.generation is not None:
+                self.local.clear()
+            self.generation = generation
+
+    def get(self, key: Hashable) -> Any:
+        return self._call(lambda: shared_cache.get(self.namespace, key), MISSING)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._call(lambda: shared_cache.set(self.namespace, key, value, self.ttl_seconds), None)
+
+    def invalidate(self) -> None:
+        # 지금 실패하면 다음에 공유 캐시를 쓸 수 있을 때 보냅니다.
+        self._pending_invalidate = True
+        self._call(lambda: None, None)
+
+def cached(
+    *,
+    ttl_seconds: float,
+    maxsize: int = 128,
+    jitter: float = 0.1,
+    stale_seconds: float = 0.0,
+    shared: str | None = None,
+    version: Callable[[], Hashable] | None = None,
+):
     """
-    A decorator to apply LRU in-memory cache to a function with defined maximum(!) TTL in seconds.
-    Be design an actual TTL may be shorter then the passed value (in rare randomized cases). But it can't be higher.
-    :param ttl_seconds: TTL for a cache record in seconds
-    :param maxsize: Maximum size of the LRU cache (a functools.lru_cache argument)
+    함수 결과를 항목별 TTL로 캐시하는 데코레이터입니다. 동기/비동기 함수 모두에 쓸 수 있습니다.
+
+    - 같은 키에 대한 동시 miss는 로더를 한 번만 실행하고 나머지는 그 결과를 기다립니다(single-flight).
+    - stale_seconds > 0 이면 만료된 값을 바로 돌려주고 백그라운드에서 한 번만 다시 불러옵니다.
+    - 예외는 캐시하지 않습니다.
+    - shared에 네임스페이스를 주면 워커 캐시 뒤에 프로세스 간 공유 캐시(sharedcache)를 두어,
+      한 워커의 miss로 불러온 값을 다른 워커도 씁니다. 값은 JSON으로 직렬화할 수 있어야 합니다.
+    - 데코레이트된 함수의 cache 속성으로 TTLCache(통계, clear)에 접근할 수 있고,
+      invalidate()는 워커 캐시와 (shared가 있으면) 모든 워커의 공유 항목을 무효화합니다.
+    - version을 주면 그 반환값(결과가 의존하는 데이터의 버전, 예: 카탈로그 fingerprint)을 키에 넣습니다.
+      데이터를 새로 로드한 워커는 새 버전의 항목만 쓰고, 아직 이전 데이터를 가진 워커의 결과는 이전 버전 키에 남습니다.
+      반환값은 워커 간에 같은 repr을 가져야 합니다.
+    :param ttl_seconds: 항목의 최대 TTL
+    :param maxsize: 최대 항목 수
+    :param jitter: TTL을 줄이는 최대 비율
+    :param stale_seconds: stale-while-revalidate 기간
+    :param shared: 공유 캐시 네임스페이스
+    :param version: 데이터 버전을 반환하는 함수
     :return: decorated function
     """
-    def deco[**P, R](foo: Callable[P, R]) -> Callable[P, R]:
-        @lru_cache(maxsize=maxsize)
-        def cached_with_ttl(*args, ttl_hash, **kwargs):
-            return foo(*args, **kwargs)
+    def deco[**P, R](function: Callable[P, R]) -> Callable[P, R]:
+        cache: TTLCache[Hashable, Any] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds, jitter=jitter, stale_seconds=stale_seconds)
+        layer = _SharedLayer(shared, ttl_seconds, cache) if shared else None
+        current_version: Any = MISSING
 
-        def inner(*args, **kwargs):
-            return cached_with_ttl(*args, ttl_hash=round(time.time() / ttl_seconds), **kwargs)
+        def make_key(args, kwargs) -> Hashable:
+            nonlocal current_version
+            key = _make_key(args, kwargs)
+            if version is None:
+                return key
+            data_version = version()
+            if data_version != current_version:
+                # 이전 버전의 항목은 더 이상 조회되지 않으므로 워커 캐시에서 비웁니다.
+                if current_version is not MISSING:
+                    cache.clear()
+                current_version = data_version
+            return (data_version, key)
 
-        inner.__annotations__ = foo.__annotations__
-        inner.__doc__ = foo.__doc__
-        inner.__signature__ = inspect.signature(foo)
-        inner.__name__ = foo.__name__
+        if inspect.iscoroutinefunction(function):
+            inflight: dict[Hashable, asyncio.Task] = {}
+            background: set[asyncio.Task] = set()
 
-        return inner
+            async def compute(key, args, kwargs):
+                try:
+                    value = MISSING if layer is None else layer.get(key)
+                    if value is MISSING:
+                        value = await function(*args, **kwargs)
+                        if layer is not None:
+                            layer.set(key, value)
+                    cache.set(key, value)
+                    return value
+                finally:
+                    inflight.pop(key, None)
+
+            def retrieve(task: asyncio.Task) -> None:
+                # 기다리던 쪽이 모두 취소되었어도 경고가 나지 않게 합니다.
+                if not task.cancelled():
+                    task.exception()
+
+            async def load(key, args, kwargs):
+                # 로더는 별도 태스크에서 실행하고 모두 shield로 기다리므로, 처음 요청한 쪽이 취소되어도
+                # (클라이언트 연결 끊김 등) 같은 키를 기다리는 다른 요청은 결과를 받습니다.
+                task = inflight.get(key)
+                if task is None:
+                    task = inflight[key] = asyncio.ensure_future(compute(key, args, kwargs))
+                    task.add_done_callback(retrieve)
+                return await asyncio.shield(task)
+
+            async def refresh(key, args, kwargs):
+                try:
+                    await load(key, args, kwargs)
+                except Exception as e:
+                    logger.error(f"Background refresh of {function.__name__} failed: {str(e)}")
+
+            @wraps(function)
+            async def wrapper(*args, **kwargs):
+                if layer is not None:
+                    layer.sync_generation()
+                key = make_key(args, kwargs)
+                entry = cache.lookup(key)
+                if entry is None:
+                    return await load(key, args, kwargs)
+                value, fresh = entry
+                if not fresh and key not in inflight:
+                    task = asyncio.ensure_future(refresh(key, args, kwargs))
+                    background.add(task)
+                    task.add_done_callback(background.discard)
+                return value
+        else:
+            inflight_sync: dict[Hashable, Future] = {}
+            lock = threading.Lock()
+
+            def load_sync(key, args, kwargs):
+                with lock:
+                    future = inflight_sync.get(key)
+                    leader = future is None
+                    if leader:
+                        future = inflight_sync[key] = Future()
+                if not leader:
+                    return future.result()
+                try:
+                    value = MISSING if layer is None else layer.get(key)
+                    if value is MISSING:
+                        value = function(*args, **kwargs)
+                        if layer is not None:
+                            layer.set(key, value)
+                    cache.set(key, value)
+                    future.set_result(value)
+                    return value
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+                finally:
+                    with lock:
+                        inflight_sync.pop(key, None)
+
+            def refresh(key, args, kwargs):
+                try:
+                    load_sync(key, args, kwargs)
+                except Exception as e:
+                    logger.error(f"Background refresh of {function.__name__} failed: {str(e)}")
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if layer is not None:
+                    layer.sync_generation()
+                key = make_key(args, kwargs)
+                entry = cache.lookup(key)
+                if entry is None:
+                    return load_sync(key, args, kwargs)
+                value, fresh = entry
+                if not fresh and key not in inflight_sync:
+                    threading.Thread(target=refresh, args=(key, args, kwargs), daemon=True).start()
+                return value
+
+        def invalidate() -> None:
+            cache.clear()
+            if layer is not None:
+                layer.invalidate()
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        return wrapper
     return deco
-    
\ No newline at end of file
+
+class Reloadable[T]:
+    """
+    로더 함수로 만든 값을 워커 단위로 보관하고, 백그라운드 스레드에서 주기적으로 갱신합니다.
+    fingerprint 함수가 주어지면 그 값이 바뀌었을 때(또는 max_age가 지났을 때)만 다시 로드합니다.
+    :param name: 로그에 표시할 이름
+    :param loader: 값을 새로 만드는 함수
+    :param interval_seconds: 갱신 여부를 확인하는 주기
+    :param fingerprint: 원본 데이터의 변경 여부를 값싸게 판별하는 함수
+    :param max_age_seconds: fingerprint와 무관하게 강제로 다시 로드하는 주기
+    :param digest: fingerprint가 없을 때 loader가 읽은 값에서 내용 키를 계산하는 함수
+    :param build: loader가 읽은 원본으로 값을 만드는 함수. 주어지면 내용 키가 지금 값과 같을 때 다시 만들지 않으므로,
+        fingerprint 없이 주기마다 다시 읽더라도 원본이 바뀌었을 때만 비싼 빌드를 합니다.
+    key()는 로드한 값의 내용 키(fingerprint 또는 digest)로, 같은 데이터를 로드한 워커끼리 같습니다.
+    둘 다 없으면 워커마다 다른 값이 됩니다. add_listener()로 등록한 함수는 다시 로드한 값의 내용 키가
+    이전과 달라졌을 때만 호출됩니다 (처음 로드할 때와 내용이 같은 주기적 재로드에는 호출하지 않습니다).
+    """
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], T],
+        *,
+        interval_seconds: float,
+        fingerprint: Callable[[], Hashable] | None = None,
+        max_age_seconds: float | None = None,
+        digest: Callable[[Any], Hashable] | None = None,
+        build: Callable[[Any], T] | None = None,
+    ):
+        self.name = name
+        self.version = 0
+        self._loader = loader
+        self._fingerprint = fingerprint
+        self._interval = interval_seconds
+        self._max_age = max_age_seconds
+        self._digest = digest
+        self._build = build
+        self.content_key: Hashable | None = None
+        self._value: T | None = None
+        self._value_fingerprint: Hashable | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def key(self) -> Hashable:
+        self.get()
+        return self.content_key
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> T:
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._load()
+                value = self._value
+        return value
+
+    def reload(self) -> T:
+        with self._lock:
+            self._load()
+            return self._value
+
+    def invalidate(self) -> None:
+        """다음 갱신 주기를 기다리지 않고 백그라운드에서 다시 로드하도록 요청합니다."""
+        self._value_fingerprint = None
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self.reload()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=f"reload-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _load(self) -> None:
+        fingerprint = self._fingerprint() if self._fingerprint else None
+        started = time.perf_counter()
+        source = self._loader()
+        previous_key = self.content_key
+        if self._fingerprint is not None:
+            content_key = fingerprint
+        elif self._digest is not None:
+            content_key = self._digest(source)
+        else:
+            content_key = (os.getpid(), self.version + 1)
+        if self._build is not None and self._value is not None and content_key == previous_key:
+            self._value_fingerprint = fingerprint
+            self._loaded_at = time.monotonic()
+            logger.info(f"{self.name} unchanged (version {self.version}), checked in {time.perf_counter() - started:.3f}s")
+            return
+        value = self._build(source) if self._build is not None else source
+        self._value = value
+        self.content_key = content_key
+        self._value_fingerprint = fingerprint
+        self._loaded_at = time.monotonic()
+        self.version += 1
+        logger.info(f"{self.name} loaded (version {self.version}) in {time.perf_counter() - started:.3f}s")
+        if previous_key is None or content_key == previous_key:
+            return
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Listener of {self.name} failed: {str(e)}")
+
+    def _is_stale(self) -> bool:
+        if self._value is None or self._fingerprint is None or self._value_fingerprint is None:
+            return True
+        if self._max_age is not None and time.monotonic() - self._loaded_at >= self._max_age:
+            return True
+        return self._fingerprint() != self._value_fingerprint
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                if self._is_stale():
+                    self.reload()
+            except Exception as e:
+                logger.error(f"Failed to reload {self.name}: {str(e)}")
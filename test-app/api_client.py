@@ -1,16 +1,44 @@
 import requests
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 class APIClient:
-    def __init__(self, base_url):
+    """
+    :param session: 연결을 재사용할 requests.Session. 없으면 새로 만듭니다.
+    :param observer: 요청마다 observer(엔드포인트 이름, 상태 코드, 소요 초)로 호출됩니다.
+                     연결 오류는 상태 코드 0으로 전달됩니다. 부하 테스트(loadgen.py)에서 사용합니다.
+    """
+    def __init__(self, base_url, session=None, observer=None):
         self.base_url = base_url
         self.token = None
+        self.session = session or requests.Session()
+        self.observer = observer
+        # 마지막 쓰기의 Neo4j 북마크. 다음 요청에 보내 방금 쓴 내용을 읽기 복제본에서도 읽을 수 있게 합니다.
+        self.bookmark = None
+
+    def _request(self, endpoint, method, path, **kwargs):
+        if self.bookmark:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "X-Neo4j-Bookmark": self.bookmark}
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except requests.RequestException:
+            if self.observer:
+                self.observer(endpoint, 0, time.perf_counter() - started)
+            raise
+        if self.observer:
+            self.observer(endpoint, response.status_code, time.perf_counter() - started)
+        self.bookmark = response.headers.get("X-Neo4j-Bookmark", self.bookmark)
+        return response
+
+    def _auth_headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
 
     def login(self, username, password):
         logger.info("로그인 시도: %s", username)
-        response = requests.post(f"{self.base_url}/auth/token", data={
+        response = self._request("login", "POST", "/auth/token", data={
             "username": username,
             "password": password
         })
@@ -23,8 +51,7 @@ class APIClient:
 
     def get_ingredients(self):
         logger.info("재료 목록 조회")
-        headers = {"Authorization": f"Bearer {self.token}"}
-        response = requests.get(f"{self.base_url}/user/ingredients", headers=headers)
+        response = self._request("ingredients", "GET", "/user/ingredients", headers=self._auth_headers())
         if response.status_code == 200:
             logger.info("재료 목록 조회 성공")
             return response.json()
@@ -33,9 +60,8 @@ class APIClient:
 
     def add_ingredient(self, name, amount):
         logger.info("재료 추가 시도: %s, %d", name, amount)
-        headers = {"Authorization": f"Bearer {self.token}"}
         data = {"ingredients": [{"name": name, "amount": amount}]}
-        response = requests.post(f"{self.base_url}/user/ingredient", json=data, headers=headers)
+        response = self._request("add_ingredient", "POST", "/user/ingredient", json=data, headers=self._auth_headers())
         if response.status_code == 200:
             logger.info("재료 추가 성공: %s, %d", name, amount)
             return response.json()
@@ -44,8 +70,7 @@ class APIClient:
 
     def get_available_recipes(self):
         logger.info("가능한 레시피 조회")
-        headers = {"Authorization": f"Bearer {self.token}"}
-        response = requests.get(f"{self.base_url}/user/recipes", headers=headers)
+        response = self._request("recipes", "GET", "/user/recipes", headers=self._auth_headers())
         if response.status_code == 200:
             logger.info("가능한 레시피 조회 성공")
             return response.json()
@@ -54,7 +79,7 @@ class APIClient:
 
     def get_autocomplete(self, type, prefix):
         logger.info("자동완성 조회: %s, %s", type, prefix)
-        response = requests.get(f"{self.base_url}/autocompletion?type={type}&data={prefix}")
+        response = self._request("autocompletion", "GET", "/autocompletion", params={"type": type, "data": prefix})
         if response.status_code == 200:
             logger.info("자동완성 조회 성공: %s, %s", type, prefix)
             return response.json()
@@ -70,7 +95,7 @@ class APIClient:
             "gender": gender,
             "birth_date": birth_date
         }
-        response = requests.post(f"{self.base_url}/auth/register", json=data)
+        response = self._request("register", "POST", "/auth/register", json=data)
         if response.status_code == 200:
             self.token = response.json()["access_token"]
             logger.info("회원가입 성공: %s", email)
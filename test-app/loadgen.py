@@ -0,0 +1,240 @@
+"""
+APIClient를 그대로 사용하는 헤드리스 부하 생성기입니다.
+
+    python loadgen.py --users 50 --concurrency 20 --duration 60 --rate 200 --json result.json
+
+합성 사용자를 회원가입(이미 있으면 로그인)시킨 뒤, 동시에 concurrency개의 스레드가 시나리오를 반복합니다.
+- autocomplete: 재료 이름을 한 글자씩 입력하듯 접두사를 늘려 가며 자동완성을 조회합니다.
+- add: 임의의 재료를 냉장고에 추가합니다.
+- recipes: 가능한 레시피를 조회합니다.
+- ingredients: 냉장고 재료 목록을 조회합니다.
+끝나면 엔드포인트별 처리량, 오류 수, p50/p95/p99 지연 시간을 출력합니다.
+"""
+from api_client import APIClient
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import dotenv
+import json
+import logging
+import os
+import queue
+import random
+import requests
+import threading
+import time
+
+dotenv.load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 자동완성으로 재료 이름을 모을 때 쓰는 첫 음절
+SEED_PREFIXES = "가나다라마바사아자차카타파하고두무버소오조초양배감"
+
+class Recorder:
+    """APIClient의 observer로 쓰여 요청 결과를 엔드포인트별로 모읍니다."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.enabled = True
+
+    def __call__(self, endpoint, status, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        def percentile(values, q):
+            return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+        rows = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            rows.append({
+                "endpoint": endpoint,
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 0.50), 1),
+                "p95_ms": round(percentile(values, 0.95), 1),
+                "p99_ms": round(percentile(values, 0.99), 1),
+                "statuses": dict(self.statuses[endpoint]),
+            })
+        return rows
+
+class RateLimiter:
+    """모든 스레드가 공유하는 초당 요청 수 제한입니다. rate가 0이면 제한하지 않습니다."""
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def make_client(base_url, recorder, pool_size):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return APIClient(base_url, session=session, observer=recorder)
+
+def sign_in(client, email, password):
+    if client.register(email, password, "loadgen", None, None):
+        return True
+    return client.login(email, password)
+
+def collect_ingredients(client, limit):
+    names = set()
+    for prefix in SEED_PREFIXES:
+        names.update(client.get_autocomplete("ingredient", prefix))
+        if len(names) >= limit:
+            break
+    return sorted(names)
+
+def keystrokes(name):
+    return [name[:i] for i in range(1, len(name) + 1)]
+
+class Scenarios:
+    def __init__(self, ingredients, rng, limiter):
+        self.ingredients = ingredients
+        self.rng = rng
+        self.limiter = limiter
+
+    def autocomplete(self, client):
+        for prefix in keystrokes(self.rng.choice(self.ingredients)):
+            self.limiter.wait()
+            client.get_autocomplete("ingredient", prefix)
+
+    def add(self, client):
+        self.limiter.wait()
+        client.add_ingredient(self.rng.choice(self.ingredients), self.rng.randint(1, 5))
+
+    def recipes(self, client):
+        self.limiter.wait()
+        client.get_available_recipes()
+
+    def ingredients_list(self, client):
+        self.limiter.wait()
+        client.get_ingredients()
+
+def parse_mix(text):
+    # "autocomplete=6,add=1,recipes=2,ingredients=1"
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"autocomplete", "add", "recipes", "ingredients"}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    return mix
+
+def worker(clients, scenarios, mix, deadline, stop):
+    actions = {
+        "autocomplete": scenarios.autocomplete,
+        "add": scenarios.add,
+        "recipes": scenarios.recipes,
+        "ingredients": scenarios.ingredients_list,
+    }
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline and not stop.is_set():
+        # 한 사용자의 APIClient를 동시에 두 스레드가 쓰지 않도록 큐에서 빌려 씁니다.
+        client = clients.get()
+        try:
+            actions[scenarios.rng.choices(names, weights)[0]](client)
+        except requests.RequestException as e:
+            logger.debug("요청 실패: %s", e)
+        finally:
+            clients.put(client)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("SERVER_URL", "http://localhost:8000"))
+    parser.add_argument("--users", type=int, default=20, help="합성 사용자 수 (concurrency 이상)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    parser.add_argument("--rate", type=float, default=0, help="전체 초당 요청 수 상한. 0이면 제한 없음")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("autocomplete=6,add=1,recipes=2,ingredients=1"))
+    parser.add_argument("--email-prefix", default="loadgen")
+    parser.add_argument("--password", default="loadgen-password")
+    parser.add_argument("--ingredients", nargs="*", help="추가/자동완성에 쓸 재료 이름. 없으면 자동완성으로 수집합니다")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+    if args.users < args.concurrency:
+        parser.error("--users는 --concurrency 이상이어야 합니다")
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    recorder = Recorder()
+    recorder.enabled = False  # 준비 단계의 요청은 집계하지 않습니다.
+    clients = [make_client(args.url, recorder, pool_size=2) for _ in range(args.users)]
+    # bcrypt 때문에 회원가입/로그인이 느리므로 동시에 진행합니다.
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        signed_in = sum(executor.map(
+            lambda item: sign_in(item[1], f"{args.email_prefix}-{item[0]}@example.com", args.password),
+            enumerate(clients),
+        ))
+    if signed_in < len(clients):
+        logger.warning("%d명 중 %d명만 로그인했습니다", len(clients), signed_in)
+    ingredients = args.ingredients or collect_ingredients(clients[0], 200)
+    if not ingredients:
+        parser.error("재료 이름을 찾지 못했습니다. --ingredients로 지정하세요")
+    print(f"users={len(clients)} concurrency={args.concurrency} ingredients={len(ingredients)} mix={args.mix}")
+
+    available = queue.Queue()
+    for client in clients:
+        if client.token:
+            available.put(client)
+    if available.empty():
+        parser.error("로그인한 사용자가 없습니다")
+    limiter = RateLimiter(args.rate)
+    stop = threading.Event()
+    recorder.enabled = True
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(available, Scenarios(ingredients, random.Random(args.seed + i), limiter), args.mix, deadline, stop),
+            daemon=True,
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.monotonic() - started
+
+    rows = recorder.report(elapsed)
+    total = sum(row["requests"] for row in rows)
+    print(f"{'endpoint':<16} {'requests':>9} {'errors':>7} {'rps':>8} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8}")
+    for row in rows:
+        print(f"{row['endpoint']:<16} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+    print(f"total {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"arguments": vars(args), "elapsed_seconds": elapsed, "endpoints": rows}, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+테스트는 Neo4j 없이 benchmarks.graph의 인메모리 그래프로 실행합니다.
+
+    python -m pytest
+"""
+import os
+import tempfile
+
+for _key in ("DB_URL", "DB_USER", "DB_PW", "SECRET_KEY"):
+    os.environ.setdefault(_key, "test")
+# 운영 중인 서버의 공유 캐시 파일을 건드리지 않도록 임시 파일을 씁니다.
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), f"saveplate-test-{os.getpid()}"))
+os.environ.setdefault("SHARED_CACHE_SLOTS", "256")
+
+import pytest
+from benchmarks.graph import FakeGraph, install
+from saveplate import auth, database
+
+@pytest.fixture
+def graph():
+    """database 모듈에 가짜 드라이버를 설치한 빈 그래프입니다. 읽기 복제본은 테스트에서 install()로 따로 설치합니다."""
+    graph = FakeGraph()
+    install(graph)
+    auth._user_cache.clear()
+    auth._token_cache.clear()
+    yield graph
+    database.set_read_replicas(database.ReadReplicas(()), database.ReadReplicas(()))
+    setattr(database, "__driver", None)
+    setattr(database, "__async_driver", None)
@@ -0,0 +1,32 @@
+"""
+입장 제어가 거절한 요청이 /metrics의 saveplate_requests_rejected_total에 잡히는지 확인합니다.
+"""
+from fastapi.testclient import TestClient
+from saveplate import admission
+from saveplate.main import app
+
+def _rejected(client: TestClient, route_class: str, reason: str) -> float:
+    line = f'saveplate_requests_rejected_total{{class="{route_class}",reason="{reason}"}} '
+    for row in client.get("/metrics").text.splitlines():
+        if row.startswith(line):
+            return float(row[len(line):])
+    return 0.0
+
+def test_rejections_are_counted_on_metrics(graph, monkeypatch):
+    client = TestClient(app)
+    concurrency = _rejected(client, "catalog", "concurrency")
+    rate = _rejected(client, "catalog", "rate")
+
+    monkeypatch.setattr(admission.limits["catalog"], "limit", 0.0)
+    response = client.get("/autocompletion", params={"type": "ingredient", "data": "감"})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    monkeypatch.undo()
+
+    monkeypatch.setattr(admission._user_buckets, "take", lambda key: 2.5)
+    response = client.get("/user/recipes")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+    assert _rejected(client, "catalog", "concurrency") == concurrency + 1
+    assert _rejected(client, "catalog", "rate") == rate + 1
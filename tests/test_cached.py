@@ -0,0 +1,109 @@
+"""
+cached 데코레이터의 single-flight, 취소, stale-while-revalidate 동작을 확인합니다.
+"""
+import asyncio
+import threading
+import time
+from saveplate.util import cached
+
+def test_concurrent_async_misses_call_loader_once():
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @cached(ttl_seconds=60, jitter=0)
+        async def load(key: str) -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return key.upper()
+
+        waiters = [asyncio.create_task(load("a")) for _ in range(20)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == ["A"] * 20
+    assert calls == 1
+
+def test_concurrent_sync_misses_call_loader_once():
+    calls = 0
+    release = threading.Event()
+
+    @cached(ttl_seconds=60, jitter=0)
+    def load(key: str) -> str:
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return key.upper()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(load("a"))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["A"] * 10
+    assert calls == 1
+
+def test_cancelled_waiter_does_not_cancel_shared_load():
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @cached(ttl_seconds=60, jitter=0)
+        async def load(key: str) -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return key.upper()
+
+        first = asyncio.create_task(load("a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(load("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        value = await second
+        assert first.cancelled()
+        # 로드가 끝까지 실행되어 캐시에 남았으므로 다시 부르지 않습니다.
+        assert await load("a") == "A"
+        return value
+
+    assert asyncio.run(scenario()) == "A"
+    assert calls == 1
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    calls = 0
+
+    async def scenario():
+        release = asyncio.Event()
+
+        @cached(ttl_seconds=0.05, stale_seconds=60, jitter=0)
+        async def load(key: str) -> int:
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                await release.wait()
+            return calls
+
+        assert await load("a") == 1
+        await asyncio.sleep(0.06)
+        # 만료된 값을 바로 돌려주고, 갱신은 여러 번 불려도 하나만 실행합니다.
+        assert [await load("a") for _ in range(5)] == [1] * 5
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert calls == 2
+        assert await load("a") == 1
+        release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return await load("a")
+
+    assert asyncio.run(scenario()) == 2
+    assert calls == 2
@@ -0,0 +1,72 @@
+"""
+요청 마감 시각과 드라이버 재시도의 상호작용을 재시도하는 가짜 세션으로 확인합니다.
+"""
+import asyncio
+import pytest
+from neo4j.exceptions import TransientError
+from benchmarks.graph import FakeSession
+from saveplate import deadlines
+from saveplate.database import AsyncManagedTransaction, ManagedTransaction, async_transactional, transactional
+
+_LABELS_QUERY = "MATCH (n:Ingredient) RETURN n.name AS name, n.popularity AS popularity"
+
+@transactional("read")
+def read_names(tx: ManagedTransaction) -> list[str]:
+    return [record["name"] for record in tx.run(_LABELS_QUERY)]
+
+@async_transactional("read")
+async def read_names_async(tx: AsyncManagedTransaction) -> list[str]:
+    result = await tx.run(_LABELS_QUERY)
+    return [record["name"] async for record in result]
+
+@pytest.fixture
+def retry_delay(monkeypatch):
+    def set_delay(seconds: float) -> None:
+        monkeypatch.setattr(FakeSession, "retry_delay", seconds)
+    return set_delay
+
+def _with_deadline(seconds: float, function):
+    token = deadlines._current.set(deadlines.Deadline(seconds))
+    try:
+        return function()
+    finally:
+        deadlines._current.reset(token)
+
+def test_retry_gets_remaining_time_as_timeout(graph, retry_delay):
+    graph.ingredients = {"감자": 1.0}
+    graph.failures = [TransientError("busy")]
+    retry_delay(0.05)
+
+    assert _with_deadline(5, read_names) == ["감자"]
+    first, second = graph.timeouts
+    assert first <= 5
+    assert second <= first - 0.05
+
+def test_async_retry_gets_remaining_time_as_timeout(graph, retry_delay):
+    graph.ingredients = {"감자": 1.0}
+    graph.failures = [TransientError("busy")]
+    retry_delay(0.05)
+
+    async def read():
+        deadlines._current.set(deadlines.Deadline(5))
+        return await read_names_async()
+
+    assert asyncio.run(read()) == ["감자"]
+    first, second = graph.timeouts
+    assert second <= first - 0.05
+
+def test_no_retry_after_deadline(graph, retry_delay):
+    graph.ingredients = {"감자": 1.0}
+    graph.failures = [TransientError("busy"), TransientError("busy")]
+    retry_delay(0.1)
+
+    with pytest.raises(deadlines.DeadlineExceeded):
+        _with_deadline(0.05, read_names)
+    assert len(graph.timeouts) == 1
+
+def test_retry_without_deadline_is_left_to_driver(graph):
+    graph.ingredients = {"감자": 1.0}
+    graph.failures = [TransientError("busy")]
+
+    assert read_names() == ["감자"]
+    assert list(graph.timeouts) == [None, None]
@@ -0,0 +1,40 @@
+"""
+재료를 하나씩 추가하며 갱신한 UserScores가 매번 RecipeIndex.match 전체 계산과 같은 결과를 내는지 확인합니다.
+"""
+import random
+import pytest
+from saveplate.matching import RecipeIndex, UserScores
+
+def _catalog(seed: int) -> tuple[RecipeIndex, list[str]]:
+    rng = random.Random(seed)
+    names = [f"재료{i}" for i in range(60)]
+    # 앞쪽 재료일수록 자주 쓰여 posting 길이가 고르지 않게 합니다.
+    weights = [1 / (i + 1) for i in range(len(names))]
+    rows = [
+        (f"음식{i}", f"레시피{i}", set(rng.choices(names, weights, k=rng.randint(1, 8))))
+        for i in range(400)
+    ]
+    return RecipeIndex(rows), names
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_scores_match_full_recomputation(seed):
+    index, names = _catalog(seed)
+    order = names + ["없는 재료"]
+    random.Random(seed).shuffle(order)
+
+    scores = UserScores(index)
+    pantry: list[str] = []
+    for name in order:
+        scores.add([name])
+        pantry.append(name)
+        assert scores.top(limit=len(index)) == index.match(pantry, limit=len(index))
+        assert scores.top(limit=10, offset=5) == index.match(pantry, limit=10, offset=5)
+        assert scores.top(limit=len(index), min_similarity=0.5) == index.match(pantry, limit=len(index), min_similarity=0.5)
+
+def test_adding_known_or_unknown_ingredients_changes_nothing():
+    index, names = _catalog(0)
+    scores = UserScores(index, names[:3])
+    ranking = list(scores.ranking)
+    assert scores.add(names[:3]) == 0
+    assert scores.add(["없는 재료"]) == 0
+    assert scores.ranking == ranking
@@ -0,0 +1,101 @@
+"""
+읽기 복제본 라우팅과 북마크 헤더를 가짜 드라이버 여러 개로 확인합니다.
+"""
+import asyncio
+from fastapi.testclient import TestClient
+from saveplate import auth, database
+from saveplate.database import AsyncManagedTransaction, ManagedTransaction, async_transactional, transactional
+from saveplate.main import app
+from benchmarks.graph import install
+
+_LABELS_QUERY = "MATCH (n:Ingredient) RETURN n.name AS name, n.popularity AS popularity"
+
+@transactional("read")
+def read_names(tx: ManagedTransaction) -> list[str]:
+    return [record["name"] for record in tx.run(_LABELS_QUERY)]
+
+@transactional("write")
+def write_password(tx: ManagedTransaction, email: str) -> None:
+    tx.run("MATCH (u:User {email: $email}) SET u.hashed_password = $hashed_password", email=email, hashed_password="x")
+
+@async_transactional("read")
+async def read_names_async(tx: AsyncManagedTransaction) -> list[str]:
+    result = await tx.run(_LABELS_QUERY)
+    return [record["name"] async for record in result]
+
+@async_transactional("write")
+async def write_password_async(tx: AsyncManagedTransaction, email: str) -> None:
+    await tx.run("MATCH (u:User {email: $email}) SET u.hashed_password = $hashed_password", email=email, hashed_password="x")
+
+def _primary() -> tuple:
+    return getattr(database, "__driver"), getattr(database, "__async_driver")
+
+def test_reads_rotate_across_replicas(graph):
+    replicas = install(graph, read_replicas=2)
+    graph.ingredients = {"감자": 1.0}
+    primary, async_primary = _primary()
+
+    for _ in range(4):
+        assert read_names() == ["감자"]
+    assert [driver.sessions for driver in database._read_replicas.drivers()] == [2, 2]
+
+    async def read_four_times():
+        for _ in range(4):
+            assert await read_names_async() == ["감자"]
+    asyncio.run(read_four_times())
+    assert [driver.sessions for driver in replicas] == [2, 2]
+    assert primary.sessions == async_primary.sessions == 0
+
+def test_writes_go_to_primary(graph):
+    replicas = install(graph, read_replicas=2)
+    graph.add_user("writer@example.com")
+    primary, async_primary = _primary()
+
+    write_password("writer@example.com")
+    asyncio.run(write_password_async("writer@example.com"))
+    assert primary.sessions == async_primary.sessions == 1
+    assert [driver.sessions for driver in database._read_replicas.drivers()] == [0, 0]
+    assert [driver.sessions for driver in replicas] == [0, 0]
+
+def _client(graph, email: str) -> TestClient:
+    graph.add_user(email)
+    graph.ingredients = {"감자": 1.0, "양파": 2.0}
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {auth.create_access_token({'sub': email})}"
+    return client
+
+def test_add_ingredient_returns_bookmark_and_later_read_waits_for_it(graph):
+    replicas = install(graph, read_replicas=2)
+    client = _client(graph, "pantry@example.com")
+
+    response = client.post("/user/ingredient", json={"ingredients": [{"name": "감자", "amount": 2}]})
+    assert response.status_code == 200
+    bookmark = response.headers[database.BOOKMARK_HEADER]
+    assert bookmark == f"fake:{graph.commits}"
+
+    sessions = [driver.sessions for driver in replicas]
+    response = client.get("/user/ingredients", headers={database.BOOKMARK_HEADER: bookmark})
+    assert response.status_code == 200
+    assert [row["name"] for row in response.json()] == ["감자"]
+    assert database.BOOKMARK_HEADER not in response.headers
+    opened = [driver.last_session for driver, before in zip(replicas, sessions) if driver.sessions > before]
+    assert opened and all(session.bookmarks.raw_values == frozenset({bookmark}) for session in opened)
+
+def test_read_after_write_in_one_scope_uses_new_bookmarks(graph):
+    install(graph, read_replicas=2)
+    graph.add_user("scope@example.com")
+    graph.ingredients = {"감자": 1.0}
+
+    async def scenario():
+        async with database.request_scope(["fake:0"]) as scope:
+            await read_names_async()
+            before = scope.read_session
+            await write_password_async("scope@example.com")
+            await read_names_async()
+            return before, scope.read_session, scope.written
+
+    before, after, written = asyncio.run(scenario())
+    assert before.bookmarks.raw_values == frozenset({"fake:0"})
+    assert after is not before
+    assert written == frozenset({f"fake:{graph.commits}"})
+    assert after.bookmarks.raw_values == written
@@ -0,0 +1,115 @@
+"""
+여러 프로세스가 같은 공유 캐시 파일을 쓸 때의 읽기/쓰기, 세대 무효화, incr, seqlock 동작을 확인합니다.
+"""
+import multiprocessing
+import time
+import pytest
+from saveplate import sharedcache
+from saveplate.sharedcache import MISSING, SharedCache, _SEQ, _SLOTS_OFFSET, _WAYS, _encode_key
+
+_fork = multiprocessing.get_context("fork")
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache")
+
+def _cache(path: str) -> SharedCache:
+    return SharedCache(path, slot_count=64, slot_size=512)
+
+def _run(target, *args) -> None:
+    process = _fork.Process(target=target, args=args)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+def _read_into(path: str, namespace: str, key: str, results) -> None:
+    results.put(_cache(path).get(namespace, key))
+
+def _write(path: str, namespace: str, key: str, value) -> None:
+    _cache(path).set(namespace, key, value, 60)
+
+def _invalidate(path: str, namespace: str) -> None:
+    _cache(path).invalidate(namespace)
+
+def _increment(path: str, count: int) -> None:
+    cache = _cache(path)
+    for _ in range(count):
+        cache.incr("counters", "hits", 60)
+
+def test_values_are_shared_between_processes(path):
+    cache = _cache(path)
+    cache.set("recipes", "a", {"names": ["감자전"]}, 60)
+    results = _fork.Queue()
+    _run(_read_into, path, "recipes", "a", results)
+    assert results.get(timeout=5) == {"names": ["감자전"]}
+
+    _run(_write, path, "recipes", "b", [1, 2, 3])
+    assert cache.get("recipes", "b") == [1, 2, 3]
+    assert cache.get("recipes", "missing") is MISSING
+
+def test_invalidate_in_another_process_clears_the_namespace(path):
+    cache = _cache(path)
+    other = next(name for name in ("users", "tokens", "pantry") if sharedcache._namespace_index(name) != sharedcache._namespace_index("recipes"))
+    cache.set("recipes", "a", 1, 60)
+    cache.set(other, "a", 2, 60)
+    generation = cache.generation("recipes")
+
+    _run(_invalidate, path, "recipes")
+    assert cache.generation("recipes") == generation + 1
+    assert cache.get("recipes", "a") is MISSING
+    assert cache.get(other, "a") == 2
+    cache.set("recipes", "a", 3, 60)
+    assert cache.get("recipes", "a") == 3
+
+def test_incr_is_atomic_across_processes(path):
+    cache = _cache(path)
+    start = cache.incr("counters", "hits", 60)
+    processes = [_fork.Process(target=_increment, args=(path, 200)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    _increment(path, 200)
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    assert cache.get("counters", "hits") == start + 5 * 200
+
+def test_slot_being_written_reads_as_miss(path):
+    cache = _cache(path)
+    cache.set("recipes", "a", "value", 60)
+    mm = cache._map()
+    _, key_hash = _encode_key("recipes", "a")
+    base = _SLOTS_OFFSET + (key_hash % (cache.slot_count // _WAYS)) * _WAYS * cache.slot_size
+    offset = next(base + way * cache.slot_size for way in range(_WAYS) if sharedcache._SLOT.unpack_from(mm, base + way * cache.slot_size)[1] == key_hash)
+    seq = _SEQ.unpack_from(mm, offset)[0]
+
+    # 쓰는 도중(홀수)인 슬롯은 읽지 않습니다.
+    _SEQ.pack_into(mm, offset, seq | 1)
+    assert cache.get("recipes", "a") is MISSING
+    _SEQ.pack_into(mm, offset, seq)
+    assert cache.get("recipes", "a") == "value"
+
+def _overwrite(path: str, seconds: float) -> None:
+    cache = _cache(path)
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        i += 1
+        # 길이가 바뀌는 값을 계속 덮어써서, 섞인 읽기가 있으면 n과 items가 어긋나게 합니다.
+        cache.set("torn", "key", {"n": i, "items": [i] * (i % 40)}, 60)
+
+def test_concurrent_overwrites_never_return_torn_values(path):
+    cache = _cache(path)
+    cache.set("torn", "key", {"n": 0, "items": []}, 60)
+    writer = _fork.Process(target=_overwrite, args=(path, 1.0))
+    writer.start()
+    hits = 0
+    try:
+        while writer.is_alive():
+            value = cache.get("torn", "key")
+            if value is not MISSING:
+                hits += 1
+                assert value["items"] == [value["n"]] * (value["n"] % 40)
+    finally:
+        writer.join(10)
+    assert writer.exitcode == 0
+    assert hits > 0